@@ -0,0 +1,275 @@
+"""
+Starea alertei pe telefon, intr-un singur obiect detinut de thread-ul Kivy.
+
+Poll-ul propriu, mesajele serviciului, butoanele si scrierile terminate pe
+alte thread-uri nu mai modifica direct flag-uri din aplicatie: fiecare
+devine un eveniment (tip, date) trimis actorului de pe thread-ul Kivy.
+Actorul isi schimba starea si intoarce comenzile pentru interfata, ca
+lista de (comanda, date); nu atinge widget-uri, nu citeste ceasul si nu
+face I/O, deci aceeasi secventa de evenimente da mereu aceleasi comenzi.
+
+Raspunsurile (poll sau serviciu) vin cu numarul de secventa al sursei lor:
+un raspuns mai vechi decat ultimul aplicat, sau de la o sursa care nu mai
+e activa, e ignorat. Oprirea unei alerte nu mai asteapta o secunda
+"de siguranta": alerta oprita de noi e recunoscuta dupa nr-ul dat de server
+(sau dupa id, pe canalele fara nr) in orice stare veche care mai ajunge,
+iar la confirmarea scrierii ultima stare se reevalueaza imediat. Un nr mai
+mare pe sala afisata e o alerta noua, chiar daca expeditorul e acelasi.
+
+Ultimele evenimente se pastreaza si pot fi salvate si reluate:
+    python actor.py actor_evenimente.jsonl
+"""
+import json
+import sys
+from collections import deque
+from stare import sali_urmarite, numar_alerta
+
+# Evenimente
+PROFIL = 'profil'                       # abonamente, sala, poate_trimite
+SURSA = 'sursa'                         # sursa ('poll' / 'serviciu'), seq - ultima secventa deja depasita
+RASPUNS = 'raspuns'                     # sursa, seq, modificat, data, primit_la
+EROARE = 'eroare'                       # sursa, seq, mesaj
+CONEXIUNE = 'conexiune'                 # conectat, eroare - heartbeat-ul serviciului
+ALERTA_TRIMISA = 'alerta_trimisa'       # sala, alerta_id - butonul de alerta
+TRIMITERE_ESUATA = 'trimitere_esuata'   # alerta_id
+OPRIRE_CERUTA = 'oprire_ceruta'         # butonul confirma / anuleaza
+OPRIRE_TERMINATA = 'oprire_terminata'   # sala, alerta_id - scrierea a plecat (sau a ramas in jurnal)
+OPRIRE_RESPINSA = 'oprire_respinsa'     # sala, alerta_id - serverul a respins scrierea
+
+# Comenzi pentru interfata
+ARATA_CONEXIUNE = 'conexiune'           # conectat, eroare
+ARATA_ALERTA = 'alerta'                 # sala, cine, alte_sali, propria, stare (de masurat) sau None, primit_la
+ARATA_NORMAL = 'normal'
+PRIMA_STARE = 'prima_stare'
+TACI = 'taci'
+SCRIE_OPRIRE = 'scrie_oprire'           # sala, alerta_id, nr, expeditor, era_expeditor
+
+# Cate evenimente pastram pentru reluare
+MARIME_LOG = 500
+
+
+class ActorAlerta:
+    def __init__(self):
+        self.abonamente = []
+        self.sala = None
+        self.poate_trimite = False
+
+        self.sursa_activa = 'poll'
+        self.ultima_secventa = {}
+        self.ultima_stare = None
+        self.asteapta_prima_stare = True
+        self.erori_consecutive = 0
+
+        self.alerta_activa = False
+        self.sala_alerta = None
+        self.alerta_id = None
+        self.alerta_nr = 0
+        self.expeditor = ''
+        self.sunt_expeditor = False
+        self.id_alerta_trimisa = None
+        self.oprire_in_curs = None        # (sala, alerta_id)
+        self.alerte_oprite_local = {}     # sala -> (id, nr) al alertei oprite de noi
+
+        self.ignorate = 0
+        self.log = deque(maxlen=MARIME_LOG)
+
+    # ---------- API ----------
+    def trimite(self, tip, **date):
+        """Aplica un eveniment; returneaza comenzile pentru interfata"""
+        self.log.append((tip, date))
+        return getattr(self, f'_la_{tip}')(**date)
+
+    def salveaza_log(self, cale):
+        try:
+            with open(cale, 'w') as f:
+                for tip, date in self.log:
+                    f.write(json.dumps([tip, date], separators=(',', ':')) + '\n')
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Eroare salvare evenimente actor: {e}")
+
+    @classmethod
+    def reia(cls, evenimente):
+        """Un actor nou, dus prin aceleasi evenimente; returneaza (actor, comenzi)"""
+        actor = cls()
+        comenzi = []
+        for tip, date in evenimente:
+            comenzi.extend(actor.trimite(tip, **date))
+        return actor, comenzi
+
+    def statistici(self):
+        return {
+            'evenimente': len(self.log),
+            'ignorate': self.ignorate,
+            'sursa': self.sursa_activa,
+            'erori_consecutive': self.erori_consecutive,
+        }
+
+    # ---------- evenimente ----------
+    def _la_profil(self, abonamente, sala=None, poate_trimite=False):
+        self.abonamente = list(abonamente)
+        self.sala = sala
+        self.poate_trimite = poate_trimite
+        # Prima stare dupa schimbarea profilului reafiseaza ecranul
+        self.asteapta_prima_stare = True
+        if self.ultima_stare is None:
+            return []
+        return self._evalueaza(self.ultima_stare)
+
+    def _la_sursa(self, sursa, seq=0):
+        self.sursa_activa = sursa
+        self.ultima_secventa[sursa] = seq
+        return []
+
+    def _la_raspuns(self, sursa, seq, modificat=True, data=None, primit_la=None):
+        if not self._la_zi(sursa, seq):
+            return []
+        self.erori_consecutive = 0
+        comenzi = []
+        if sursa == 'poll':
+            comenzi.append((ARATA_CONEXIUNE, {'conectat': True, 'eroare': None}))
+        # 304 - starea nu s-a schimbat, nu mai evaluam nimic
+        if modificat:
+            self.ultima_stare = data
+            comenzi.extend(self._evalueaza(data, primit_la))
+        return comenzi
+
+    def _la_eroare(self, sursa, seq, mesaj=None):
+        if not self._la_zi(sursa, seq):
+            return []
+        self.erori_consecutive += 1
+        return [(ARATA_CONEXIUNE, {'conectat': False, 'eroare': mesaj})]
+
+    def _la_conexiune(self, conectat, eroare=None):
+        return [(ARATA_CONEXIUNE, {'conectat': conectat, 'eroare': eroare})]
+
+    def _la_alerta_trimisa(self, sala, alerta_id):
+        self.sunt_expeditor = True
+        self.id_alerta_trimisa = alerta_id
+        return []
+
+    def _la_trimitere_esuata(self, alerta_id):
+        if alerta_id == self.id_alerta_trimisa:
+            self.sunt_expeditor = False
+        return []
+
+    def _la_oprire_ceruta(self):
+        # Dublu click sau alerta deja disparuta
+        if self.oprire_in_curs or not self.alerta_activa:
+            return []
+        self.oprire_in_curs = (self.sala_alerta, self.alerta_id)
+        self.alerte_oprite_local[self.sala_alerta] = (self.alerta_id, self.alerta_nr)
+        return [
+            (TACI, {}),
+            (SCRIE_OPRIRE, {'sala': self.sala_alerta, 'alerta_id': self.alerta_id, 'nr': self.alerta_nr,
+                            'expeditor': self.expeditor, 'era_expeditor': self.sunt_expeditor}),
+        ]
+
+    def _la_oprire_terminata(self, sala, alerta_id):
+        if self.oprire_in_curs != (sala, alerta_id):
+            return []
+        self.oprire_in_curs = None
+        comenzi = self._normal()
+        # Starea primita in timpul opririi: poate alta sala e inca in alerta
+        if self.ultima_stare is not None:
+            comenzi.extend(self._evalueaza(self.ultima_stare))
+        return comenzi
+
+    def _la_oprire_respinsa(self, sala, alerta_id):
+        if self.oprire_in_curs != (sala, alerta_id):
+            return []
+        self.oprire_in_curs = None
+        # Pentru ceilalti alerta e inca activa: nu o mai ascundem nici aici
+        self.alerte_oprite_local.pop(sala, None)
+        comenzi = self._normal()
+        if self.ultima_stare is not None:
+            comenzi.extend(self._evalueaza(self.ultima_stare))
+        return comenzi
+
+    # ---------- interne ----------
+    def _la_zi(self, sursa, seq):
+        """False pentru un raspuns vechi sau de la o sursa inlocuita"""
+        if sursa != self.sursa_activa or seq <= self.ultima_secventa.get(sursa, 0):
+            self.ignorate += 1
+            return False
+        self.ultima_secventa[sursa] = seq
+        return True
+
+    def _evalueaza(self, data, primit_la=None):
+        # In timpul opririi nu schimbam ecranul; starea se reevalueaza la final
+        if self.oprire_in_curs:
+            return []
+
+        # Doar salile urmarite; o oprire a noastra care inca asteapta in
+        # jurnal inseamna ca alerta acelei sali e deja oprita aici
+        active = {
+            sala: stare for sala, stare in sali_urmarite(data, self.abonamente).items()
+            if stare.get('status') == True and not self._oprita_local(sala, stare)
+        }
+
+        comenzi = []
+        if active:
+            # Ramanem pe sala afisata cat timp e in alerta; altfel luam cea mai veche alerta
+            sala = self.sala_alerta if self.sala_alerta in active else min(
+                active, key=lambda s: active[s].get('trimis_la') or 0)
+            stare = active[sala]
+            if self.alerta_activa and (sala != self.sala_alerta or numar_alerta(stare) > self.alerta_nr):
+                # Alerta afisata s-a oprit, dar alta sala e inca in alerta -
+                # sau pe aceeasi sala a pornit intre timp alta alerta
+                comenzi.extend(self._normal())
+            if not self.alerta_activa:
+                comenzi.append(self._alerta(sala, stare, len(active) - 1, primit_la))
+        elif self.alerta_activa:
+            comenzi.extend(self._normal())
+        elif self.asteapta_prima_stare:
+            comenzi.append((PRIMA_STARE, {}))
+        self.asteapta_prima_stare = False
+        return comenzi
+
+    def _oprita_local(self, sala, stare):
+        """Alerta din stare e cea oprita de noi (sau una si mai veche)"""
+        if sala not in self.alerte_oprite_local:
+            return False
+        alerta_id, nr = self.alerte_oprite_local[sala]
+        if nr and numar_alerta(stare):
+            return numar_alerta(stare) <= nr
+        return bool(stare.get('id')) and stare.get('id') == alerta_id
+
+    def _alerta(self, sala, stare, alte_sali, primit_la):
+        self.alerta_activa = True
+        self.sala_alerta = sala
+        self.alerta_id = stare.get('id')
+        self.alerta_nr = numar_alerta(stare)
+        self.expeditor = stare.get('cine', 'Necunoscut')
+        propria = sala == self.sala and (self.sunt_expeditor or self.poate_trimite)
+        return (ARATA_ALERTA, {
+            'sala': sala,
+            'cine': self.expeditor,
+            'alte_sali': alte_sali,
+            'propria': propria,
+            # Propria alerta nu intra in statistica receptorilor
+            'stare': stare if stare.get('id') != self.id_alerta_trimisa else None,
+            'primit_la': primit_la,
+        })
+
+    def _normal(self):
+        if not self.alerta_activa:
+            return []
+        self.alerta_activa = False
+        self.sala_alerta = None
+        self.alerta_id = None
+        self.alerta_nr = 0
+        self.expeditor = ''
+        self.sunt_expeditor = False
+        return [(ARATA_NORMAL, {})]
+
+
+def citeste_log(cale):
+    with open(cale, 'r') as f:
+        return [tuple(json.loads(linie)) for linie in f if linie.strip()]
+
+
+if __name__ == '__main__':
+    actor, comenzi = ActorAlerta.reia(citeste_log(sys.argv[1]))
+    for comanda, date in comenzi:
+        print(comanda, date)
+    print(actor.statistici())
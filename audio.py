@@ -0,0 +1,201 @@
+"""
+Sunetul de alarma: fisierul se alege si se decodeaza o singura data per
+proces, apoi alarma se reda in bucla dintr-o mostra PCM tinuta in memorie.
+
+Pe Android folosim SoundPool: mostra e decodata la incarcare, iar play()
+doar porneste un stream din memorie, fara sa mai porneasca un decodor MP3
+ca MediaPlayer. Pe desktop folosim SoundLoader-ul Kivy; pentru WAV,
+SDL2 tine deja tot fisierul decodat in memorie.
+
+alarm.wav (PCM 16 bit, mono, 48 kHz, cateva secunde, capete netezite
+pentru bucla) se genereaza din alarm.mp3 la build:
+    python tools/converteste_alarma.py
+Fara el, se foloseste direct alarm.mp3.
+"""
+import os
+import threading
+import time
+from kivy.utils import platform
+
+DIRECTOR = os.path.dirname(os.path.abspath(__file__))
+
+# In ordinea preferintei: PCM gata decodat, apoi MP3-ul original
+FISIERE_ALARMA = ('alarm.wav', 'alarm.mp3')
+
+# Cat asteptam dupa SoundPool sa termine decodarea
+TIMEOUT_INCARCARE = 10
+
+
+def gaseste_fisier():
+    for nume in FISIERE_ALARMA:
+        for director in (DIRECTOR, os.getcwd()):
+            cale = os.path.join(director, nume)
+            if os.path.exists(cale):
+                return cale
+    return None
+
+
+class _RedareSoundPool:
+    """Mostra decodata in SoundPool, redata cu loop=-1 (la nesfarsit)"""
+
+    def __init__(self, cale):
+        from jnius import autoclass, PythonJavaClass, java_method
+
+        SoundPoolBuilder = autoclass('android.media.SoundPool$Builder')
+        AudioAttributes = autoclass('android.media.AudioAttributes')
+        AudioAttributesBuilder = autoclass('android.media.AudioAttributes$Builder')
+
+        gata = threading.Event()
+
+        class LaIncarcare(PythonJavaClass):
+            __javainterfaces__ = ['android/media/SoundPool$OnLoadCompleteListener']
+            __javacontext__ = 'app'
+
+            def __init__(self):
+                super().__init__()
+                self.status = None
+
+            @java_method('(Landroid/media/SoundPool;II)V')
+            def onLoadComplete(self, pool, mostra, status):
+                self.status = status
+                gata.set()
+
+        # Acelasi stream ca sunetul de pana acum, deci acelasi buton de volum
+        atribute = AudioAttributesBuilder() \
+            .setUsage(AudioAttributes.USAGE_MEDIA) \
+            .setContentType(AudioAttributes.CONTENT_TYPE_SONIFICATION) \
+            .build()
+        self.pool = SoundPoolBuilder().setMaxStreams(1).setAudioAttributes(atribute).build()
+
+        # Referinta pastrata: altfel listener-ul poate fi colectat inainte de apel
+        self._la_incarcare = LaIncarcare()
+        self.pool.setOnLoadCompleteListener(self._la_incarcare)
+        self.mostra = self.pool.load(cale, 1)
+
+        if not gata.wait(TIMEOUT_INCARCARE) or self._la_incarcare.status != 0:
+            raise Exception(f"SoundPool nu a putut incarca {cale}")
+        self._stream = 0
+
+    def porneste(self):
+        self._stream = self.pool.play(self.mostra, 1.0, 1.0, 1, -1, 1.0)
+        return self._stream != 0
+
+    def opreste(self):
+        if self._stream:
+            self.pool.stop(self._stream)
+            self._stream = 0
+
+
+class _RedareKivy:
+    def __init__(self, cale):
+        from kivy.core.audio import SoundLoader
+
+        self.sunet = SoundLoader.load(cale)
+        if not self.sunet:
+            raise Exception(f"SoundLoader nu a putut incarca {cale}")
+        self.sunet.loop = True
+        self.sunet.volume = 1.0
+
+    def porneste(self):
+        self.sunet.play()
+        return self.sunet.state == 'play'
+
+    def opreste(self):
+        self.sunet.stop()
+
+
+class SunetAlarma:
+    """Un singur sunet de alarma per proces; porneste()/opreste() din orice thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._redare = None
+        self._incarcat = False
+        self._porneste_dupa_incarcare = False
+        self._cerut_la = None
+        self.activ = False
+
+        self.fisier = None
+        self.backend = None
+        self.decodare_ms = None
+        self.pornire_ms = None   # de la cererea de redare pana la stream-ul pornit
+
+    def incarca(self):
+        """Alege fisierul si il decodeaza; apelurile repetate nu mai fac nimic"""
+        with self._lock:
+            if self._incarcat:
+                return
+            self._incarcat = True
+
+        # Decodarea merge fara lock, ca porneste() sa nu blocheze interfata
+        fisier = gaseste_fisier()
+        if not fisier:
+            print("Nu s-a gasit fisier alarm.wav/mp3")
+            return
+
+        start = time.perf_counter()
+        redare = None
+        backends = [_RedareKivy]
+        if platform == 'android':
+            backends.insert(0, _RedareSoundPool)
+        for backend in backends:
+            try:
+                redare = backend(fisier)
+                break
+            except Exception as e:
+                print(f"Eroare incarcare sunet ({backend.__name__}): {e}")
+        decodare_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.fisier = fisier
+            self.decodare_ms = decodare_ms
+            if redare:
+                self._redare = redare
+                self.backend = type(redare).__name__
+                # Alarma a fost ceruta cat timp se decoda
+                if self._porneste_dupa_incarcare:
+                    self._porneste()
+
+    def incarca_async(self):
+        threading.Thread(target=self.incarca, daemon=True).start()
+
+    def porneste(self):
+        with self._lock:
+            self._cerut_la = time.perf_counter()
+            if not self._redare:
+                # Inca se decodeaza: pornim imediat ce e gata
+                self._porneste_dupa_incarcare = True
+                return False
+            return self._porneste()
+
+    def _porneste(self):
+        self._porneste_dupa_incarcare = False
+        try:
+            self.activ = self._redare.porneste()
+        except Exception as e:
+            print(f"Eroare redare alarma: {e}")
+            self.activ = False
+        self.pornire_ms = (time.perf_counter() - self._cerut_la) * 1000
+        return self.activ
+
+    def opreste(self):
+        with self._lock:
+            self._porneste_dupa_incarcare = False
+            if self._redare and self.activ:
+                try:
+                    self._redare.opreste()
+                except Exception as e:
+                    print(f"Eroare oprire alarma: {e}")
+            self.activ = False
+
+    def statistici(self):
+        return {
+            'fisier': os.path.basename(self.fisier) if self.fisier else None,
+            'backend': self.backend,
+            'decodare_ms': round(self.decodare_ms, 1) if self.decodare_ms is not None else None,
+            'pornire_ms': round(self.pornire_ms, 1) if self.pornire_ms is not None else None,
+        }
+
+
+# Sunetul comun al aplicatiei
+alarma = SunetAlarma()
@@ -23,7 +23,7 @@ source.include_exts = py,png,jpg,kv,atlas,mp3,wav
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-#source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = tools, tests, bin, venv
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -0,0 +1,144 @@
+"""
+Consumul de resurse al monitorizarii (serviciul Android sau daemonul
+desktop), adunat pe ore, ca sa comparam pe telefoane reale modurile
+stream/poll si intervalele de poll.
+
+Pentru fiecare ora: cicluri de poll, evenimente din stream, cereri HTTP,
+octeti trimisi si primiti (HTTP, fara TLS/TCP), timpul cu wake lock-ul
+partial tinut, timpul de decodare JSON, notificarile afisate si trezirile
+ecranului. Orele stau in memorie si se scriu atomic in consum_serviciu.json
+cel mult o data la INTERVAL_SALVARE secunde sau cand interfata cere
+({"tip": "consum"} pe canalul IPC), ca sa nu adaugam noi treziri de disc.
+
+Afisare: python consum.py
+"""
+import json
+import os
+import threading
+import time
+
+DIRECTOR = os.path.dirname(os.path.abspath(__file__))
+CALE_CONSUM = os.path.join(DIRECTOR, 'consum_serviciu.json')
+
+CAMPURI = ('cicluri', 'evenimente_stream', 'cereri', 'octeti_trimisi', 'octeti_primiti',
+           'wake_lock_ms', 'parsare_ms', 'notificari', 'treziri_ecran')
+
+# Cate ore pastram in fisier (3 zile)
+ORE_PASTRATE = 72
+
+INTERVAL_SALVARE = 300
+
+
+def cheie_ora(moment):
+    return time.strftime('%Y-%m-%d %H:00', time.localtime(moment))
+
+
+class ContorConsum:
+    def __init__(self, cale=CALE_CONSUM, ceas=time.time):
+        self.cale = cale
+        self.ceas = ceas
+        self._lock = threading.Lock()
+        self._ore = {}
+        self._wake_lock_din = None
+        self._salvat_la = ceas()
+        self._incarca()
+
+    def adauga(self, camp, valoare=1):
+        with self._lock:
+            ora = self._ore.setdefault(cheie_ora(self.ceas()), dict.fromkeys(CAMPURI, 0))
+            ora[camp] += valoare
+
+    def wake_lock_pornit(self):
+        with self._lock:
+            if self._wake_lock_din is None:
+                self._wake_lock_din = self.ceas()
+
+    def wake_lock_oprit(self):
+        with self._lock:
+            self._acumuleaza_wake_lock()
+            self._wake_lock_din = None
+
+    def _acumuleaza_wake_lock(self):
+        """Timpul cu wake lock-ul tinut de la ultima acumulare, impartit pe orele lui"""
+        if self._wake_lock_din is None:
+            return
+        acum = self.ceas()
+        inceput = self._wake_lock_din
+        while inceput < acum:
+            sfarsit = min(acum, (inceput // 3600 + 1) * 3600)
+            ora = self._ore.setdefault(cheie_ora(inceput), dict.fromkeys(CAMPURI, 0))
+            ora['wake_lock_ms'] += (sfarsit - inceput) * 1000
+            inceput = sfarsit
+        self._wake_lock_din = acum
+
+    def ore(self):
+        """Lista (ora, contoare), cea mai recenta prima; include ora in curs"""
+        with self._lock:
+            self._acumuleaza_wake_lock()
+            return [(ora, dict(contoare)) for ora, contoare in sorted(self._ore.items(), reverse=True)]
+
+    def salveaza_daca_e_cazul(self):
+        if self.ceas() - self._salvat_la >= INTERVAL_SALVARE:
+            self.salveaza()
+
+    def salveaza(self):
+        with self._lock:
+            self._acumuleaza_wake_lock()
+            for ora in sorted(self._ore)[:-ORE_PASTRATE]:
+                del self._ore[ora]
+            ore = {ora: _rotunjite(contoare) for ora, contoare in self._ore.items()}
+            self._salvat_la = self.ceas()
+        date = {'actualizat_la': time.strftime('%Y-%m-%d %H:%M:%S'), 'ore': ore}
+        temporar = f"{self.cale}.tmp"
+        try:
+            with open(temporar, 'w') as f:
+                json.dump(date, f)
+            os.replace(temporar, self.cale)
+        except OSError as e:
+            print(f"Eroare salvare consum: {e}")
+
+    def _incarca(self):
+        _, ore = citeste_consum(self.cale)
+        for ora, contoare in ore:
+            self._ore[ora] = dict(dict.fromkeys(CAMPURI, 0), **contoare)
+
+
+def _rotunjite(contoare):
+    return {camp: round(valoare, 1) if isinstance(valoare, float) else valoare
+            for camp, valoare in contoare.items()}
+
+
+def citeste_consum(cale=CALE_CONSUM):
+    """(actualizat_la, lista (ora, contoare)) din fisier, cea mai recenta ora prima"""
+    try:
+        with open(cale, 'r') as f:
+            date = json.load(f)
+    except (OSError, ValueError):
+        return None, []
+    ore = date.get('ore', {})
+    return date.get('actualizat_la'), [(ora, ore[ora]) for ora in sorted(ore, reverse=True)]
+
+
+def total(ore):
+    """Suma contoarelor peste orele date"""
+    suma = dict.fromkeys(CAMPURI, 0)
+    for _, contoare in ore:
+        for camp in CAMPURI:
+            suma[camp] += contoare.get(camp, 0)
+    return _rotunjite(suma)
+
+
+def _afiseaza(cale):
+    actualizat_la, ore = citeste_consum(cale)
+    if not ore:
+        print(f"Nicio masuratoare in {cale}")
+        return
+    print(f"Actualizat la {actualizat_la}")
+    print(f"{'ora':16s} " + " ".join(f"{camp:>17s}" for camp in CAMPURI))
+    for ora, contoare in ore:
+        print(f"{ora:16s} " + " ".join(f"{contoare.get(camp, 0):17}" for camp in CAMPURI))
+    print(f"{'total':16s} " + " ".join(f"{valoare:17}" for valoare in total(ore).values()))
+
+
+if __name__ == '__main__':
+    _afiseaza(CALE_CONSUM)
@@ -0,0 +1,173 @@
+"""
+Daemonul de monitorizare pe Linux (ecrane de perete, receptie), aceeasi
+bucla ca serviciul Android (monitor.py) cu backend-uri desktop:
+- notificari prin notify-send (libnotify), sau doar in consola;
+- alarm.mp3 in bucla printr-un player extern (mpv, ffplay sau mpg123),
+  oprit cand nu mai e nicio sala in alerta;
+- ecranul se trezeste cu "xset dpms force on", daca exista un server X.
+
+Fara interfata Kivy si fara dependinte noi: lipsa unui program se vede
+o data in consola si se trece mai departe.
+
+Rulare:
+    python desktop.py                         # salile din profilul salvat
+    python desktop.py --sali sala_minimis,receptie --mod poll
+    python desktop.py --url http://127.0.0.1:8765 --consola --fara-sunet
+"""
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import threading
+from monitor import MonitorAlerte, FIREBASE_BAZA_URL, MOD_MONITORIZARE
+
+DIRECTOR = os.path.dirname(os.path.abspath(__file__))
+CALE_ALARMA = os.path.join(DIRECTOR, 'alarm.mp3')
+
+# In ordinea preferintei; fiecare reda fisierul in bucla, fara fereastra
+PLAYERE = (
+    ('mpv', '--no-video', '--really-quiet', '--loop-file=inf'),
+    ('ffplay', '-nodisp', '-loglevel', 'quiet', '-loop', '0'),
+    ('mpg123', '-q', '--loop', '-1'),
+)
+
+
+def _ruleaza(comanda):
+    """Porneste o comanda fara sa astepte dupa ea; False daca n-a pornit"""
+    try:
+        subprocess.Popen(comanda, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL)
+        return True
+    except OSError as e:
+        print(f"Eroare pornire {comanda[0]}: {e}")
+        return False
+
+
+class NotificatorLinux:
+    def __init__(self, sunet=True, desktop=True, cale_alarma=CALE_ALARMA):
+        self.sunet = sunet
+        self.notify_send = shutil.which('notify-send') if desktop else None
+        self.cale_alarma = cale_alarma
+        self.player = next((p for p in PLAYERE if shutil.which(p[0])), None)
+        self._redare = None
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def porneste(self):
+        if not self.notify_send:
+            print("Notificari: doar in consola")
+        if self.sunet and not self.player:
+            print(f"Sunet: niciun player gasit ({', '.join(p[0] for p in PLAYERE)})")
+        print("Monitorizare activa")
+
+    def opreste(self):
+        with self._lock:
+            self._active.clear()
+            self._opreste_sunet()
+
+    def alerta(self, expeditor, sala=None):
+        self._notifica("!!! ALERTA !!!", f"Alerta de la: {expeditor}", sala, 'critical')
+        with self._lock:
+            self._active.add(sala)
+            if self.sunet:
+                self._porneste_sunet()
+
+    def alerta_silentioasa(self, expeditor, sala=None):
+        self._notifica("Alerta (Silentios)", f"Alerta de la: {expeditor}", sala, 'normal')
+        with self._lock:
+            self._active.add(sala)
+
+    def sterge_alerta(self, sala=None):
+        with self._lock:
+            if sala not in self._active:
+                return
+            self._active.discard(sala)
+            if not self._active:
+                self._opreste_sunet()
+        print(f"[{sala}] Alerta oprita")
+
+    def _notifica(self, titlu, text, sala, urgenta):
+        print(f"[{sala}] {titlu} {text}\a", flush=True)
+        if self.notify_send:
+            _ruleaza([self.notify_send, '-u', urgenta, '-a', 'Alerta Sala', '-c', 'alarm',
+                      titlu, f"{text} ({sala})" if sala else text])
+
+    def _porneste_sunet(self):
+        if self._redare is not None and self._redare.poll() is None:
+            return
+        if not self.player or not os.path.exists(self.cale_alarma):
+            return
+        try:
+            self._redare = subprocess.Popen(list(self.player) + [self.cale_alarma],
+                                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                            stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print(f"Eroare redare alarma: {e}")
+
+    def _opreste_sunet(self):
+        if self._redare is None:
+            return
+        self._redare.terminate()
+        try:
+            self._redare.wait(2)
+        except subprocess.TimeoutExpired:
+            self._redare.kill()
+        self._redare = None
+
+
+class EnergieLinux:
+    """Pe desktop nu tinem CPU-ul treaz; doar aprindem monitorul la alerta"""
+
+    def __init__(self):
+        self.xset = shutil.which('xset') if os.environ.get('DISPLAY') else None
+
+    def tine_treaz(self):
+        pass
+
+    def elibereaza(self):
+        pass
+
+    def trezeste_ecran(self):
+        if self.xset:
+            _ruleaza([self.xset, 'dpms', 'force', 'on'])
+
+    def ecran_pornit(self):
+        # Un ecran de perete e mereu "in uz": pastram intervalul de poll activ
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitorizare alerte pe Linux, fara interfata")
+    parser.add_argument('--url', default=FIREBASE_BAZA_URL, help="baza Firebase (sau rtdb_local)")
+    parser.add_argument('--mod', choices=('stream', 'poll'), default=MOD_MONITORIZARE)
+    parser.add_argument('--sali', help="salile urmarite, separate prin virgula; implicit din profil")
+    parser.add_argument('--consola', action='store_true', help="fara notify-send, doar in consola")
+    parser.add_argument('--fara-sunet', action='store_true')
+    parser.add_argument('--fara-ipc', action='store_true', help="nu publica starea pe socket-ul local")
+    args = parser.parse_args()
+
+    abonamente = [s.strip() for s in args.sali.split(',') if s.strip()] if args.sali else None
+    monitor = MonitorAlerte(
+        NotificatorLinux(sunet=not args.fara_sunet, desktop=not args.consola), EnergieLinux(),
+        url_baza=args.url.rstrip('/'), mod=args.mod, abonamente=abonamente, ipc=not args.fara_ipc,
+    )
+    print(f"Sali urmarite: {monitor.abonamente()} ({args.mod})")
+
+    # Bucla ruleaza pe alt thread: un semnal nu poate intrerupe citirea
+    # blocanta a stream-ului de pe thread-ul principal
+    oprire = threading.Event()
+    signal.signal(signal.SIGTERM, lambda semnal, frame: oprire.set())
+    signal.signal(signal.SIGINT, lambda semnal, frame: oprire.set())
+
+    fir = threading.Thread(target=monitor.run, daemon=True)
+    fir.start()
+    while fir.is_alive() and not oprire.wait(1):
+        pass
+    print("Oprire...")
+    monitor.stop()
+    fir.join(5)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Efectele unei alerte pe telefon: sunetul, vibratia, pulsul butonului de
+oprire si trezirea ecranului, pornite si oprite impreuna.
+
+- Sunetul e deja o bucla in SoundPool/SDL (audio.py) - un singur apel.
+- Vibratia e un tipar hardware repetat (Vibrator.vibrate cu repeat=0 prin
+  plyer), tot un singur apel; inainte, un Clock la 2 secunde cerea cate o
+  vibratie de 1 secunda.
+- Pulsul butonului e singurul lucru care mai ruleaza pe thread-ul Kivy: un
+  singur eveniment Clock, la PERIOADA_PULS secunde.
+
+opreste() anuleaza tot, indiferent ce a apucat sa porneasca; apelurile
+repetate nu fac nimic.
+"""
+import time
+from kivy.clock import Clock
+from audio import alarma
+
+# Tiparul vibratiei in secunde: pauza, vibratie, pauza - repetat de la inceput
+TIPAR_VIBRATIE = (0, 1, 1)
+PERIOADA_PULS = 0.8
+OPACITATE_PULS = (1, 0.7)
+
+
+class EfecteAlerta:
+    def __init__(self, trezeste_ecran=None):
+        self.trezeste_ecran = trezeste_ecran
+        self.activ = False
+        self.sunet_activ = False
+        self._vibratie = False
+        self._buton = None
+        self._puls = None
+        self._faza = 0
+
+        # Apelurile Clock programate de efecte, ca sa vedem cate treziri
+        # ale thread-ului Kivy costa un minut de alerta
+        self.apeluri = 0
+        self.secunde_active = 0.0
+        self._pornit_la = None
+
+    def porneste(self, buton_puls=None, sunet=True):
+        """Porneste efectele; returneaza True daca sunetul a pornit imediat"""
+        self.opreste()
+        self.activ = True
+        self._pornit_la = time.monotonic()
+
+        pornit = False
+        if sunet:
+            self.sunet_activ = True
+            # Daca sunetul inca se decodeaza, porneste singur cand e gata
+            pornit = alarma.porneste()
+            self._vibreaza()
+
+        if buton_puls is not None:
+            self._buton = buton_puls
+            self._faza = 0
+            self._puls = Clock.schedule_interval(self._pulseaza, PERIOADA_PULS)
+
+        if self.trezeste_ecran:
+            self.trezeste_ecran()
+        return pornit
+
+    def taci(self):
+        """Sunet si vibratie oprite; pulsul continua (mute, sau oprirea a inceput)"""
+        if not self.sunet_activ:
+            return
+        self.sunet_activ = False
+        alarma.opreste()
+        if self._vibratie:
+            self._vibratie = False
+            try:
+                from plyer import vibrator
+                vibrator.cancel()
+            except Exception as e:
+                print(f"Eroare oprire vibratie: {e}")
+
+    def opreste(self):
+        self.taci()
+        if self._puls is not None:
+            self._puls.cancel()
+            self._puls = None
+        if self._buton is not None:
+            self._buton.opacity = OPACITATE_PULS[0]
+            self._buton = None
+        if self._pornit_la is not None:
+            self.secunde_active += time.monotonic() - self._pornit_la
+            self._pornit_la = None
+        self.activ = False
+
+    def _vibreaza(self):
+        try:
+            from plyer import vibrator
+            vibrator.pattern(pattern=TIPAR_VIBRATIE, repeat=0)
+            self._vibratie = True
+        except NotImplementedError:
+            print("Bzzzt! (Vibratie simulata pe PC)")
+        except Exception as e:
+            print(f"Eroare vibratie: {e}")
+
+    def _pulseaza(self, dt):
+        self.apeluri += 1
+        self._faza = 1 - self._faza
+        self._buton.opacity = OPACITATE_PULS[self._faza]
+
+    def statistici(self):
+        secunde = self.secunde_active
+        if self._pornit_la is not None:
+            secunde += time.monotonic() - self._pornit_la
+        return {
+            'apeluri': self.apeluri,
+            'minute_alerta': round(secunde / 60, 2),
+            'apeluri_pe_minut': round(self.apeluri / (secunde / 60), 1) if secunde else 0,
+        }
@@ -0,0 +1,293 @@
+"""
+Client HTTP comun pentru toate cererile catre Firebase.
+Foloseste o singura sesiune cu conexiuni keep-alive, ca sa nu platim
+DNS + TCP + TLS la fiecare interogare.
+"""
+import random
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+# Timeout-uri separate (secunde): conectare scurta, citire mai lunga
+TIMEOUT_CONECTARE = 5
+TIMEOUT_CITIRE = 10
+
+# Conexiuni pastrate deschise per host
+MARIME_POOL = 4
+
+# Cat timp pastram o adresa rezolvata
+DNS_TTL = 300
+
+# Alfabetul push ID-urilor Firebase, in ordinea ASCII
+PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+
+class _DnsCache:
+    """Cache pentru socket.getaddrinfo, doar pentru host-urile Firebase"""
+
+    def __init__(self):
+        self.hosturi = set()
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._original = None
+
+    def instaleaza(self):
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self._getaddrinfo
+
+    def _getaddrinfo(self, host, *args, **kwargs):
+        if host not in self.hosturi:
+            return self._original(host, *args, **kwargs)
+
+        cheie = (host, args, tuple(sorted(kwargs.items())))
+        acum = time.monotonic()
+        with self._lock:
+            intrare = self._cache.get(cheie)
+        if intrare and acum - intrare[0] < DNS_TTL:
+            return intrare[1]
+
+        rezultat = self._original(host, *args, **kwargs)
+        with self._lock:
+            self._cache[cheie] = (acum, rezultat)
+        return rezultat
+
+
+_dns_cache = _DnsCache()
+
+
+class FirebaseClient:
+    """Sesiune HTTP partajata, cu pool de conexiuni si contoare de timp"""
+
+    def __init__(self, marime_pool=MARIME_POOL,
+                 timeout_conectare=TIMEOUT_CONECTARE, timeout_citire=TIMEOUT_CITIRE):
+        self.timeout = (timeout_conectare, timeout_citire)
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=marime_pool,
+            max_retries=0
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self.statistici = {}
+
+        # consum.ContorConsum, doar in procesul care monitorizeaza (serviciul)
+        self.contor = None
+
+        _dns_cache.instaleaza()
+
+    def _cerere(self, metoda, url, **kwargs):
+        _dns_cache.hosturi.add(urlsplit(url).hostname)
+        kwargs.setdefault('timeout', self.timeout)
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(metoda, url, **kwargs)
+        finally:
+            self._inregistreaza(metoda, time.perf_counter() - start)
+        if self.contor is not None:
+            self._numara_octeti(response, kwargs.get('stream', False))
+        return response
+
+    def _numara_octeti(self, response, stream):
+        """Octetii HTTP ai cererii (aproximativ: fara TLS si fara header-ele puse de http.client)"""
+        cerere = response.request
+        trimisi = len(cerere.method) + len(cerere.path_url) + 11
+        trimisi += sum(len(k) + len(v) + 4 for k, v in cerere.headers.items())
+        trimisi += len(cerere.body or b'')
+        primiti = 15 + len(response.reason or '')
+        primiti += sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        # Corpul unui stream se numara pe masura ce soseste (numara_primiti)
+        if not stream:
+            primiti += len(response.content)
+        self.contor.adauga('octeti_trimisi', trimisi)
+        self.contor.adauga('octeti_primiti', primiti)
+
+    def numara_primiti(self, octeti):
+        if self.contor is not None:
+            self.contor.adauga('octeti_primiti', octeti)
+
+    def json(self, response):
+        """response.json(), cu timpul de decodare numarat in contor"""
+        start = time.perf_counter()
+        try:
+            return response.json()
+        finally:
+            self.numara_parsare(time.perf_counter() - start)
+
+    def numara_parsare(self, secunde):
+        if self.contor is not None:
+            self.contor.adauga('parsare_ms', secunde * 1000)
+
+    def _inregistreaza(self, metoda, durata):
+        if self.contor is not None:
+            self.contor.adauga('cereri')
+        with self._lock:
+            s = self.statistici.setdefault(metoda, {'cereri': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            s['cereri'] += 1
+            s['total_ms'] += durata * 1000
+            s['max_ms'] = max(s['max_ms'], durata * 1000)
+
+    def get(self, url, **kwargs):
+        return self._cerere('GET', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self._cerere('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self._cerere('PATCH', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._cerere('POST', url, **kwargs)
+
+    def incalzeste(self, url):
+        """Deschide din timp o conexiune (DNS + TLS) ca prima cerere reala sa fie rapida"""
+        try:
+            # shallow=true -> raspuns minim, doar cheile nodului
+            self.get(url, params={'shallow': 'true'}).close()
+        except Exception as e:
+            print(f"Eroare incalzire conexiune: {e}")
+
+    def incalzeste_async(self, url):
+        threading.Thread(target=self.incalzeste, args=(url,), daemon=True).start()
+
+    def conexiuni_deschise(self):
+        """Numarul de conexiuni TCP/TLS create de la pornire"""
+        total = 0
+        pools = self.adapter.poolmanager.pools
+        for cheie in pools.keys():
+            try:
+                total += getattr(pools[cheie], 'num_connections', 0)
+            except KeyError:
+                pass
+        return total
+
+    def rezumat_statistici(self):
+        """Returneaza statisticile ca dict: metoda -> cereri, medie_ms, max_ms"""
+        with self._lock:
+            rezumat = {}
+            for metoda, s in self.statistici.items():
+                rezumat[metoda] = {
+                    'cereri': s['cereri'],
+                    'medie_ms': round(s['total_ms'] / s['cereri'], 1) if s['cereri'] else 0,
+                    'max_ms': round(s['max_ms'], 1),
+                }
+        rezumat['conexiuni_noi'] = self.conexiuni_deschise()
+        return rezumat
+
+
+class _GeneratorPushId:
+    """
+    Chei ca ale push() din SDK-urile Firebase: 8 caractere de timp (ms) +
+    12 aleatoare. In aceeasi milisecunda partea aleatoare doar creste,
+    deci cheile generate aici raman in ordine cronologica.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ultimul_ms = None
+        self._aleator = []
+
+    def genereaza(self, acum_ms=None):
+        acum = int(acum_ms if acum_ms is not None else time.time() * 1000)
+        with self._lock:
+            if acum == self._ultimul_ms:
+                i = len(self._aleator) - 1
+                while i >= 0 and self._aleator[i] == 63:
+                    self._aleator[i] = 0
+                    i -= 1
+                if i >= 0:
+                    self._aleator[i] += 1
+            else:
+                self._aleator = [random.randrange(64) for _ in range(12)]
+            self._ultimul_ms = acum
+            aleator = list(self._aleator)
+
+        timp = ""
+        for _ in range(8):
+            timp = PUSH_CHARS[acum % 64] + timp
+            acum //= 64
+        return timp + "".join(PUSH_CHARS[i] for i in aleator)
+
+
+_generator_push_id = _GeneratorPushId()
+
+
+def genereaza_push_id(acum_ms=None):
+    """Cheie noua pentru o lista Firebase, fara cerere POST la server"""
+    return _generator_push_id.genereaza(acum_ms)
+
+
+class CitireConditionala:
+    """
+    GET repetat pe acelasi URL folosind ETag-ul Firebase. Daca nodul nu s-a
+    schimbat, serverul raspunde 304 fara corp si nu mai decodam JSON-ul.
+    """
+
+    def __init__(self, client, url):
+        self.client = client
+        self.url = url
+        self.etag = None
+        self._ultima_marime = 0
+        self._start = time.monotonic()
+
+        self.cereri = 0
+        self.nemodificate = 0
+        self.bytes_primiti = 0
+        self.bytes_economisiti = 0
+
+    def reseteaza(self):
+        """Urmatoarea citire aduce din nou nodul complet"""
+        self.etag = None
+
+    def citeste(self):
+        """Returneaza (modificat, data); data e None cand modificat e False"""
+        headers = {'X-Firebase-ETag': 'true'}
+        if self.etag:
+            headers['if-none-match'] = self.etag
+
+        response = self.client.get(self.url, headers=headers)
+        self.cereri += 1
+
+        if response.status_code == 304:
+            self.nemodificate += 1
+            self.bytes_economisiti += self._ultima_marime
+            return False, None
+
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}")
+
+        corp = response.content
+        self.bytes_primiti += len(corp)
+        etag = response.headers.get('ETag')
+
+        # Unele raspunsuri vin cu 200 chiar daca ETag-ul e acelasi:
+        # macar sarim peste decodare si evaluare
+        if etag and etag == self.etag:
+            self.nemodificate += 1
+            return False, None
+
+        self.etag = etag
+        self._ultima_marime = len(corp)
+        return True, self.client.json(response)
+
+    def statistici(self):
+        ore = max((time.monotonic() - self._start) / 3600, 1 / 3600)
+        return {
+            'cereri': self.cereri,
+            'nemodificate': self.nemodificate,
+            'rata_hit': round(self.nemodificate / self.cereri, 3) if self.cereri else 0,
+            'bytes_primiti': self.bytes_primiti,
+            'bytes_economisiti': self.bytes_economisiti,
+            'bytes_economisiti_pe_ora': int(self.bytes_economisiti / ore),
+        }
+
+
+# Un singur client per proces (aplicatie sau serviciu)
+client = FirebaseClient()
@@ -0,0 +1,289 @@
+"""
+Canal local intre serviciul din background si interfata Kivy.
+Serviciul este singurul care vorbeste cu Firebase si publica starea pe un
+socket Unix; interfata se aboneaza in loc sa faca propriul poll.
+
+Mesajele sunt linii JSON:
+    {"tip": "stare", "data": {...alerte.json...}, "seq": 12, "primit_la": 1700000000000.0}
+    {"tip": "conexiune", "conectat": false, "eroare": "Timeout"}
+    {"tip": "heartbeat", "conectat": true}
+In sens invers, interfata anunta serviciul cand a modificat setarile:
+    {"tip": "setari"}
+
+Mod test pe desktop (doua procese Linux obisnuite):
+    python ipc.py publica --url http://127.0.0.1:8765/alerte.json
+    python ipc.py asculta
+"""
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+
+# Fisierul socket-ului sta langa cod: pe Android, aplicatia si serviciul
+# ruleaza amandoua din files/app
+CALE_SOCKET = os.environ.get(
+    'ALERTA_IPC_SOCKET',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alerta.sock')
+)
+
+INTERVAL_HEARTBEAT = 5
+# Fara niciun mesaj atata timp, consideram serviciul oprit
+TIMEOUT_ABONAT = 15
+INTERVAL_RECONECTARE = 5
+
+
+def _codifica(mesaj):
+    return (json.dumps(mesaj, separators=(',', ':')) + '\n').encode()
+
+
+class PublicatorStare:
+    """Partea serviciului: accepta abonati si le trimite fiecare schimbare"""
+
+    def __init__(self, cale=CALE_SOCKET, la_mesaj=None):
+        self.cale = cale
+        self.la_mesaj = la_mesaj
+        self.conectat = False
+        self.eroare = None
+        self._ultima_stare = None
+        self._seq = 0
+        self._abonati = []
+        self._lock = threading.RLock()
+        self._running = False
+        self._server = None
+
+    def start(self):
+        # Un socket ramas de la o rulare anterioara ar bloca bind()
+        if os.path.exists(self.cale):
+            os.unlink(self.cale)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.cale)
+        os.chmod(self.cale, 0o600)
+        self._server.listen(4)
+        self._running = True
+
+        threading.Thread(target=self._accepta, daemon=True).start()
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+        try:
+            self._server.close()
+        except Exception:
+            pass
+        with self._lock:
+            for abonat in self._abonati:
+                abonat.close()
+            self._abonati = []
+        if os.path.exists(self.cale):
+            os.unlink(self.cale)
+
+    def publica_stare(self, data, primit_la=None):
+        """primit_la - momentul (ms, ceas local) in care serviciul a primit starea"""
+        with self._lock:
+            self._seq += 1
+            self._ultima_stare = {'tip': 'stare', 'data': data, 'seq': self._seq, 'primit_la': primit_la}
+            self._trimite(self._ultima_stare)
+
+    def publica_conexiune(self, conectat, eroare=None):
+        with self._lock:
+            if conectat == self.conectat and eroare == self.eroare:
+                return
+            self.conectat = conectat
+            self.eroare = eroare
+            self._trimite({'tip': 'conexiune', 'conectat': conectat, 'eroare': eroare})
+
+    def numar_abonati(self):
+        with self._lock:
+            return len(self._abonati)
+
+    def _accepta(self):
+        while self._running:
+            try:
+                conexiune, _ = self._server.accept()
+            except OSError:
+                return
+
+            # Un abonat blocat nu are voie sa blocheze serviciul
+            conexiune.settimeout(1)
+
+            # Abonatul nou primeste imediat starea curenta, inaintea oricarui
+            # mesaj publicat dupa el
+            with self._lock:
+                self._abonati.append(conexiune)
+                self._trimite_la(conexiune, _codifica(
+                    {'tip': 'conexiune', 'conectat': self.conectat, 'eroare': self.eroare}))
+                if self._ultima_stare:
+                    self._trimite_la(conexiune, _codifica(self._ultima_stare))
+
+            if self.la_mesaj:
+                threading.Thread(target=self._citeste, args=(conexiune,), daemon=True).start()
+
+    def _citeste(self, conexiune):
+        """Mesajele trimise de interfata catre serviciu"""
+        buffer = b""
+        try:
+            while self._running:
+                try:
+                    bucata = conexiune.recv(4096)
+                except socket.timeout:
+                    # Timeout-ul de 1s e pus pentru sendall; aici doar asteptam
+                    continue
+                if not bucata:
+                    return
+                buffer += bucata
+                while b"\n" in buffer:
+                    linie, buffer = buffer.split(b"\n", 1)
+                    self.la_mesaj(json.loads(linie))
+        except (OSError, ValueError):
+            pass
+
+    def _heartbeat(self):
+        while self._running:
+            time.sleep(INTERVAL_HEARTBEAT)
+            # Cu ultima eroare, altfel interfata ar pierde motivul deconectarii
+            with self._lock:
+                self._trimite({'tip': 'heartbeat', 'conectat': self.conectat, 'eroare': self.eroare})
+
+    def _trimite(self, mesaj):
+        date = _codifica(mesaj)
+        with self._lock:
+            for conexiune in list(self._abonati):
+                self._trimite_la(conexiune, date)
+
+    def _trimite_la(self, conexiune, date):
+        try:
+            conexiune.sendall(date)
+        except OSError:
+            with self._lock:
+                if conexiune in self._abonati:
+                    self._abonati.remove(conexiune)
+            conexiune.close()
+
+
+class AbonatStare:
+    """
+    Partea interfetei: primeste mesajele serviciului pe un thread propriu.
+    la_mesaj(mesaj) si la_schimbare_disponibilitate(disponibil) sunt apelate
+    de pe acel thread.
+    """
+
+    def __init__(self, la_mesaj, la_schimbare_disponibilitate, cale=CALE_SOCKET):
+        self.cale = cale
+        self.la_mesaj = la_mesaj
+        self.la_schimbare_disponibilitate = la_schimbare_disponibilitate
+        self.disponibil = False
+        self.ultima_stare = None
+        self._running = False
+        self._socket = None
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._bucla, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+        if self._socket:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+
+    def trimite(self, mesaj):
+        """Trimite un mesaj catre serviciu; ignorat daca serviciul nu e conectat"""
+        if not self.disponibil or not self._socket:
+            return False
+        try:
+            self._socket.sendall(_codifica(mesaj))
+            return True
+        except OSError:
+            return False
+
+    def _seteaza_disponibil(self, disponibil):
+        if disponibil != self.disponibil:
+            self.disponibil = disponibil
+            self.la_schimbare_disponibilitate(disponibil)
+
+    def _bucla(self):
+        while self._running:
+            try:
+                self._asculta()
+            except (OSError, ValueError):
+                pass
+            self._seteaza_disponibil(False)
+            if self._running:
+                time.sleep(INTERVAL_RECONECTARE)
+
+    def _asculta(self):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(TIMEOUT_ABONAT)
+        try:
+            self._socket.connect(self.cale)
+            self._seteaza_disponibil(True)
+
+            buffer = b""
+            while self._running:
+                bucata = self._socket.recv(4096)
+                if not bucata:
+                    return
+                buffer += bucata
+                while b"\n" in buffer:
+                    linie, buffer = buffer.split(b"\n", 1)
+                    mesaj = json.loads(linie)
+                    if mesaj.get('tip') == 'stare':
+                        self.ultima_stare = mesaj
+                    self.la_mesaj(mesaj)
+        finally:
+            self._socket.close()
+
+
+def _publica_desktop(url):
+    """Publicator de test: face poll pe url (ex. RTDB local) ca serviciul"""
+    from firebase_client import client, CitireConditionala
+
+    publicator = PublicatorStare()
+    publicator.start()
+    citire = CitireConditionala(client, url)
+    print(f"Public starea pe {publicator.cale}")
+
+    try:
+        while True:
+            try:
+                modificat, data = citire.citeste()
+                publicator.publica_conexiune(True)
+                if modificat:
+                    publicator.publica_stare(data)
+            except Exception as e:
+                publicator.publica_conexiune(False, str(e)[:30])
+            time.sleep(1)
+    except KeyboardInterrupt:
+        publicator.stop()
+
+
+def _asculta_desktop():
+    def la_disponibilitate(disponibil):
+        print("Serviciu disponibil" if disponibil else "Serviciu indisponibil")
+
+    abonat = AbonatStare(print, la_disponibilitate)
+    abonat.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        abonat.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Test IPC serviciu -> interfata")
+    sub = parser.add_subparsers(dest='comanda', required=True)
+    p_publica = sub.add_parser('publica')
+    p_publica.add_argument('--url', default='http://127.0.0.1:8765/alerte.json')
+    sub.add_parser('asculta')
+    args = parser.parse_args()
+
+    if args.comanda == 'publica':
+        _publica_desktop(args.url)
+    else:
+        _asculta_desktop()
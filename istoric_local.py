@@ -0,0 +1,136 @@
+"""
+Cache local (SQLite) pentru istoricul alertelor.
+Cheia primara e push key-ul Firebase. Sincronizarea cere doar intrarile
+oprite dupa ultimul oprit_la salvat (pus de server, deci prinde si opririle
+reluate tarziu din jurnal, care au chei vechi). Afisarea merge dupa momentul
+opririi (moment_istoric), indexat impreuna cu cheia.
+"""
+import json
+import os
+import sqlite3
+import threading
+from stare import moment_istoric, oprit_la_server
+
+CALE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'istoric.db')
+
+# Cate intrari pastram local; cele mai vechi se sterg
+LIMITA_INTRARI = 20000
+
+
+class IstoricLocal:
+    def __init__(self, cale=CALE_DB, limita=LIMITA_INTRARI):
+        self.limita = limita
+        self._lock = threading.Lock()
+        # Scrierile vin de pe thread-ul de retea, citirile de pe thread-ul Kivy
+        self._db = sqlite3.connect(cale, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS istoric (
+                    cheie TEXT PRIMARY KEY,
+                    moment INTEGER NOT NULL DEFAULT 0,
+                    oprit_la INTEGER,
+                    date TEXT NOT NULL
+                )
+            ''')
+            self._migreaza()
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_istoric_moment ON istoric(moment, cheie)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_istoric_oprit_la ON istoric(oprit_la)')
+
+    def _migreaza(self):
+        """
+        Bazele vechi aveau coloana text timestamp, indexata, in loc de moment,
+        si nu aveau oprit_la; le completam din datele salvate
+        """
+        coloane = {rand[1] for rand in self._db.execute('PRAGMA table_info(istoric)')}
+        if {'moment', 'oprit_la'} <= coloane:
+            return
+        if 'moment' not in coloane:
+            self._db.execute('ALTER TABLE istoric ADD COLUMN moment INTEGER NOT NULL DEFAULT 0')
+            self._db.execute('DROP INDEX IF EXISTS idx_istoric_timestamp')
+        if 'oprit_la' not in coloane:
+            self._db.execute('ALTER TABLE istoric ADD COLUMN oprit_la INTEGER')
+        randuri = self._db.execute('SELECT cheie, date FROM istoric').fetchall()
+        self._db.executemany(
+            'UPDATE istoric SET moment = ?, oprit_la = ? WHERE cheie = ?',
+            [(moment_istoric(intrare), oprit_la_server(intrare), cheie)
+             for cheie, intrare in ((cheie, json.loads(date)) for cheie, date in randuri)]
+        )
+
+    def adauga(self, intrari):
+        """
+        intrari: dict cheie -> intrare (ca in raspunsul Firebase).
+        Returneaza cate intrari sunt noi sau s-au schimbat.
+        """
+        randuri = [
+            (cheie, moment_istoric(valoare), oprit_la_server(valoare), json.dumps(valoare))
+            for cheie, valoare in intrari.items()
+            if isinstance(valoare, dict)
+        ]
+        if not randuri:
+            return 0
+
+        with self._lock, self._db:
+            # Sincronizarea aduce din nou intrarile cu ultimul oprit_la (startAt e inclusiv)
+            schimbate = self._db.executemany(
+                'INSERT INTO istoric (cheie, moment, oprit_la, date) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(cheie) DO UPDATE SET moment = excluded.moment, '
+                'oprit_la = excluded.oprit_la, date = excluded.date '
+                'WHERE istoric.date != excluded.date',
+                randuri
+            ).rowcount
+            self._aplica_retentie()
+        return schimbate
+
+    def _aplica_retentie(self):
+        rand = self._db.execute(
+            'SELECT cheie FROM istoric ORDER BY cheie DESC LIMIT 1 OFFSET ?',
+            (self.limita,)
+        ).fetchone()
+        if rand:
+            self._db.execute('DELETE FROM istoric WHERE cheie <= ?', (rand[0],))
+
+    def ultima_cheie(self):
+        with self._lock:
+            rand = self._db.execute('SELECT MAX(cheie) FROM istoric').fetchone()
+        return rand[0] if rand else None
+
+    def ultimul_oprit_la(self):
+        """Cel mai nou oprit_la pus de server; None daca avem doar intrari vechi"""
+        with self._lock:
+            rand = self._db.execute('SELECT MAX(oprit_la) FROM istoric').fetchone()
+        return rand[0] if rand else None
+
+    def pagina(self, inainte_de=None, limita=20):
+        """
+        Intrarile cele mai noi, sau cele de dupa inainte_de = (moment, cheie),
+        ultima intrare afisata
+        """
+        with self._lock:
+            if inainte_de:
+                moment, cheie = inainte_de
+                randuri = self._db.execute(
+                    'SELECT cheie, date FROM istoric WHERE moment < ? OR (moment = ? AND cheie < ?) '
+                    'ORDER BY moment DESC, cheie DESC LIMIT ?',
+                    (moment, moment, cheie, limita)
+                ).fetchall()
+            else:
+                randuri = self._db.execute(
+                    'SELECT cheie, date FROM istoric ORDER BY moment DESC, cheie DESC LIMIT ?',
+                    (limita,)
+                ).fetchall()
+
+        intrari = []
+        for cheie, date in randuri:
+            intrare = json.loads(date)
+            intrare['_key'] = cheie
+            intrari.append(intrare)
+        return intrari
+
+    def numar(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM istoric').fetchone()[0]
+
+    def inchide(self):
+        with self._lock:
+            self._db.close()
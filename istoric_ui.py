@@ -0,0 +1,58 @@
+"""
+Randul din lista ecranului de istoric. Modul separat ca widget-urile
+RecycleView sa se incarce doar la prima deschidere a ecranului.
+"""
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.properties import StringProperty, ListProperty
+from kivy.graphics import Color, RoundedRectangle
+from kivy.metrics import dp
+
+
+class IstoricItem(RecycleDataViewBehavior, BoxLayout):
+    """Rand din lista de istoric; RecycleView refoloseste aceleasi instante"""
+    timp = StringProperty('')
+    detalii = StringProperty('')
+    culoare_detalii = ListProperty([0.3, 0.9, 0.4, 1])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.padding = dp(8)
+
+        # Background
+        with self.canvas.before:
+            Color(rgba=(0.15, 0.15, 0.2, 1))
+            self.bg_rect = RoundedRectangle(pos=self.pos, size=self.size, radius=[dp(8)])
+        self.bind(pos=self.update_bg, size=self.update_bg)
+
+        # Linia 1: Data si ora
+        self.lbl_timp = Label(
+            font_size='14sp',
+            color=(0.7, 0.7, 0.8, 1),
+            halign='left',
+            valign='middle',
+            size_hint_y=0.4
+        )
+        self.lbl_timp.bind(size=self.lbl_timp.setter('text_size'))
+
+        # Linia 2: Detalii
+        self.lbl_detalii = Label(
+            font_size='13sp',
+            halign='left',
+            valign='middle',
+            size_hint_y=0.6
+        )
+        self.lbl_detalii.bind(size=self.lbl_detalii.setter('text_size'))
+
+        self.add_widget(self.lbl_timp)
+        self.add_widget(self.lbl_detalii)
+
+        self.bind(timp=self.lbl_timp.setter('text'),
+                  detalii=self.lbl_detalii.setter('text'),
+                  culoare_detalii=self.lbl_detalii.setter('color'))
+
+    def update_bg(self, *args):
+        self.bg_rect.pos = self.pos
+        self.bg_rect.size = self.size
@@ -0,0 +1,309 @@
+"""
+Jurnal pe disc al scrierilor catre Firebase (alerte trimise, opriri,
+intrari in istoric) care inca nu au ajuns pe server.
+
+Fiecare scriere se adauga intai aici (o linie JSON, cu fsync), apoi se
+trimite. Daca trimiterea esueaza, ramane in jurnal si se reia in ordine
+cand revine conexiunea - de catre aplicatie sau de catre serviciu, care
+folosesc acelasi fisier. Scrierile sunt PATCH-uri multi-cale pe radacina,
+dar nu idempotente: trimiterea incrementeaza nr si versiune. De aceea orice
+intrare care nu pleaca acum pentru prima oara (raspuns pierdut, proces oprit,
+adaugata de celalalt proces) se verifica intai fata de alerta curenta a
+salii: o trimitere al carei id e deja pe server nu se mai repeta, iar o
+oprire a unei alerte inlocuite sau deja oprite scrie doar in istoric (cu
+cheia fixata la adaugare, deci tot o singura intrare). Intrarile in asteptare se unesc in cat mai putine PATCH-uri, dar
+doar cat timp nu ating aceleasi cai: doua INCREMENT-uri pe aceeasi cale ar
+deveni unul, iar o oprire ar acoperi alerta trimisa inaintea ei.
+
+Cheia din istoric (push ID) e fixata la adaugare, ca o oprire trimisa de
+doua ori sa ramana o singura intrare. O oprire reluata tarziu are deci o
+cheie mai veche decat intrarile din jur; celelalte telefoane o aduc totusi,
+pentru ca sincronizeaza istoricul dupa oprit_la, pus de server.
+
+Scrierile respinse definitiv de server (4xx) se noteaza in jurnal.respinse,
+ca trimite() sa le deosebeasca de cele trimise intre timp de celalalt
+proces.
+
+Un lock fcntl pe jurnal.lock serializeaza adaugarile si reluarile intre
+procese; fisierul se rescrie atomic dupa fiecare reluare reusita.
+"""
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+
+DIRECTOR = os.path.dirname(os.path.abspath(__file__))
+CALE_JURNAL = os.path.join(DIRECTOR, 'jurnal.jsonl')
+
+TRIMITERE = 'trimitere'
+OPRIRE = 'oprire'
+SALA_NOUA = 'sala_noua'
+
+# O alerta care n-a putut pleca atata timp nu mai e trimisa (secunde)
+VALABILITATE_TRIMITERE = 600
+
+# Cate intrari citim si verificam odata (un singur GET pe alerte)
+MARIME_LOT = 50
+
+# Cate id-uri respinse pastram in jurnal.respinse
+RESPINSE_PASTRATE = 200
+
+
+def acum_ms():
+    return time.time() * 1000
+
+
+class JurnalScrieri:
+    def __init__(self, client, url_radacina, url_alerte, cale=CALE_JURNAL):
+        self.client = client
+        self.url_radacina = url_radacina
+        self.url_alerte = url_alerte
+        self.cale = cale
+        self.cale_lock = f"{cale}.lock"
+        self.cale_respinse = f"{cale}.respinse"
+        self._lock = threading.Lock()
+        self._stare_fisier = None
+        self._in_asteptare = 0
+        # Intrari adaugate de noi si neincercate inca: sigur nu sunt pe server
+        self._noi = set()
+
+        self.reluate = 0
+        self.ultima_reluare_ms = None
+        self.reluare_maxima_ms = 0.0
+
+    # ---------- API ----------
+    def adauga(self, tip, valori, sala=None, alerta_id=None):
+        """Salveaza durabil o scriere (dict cale -> valoare); returneaza id-ul ei"""
+        intrare = {
+            'id': uuid.uuid4().hex,
+            'tip': tip,
+            'valori': valori,
+            'sala': sala,
+            'alerta_id': alerta_id,
+            'creat_la': acum_ms(),
+        }
+        linie = (json.dumps(intrare, separators=(',', ':')) + '\n').encode()
+        with self._blocat():
+            with open(self.cale, 'a+b') as f:
+                # O linie neterminata (proces oprit brusc) nu are voie sa o strice pe cea noua
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        linie = b'\n' + linie
+                f.write(linie)
+                f.flush()
+                os.fsync(f.fileno())
+            self._noi.add(intrare['id'])
+        return intrare['id']
+
+    def trimite(self, tip, valori, sala=None, alerta_id=None):
+        """
+        Adauga scrierea si trimite imediat tot ce e in asteptare, in ordine.
+        Returneaza True daca a ajuns pe server, False daca serverul a
+        respins-o. Erorile de retea se propaga; scrierea ramane in jurnal
+        pentru reluare.
+        """
+        intrare_id = self.adauga(tip, valori, sala, alerta_id)
+        confirmate, respinse = self.reia()
+        if intrare_id in confirmate:
+            return True
+        if intrare_id in respinse:
+            return False
+        # Intre adaugare si reluare, a trimis-o reluarea serviciului sau a
+        # altui thread: a ajuns daca a iesit din jurnal fara sa fie respinsa
+        with self._blocat():
+            if intrare_id in self._citeste_respinse():
+                return False
+            return all(i['id'] != intrare_id for i in self._citeste())
+
+    def reia(self):
+        """Trimite intrarile in asteptare; returneaza (confirmate, respinse) - id-uri"""
+        confirmate = set()
+        respinse = set()
+        with self._blocat():
+            intrari = self._citeste()
+            try:
+                while intrari:
+                    lot, intrari = intrari[:MARIME_LOT], intrari[MARIME_LOT:]
+                    try:
+                        self._trimite_lot(lot, confirmate, respinse)
+                    finally:
+                        # Ce a ramas netrimis (inclusiv restul lotului curent la eroare)
+                        terminate = confirmate | respinse
+                        self._rescrie([i for i in lot + intrari if i['id'] not in terminate])
+            finally:
+                if respinse:
+                    self._noteaza_respinse(respinse)
+        return confirmate, respinse
+
+    def in_asteptare(self):
+        """Numarul de scrieri netrimise; citeste fisierul doar daca s-a schimbat"""
+        try:
+            st = os.stat(self.cale)
+            stare = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            if stare != self._stare_fisier:
+                self._in_asteptare = len(self._citeste())
+                self._stare_fisier = stare
+            return self._in_asteptare
+
+    def statistici(self):
+        return {
+            'in_asteptare': self.in_asteptare(),
+            'reluate': self.reluate,
+            'ultima_reluare_ms': self.ultima_reluare_ms,
+            'reluare_maxima_ms': round(self.reluare_maxima_ms),
+        }
+
+    # ---------- intern ----------
+    def _trimite_lot(self, lot, confirmate, respinse):
+        """
+        Trimite lotul in ordine, in cat mai putine PATCH-uri; adauga id-urile
+        intrarilor la confirmate sau respinse pe masura ce pleaca
+        """
+        acum = acum_ms()
+        noi = self._noi & {i['id'] for i in lot}
+        # De aici incolo pot ajunge pe server chiar daca raspunsul se pierde
+        self._noi -= noi
+        alerte_curente = None
+        if any(i['alerta_id'] and i['id'] not in noi for i in lot):
+            # O singura citire pentru toate salile din lot
+            response = self.client.get(self.url_alerte)
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}")
+            alerte_curente = self.client.json(response) or {}
+
+        for grup, valori in self._grupuri(lot, acum, alerte_curente, noi):
+            ids = {i['id'] for i in grup}
+            if valori:
+                response = self.client.patch(self.url_radacina, json=valori)
+                if response.status_code >= 500:
+                    raise Exception(f"HTTP {response.status_code}")
+                if response.status_code != 200:
+                    # Respinsa definitiv (reguli, date invalide) - n-are rost reluata
+                    print(f"Jurnal: {len(grup)} scrieri respinse de server (HTTP {response.status_code})")
+                    respinse |= ids
+                    continue
+
+            confirmat_la = acum_ms()
+            for intrare in grup:
+                intarziere = confirmat_la - intrare['creat_la']
+                # Tot ce n-a plecat din prima incercare (>1 s in jurnal) e o reluare
+                if intarziere > 1000:
+                    self.reluate += 1
+                    self.ultima_reluare_ms = round(intarziere)
+                    self.reluare_maxima_ms = max(self.reluare_maxima_ms, intarziere)
+            confirmate |= ids
+
+    def _grupuri(self, lot, acum, alerte_curente, noi):
+        """
+        Imparte lotul in (intrari, valori) de trimis pe rand; un grup nou
+        incepe la prima cale care se suprapune cu una din grupul curent, deci
+        rezultatul e acelasi ca trimiterea intrarilor una dupa alta
+        """
+        grupuri = []
+        intrari, valori = [], {}
+        for intrare in lot:
+            efective = self._valori_efective(
+                intrare, acum, None if intrare['id'] in noi else alerte_curente)
+            if any(_se_suprapun(a, b) for a in efective for b in valori):
+                grupuri.append((intrari, valori))
+                intrari, valori = [], {}
+            intrari.append(intrare)
+            valori.update(efective)
+        if intrari:
+            grupuri.append((intrari, valori))
+        return grupuri
+
+    def _valori_efective(self, intrare, acum, alerte_curente):
+        valori = intrare['valori']
+        vechime = acum - intrare['creat_la']
+
+        if intrare['tip'] == TRIMITERE and vechime > VALABILITATE_TRIMITERE * 1000:
+            print(f"Jurnal: alerta {intrare['alerta_id']} a expirat netrimisa")
+            return {}
+
+        if alerte_curente is None:
+            return valori
+
+        alerta_curenta = alerte_curente.get(intrare.get('sala')) or {}
+        id_curent = alerta_curenta.get('id')
+        if intrare['tip'] == TRIMITERE and id_curent == intrare['alerta_id']:
+            # A ajuns deja (poate si oprita intre timp) - nu o repornim
+            return {}
+        if intrare['tip'] == OPRIRE and (id_curent != intrare['alerta_id']
+                                         or not alerta_curenta.get('status')):
+            # Intre timp e alta alerta activa, sau a noastra e deja oprita
+            # (raspuns pierdut): pastram doar intrarea din istoric
+            return {cale: v for cale, v in valori.items()
+                    if not cale.startswith(('alerte/', 'versiuni/'))}
+        return valori
+
+    def _noteaza_respinse(self, ids):
+        respinse = (self._citeste_respinse(lista=True) + sorted(ids))[-RESPINSE_PASTRATE:]
+        temporar = f"{self.cale_respinse}.tmp"
+        with open(temporar, 'w') as f:
+            f.write('\n'.join(respinse) + '\n')
+        os.replace(temporar, self.cale_respinse)
+
+    def _citeste_respinse(self, lista=False):
+        try:
+            with open(self.cale_respinse, 'r') as f:
+                ids = [linie.strip() for linie in f if linie.strip()]
+        except FileNotFoundError:
+            ids = []
+        return ids if lista else set(ids)
+
+    def _citeste(self):
+        intrari = []
+        try:
+            with open(self.cale, 'r') as f:
+                for linie in f:
+                    try:
+                        intrari.append(json.loads(linie))
+                    except ValueError:
+                        # Linie incompleta ramasa dupa oprirea brusca a procesului
+                        pass
+        except FileNotFoundError:
+            pass
+        return intrari
+
+    def _rescrie(self, intrari):
+        temporar = f"{self.cale}.tmp"
+        with open(temporar, 'w') as f:
+            for intrare in intrari:
+                f.write(json.dumps(intrare, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporar, self.cale)
+
+    def _blocat(self):
+        return _LockFisier(self.cale_lock)
+
+
+def _se_suprapun(a, b):
+    """Doua cai de PATCH multi-cale se suprapun daca sunt egale sau una o contine pe cealalta"""
+    a, b = a.strip('/'), b.strip('/')
+    return a == b or a.startswith(b + '/') or b.startswith(a + '/')
+
+
+class _LockFisier:
+    """Lock exclusiv intre procese (si intre thread-uri, fiecare cu descriptorul lui)"""
+
+    def __init__(self, cale):
+        self.cale = cale
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.cale, os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
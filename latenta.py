@@ -0,0 +1,186 @@
+"""
+Masurarea latentei de propagare a alertelor, de la apasarea butonului
+pe telefonul expeditorului pana la receptie, afisare, sunet si notificare
+pe telefoanele care primesc alerta.
+
+Timpii sunt exprimati in ceasul serverului Firebase: fiecare proces isi
+estimeaza diferenta fata de server (CeasServer) si o aplica la masurare.
+Esantioanele se pastreaza intr-o fereastra glisanta, pe etape, si se
+salveaza local (latenta_app.json / latenta_serviciu.json).
+
+Rezumat: python latenta.py            Export: python latenta.py --csv latenta.csv
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+DIRECTOR = os.path.dirname(os.path.abspath(__file__))
+MARIME_FEREASTRA = 500
+
+
+def acum_ms():
+    return time.time() * 1000
+
+
+def url_ceas(url_baza, dispozitiv):
+    """Nodul in care isi scrie timestamp-ul un dispozitiv (nu un nod comun tuturor)"""
+    return f"{url_baza}/ceas/{dispozitiv}.json"
+
+
+class CeasServer:
+    """Estimeaza diferenta (ms) dintre ceasul serverului si cel local"""
+
+    def __init__(self):
+        self.diferenta_ms = 0.0
+        self.sincronizat = False
+
+    def sincronizeaza(self, client, url):
+        """
+        Scrie {".sv": "timestamp"} la url (url_ceas, propriu dispozitivului);
+        serverul raspunde cu timpul lui. Folosim mijlocul intervalului
+        cerere-raspuns, ca la NTP.
+        """
+        try:
+            t0 = acum_ms()
+            response = client.put(url, json={'.sv': 'timestamp'})
+            t1 = acum_ms()
+
+            server_ms = response.json() if response.status_code == 200 else None
+            if not isinstance(server_ms, (int, float)):
+                # Rezerva: header-ul Date (rezolutie de o secunda)
+                server_ms = parsedate_to_datetime(response.headers['Date']).timestamp() * 1000 + 500
+
+            self.diferenta_ms = server_ms - (t0 + t1) / 2
+            self.sincronizat = True
+        except Exception as e:
+            print(f"Eroare sincronizare ceas server: {e}")
+
+    def acum_server_ms(self):
+        return acum_ms() + self.diferenta_ms
+
+
+class HistogramaLatenta:
+    """Ultimele MARIME_FEREASTRA esantioane (ms) pentru fiecare etapa"""
+
+    def __init__(self, nume_fisier):
+        self.cale = os.path.join(DIRECTOR, nume_fisier)
+        self._lock = threading.Lock()
+        self.etape = {}
+        self._incarca()
+
+    def inregistreaza(self, etapa, ms):
+        with self._lock:
+            self.etape.setdefault(etapa, deque(maxlen=MARIME_FEREASTRA)).append(round(ms, 1))
+
+    def percentile(self, etapa):
+        with self._lock:
+            valori = sorted(self.etape.get(etapa, ()))
+        if not valori:
+            return None
+
+        def p(procent):
+            return valori[min(len(valori) - 1, int(len(valori) * procent / 100))]
+
+        return {'n': len(valori), 'p50': p(50), 'p95': p(95), 'p99': p(99)}
+
+    def rezumat(self):
+        with self._lock:
+            etape = list(self.etape)
+        return {etapa: self.percentile(etapa) for etapa in etape}
+
+    def salveaza(self):
+        with self._lock:
+            date = {etapa: list(valori) for etapa, valori in self.etape.items()}
+        temporar = f"{self.cale}.tmp"
+        try:
+            with open(temporar, 'w') as f:
+                json.dump(date, f)
+            os.replace(temporar, self.cale)
+        except OSError as e:
+            print(f"Eroare salvare latente: {e}")
+
+    def exporta_csv(self, cale):
+        with self._lock, open(cale, 'w') as f:
+            f.write("etapa,index,ms\n")
+            for etapa, valori in self.etape.items():
+                for i, valoare in enumerate(valori):
+                    f.write(f"{etapa},{i},{valoare}\n")
+
+    def _incarca(self):
+        try:
+            with open(self.cale, 'r') as f:
+                date = json.load(f)
+            for etapa, valori in date.items():
+                self.etape[etapa] = deque(valori, maxlen=MARIME_FEREASTRA)
+        except (OSError, ValueError):
+            pass
+
+
+class MasuratoareAlerta:
+    """
+    Masuratorile unui proces pentru alerte. Fiecare etapa se inregistreaza
+    o singura data per ID de alerta, relativ la momentul apasarii butonului.
+    """
+
+    def __init__(self, nume_fisier):
+        self.ceas = CeasServer()
+        self.histograma = HistogramaLatenta(nume_fisier)
+        self._alerta_id = None
+        self._referinta_ms = None
+        self._etape_inregistrate = set()
+
+    def alerta_noua(self, data, primit_la_ms=None):
+        """Apelata cand o alerta e vazuta prima data (data = canalul salii din alerte.json)"""
+        alerta_id = data.get('id')
+        if not alerta_id or alerta_id == self._alerta_id:
+            return
+        self._alerta_id = alerta_id
+        self._etape_inregistrate = set()
+
+        # Momentul apasarii, deja convertit de expeditor in ceasul serverului;
+        # alertele vechi (fara el) folosesc momentul scrierii pe server
+        apasat = data.get('apasat_la')
+        trimis = data.get('trimis_la')
+        self._referinta_ms = apasat if isinstance(apasat, (int, float)) else trimis
+        if not isinstance(self._referinta_ms, (int, float)):
+            self._referinta_ms = None
+            return
+
+        if isinstance(apasat, (int, float)) and isinstance(trimis, (int, float)):
+            self.histograma.inregistreaza('scriere_server', trimis - apasat)
+        self.etapa('primire', primit_la_ms)
+
+    def etapa(self, nume, moment_local_ms=None):
+        if self._referinta_ms is None or nume in self._etape_inregistrate:
+            return
+        self._etape_inregistrate.add(nume)
+        moment = (moment_local_ms or acum_ms()) + self.ceas.diferenta_ms
+        self.histograma.inregistreaza(nume, moment - self._referinta_ms)
+
+    def durata(self, nume, ms):
+        """Etapa masurata direct ca durata locala (ex. confirmarea trimiterii)"""
+        self.histograma.inregistreaza(nume, ms)
+
+
+def _afiseaza(nume_fisier):
+    histograma = HistogramaLatenta(nume_fisier)
+    print(nume_fisier)
+    for etapa, p in histograma.rezumat().items():
+        print(f"  {etapa:22s} n={p['n']:4d}  p50={p['p50']:8.1f}  p95={p['p95']:8.1f}  p99={p['p99']:8.1f} ms")
+    return histograma
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Latenta de propagare a alertelor")
+    parser.add_argument('--csv', help="exporta esantioanele intr-un fisier CSV")
+    args = parser.parse_args()
+
+    for nume in ('latenta_app.json', 'latenta_serviciu.json'):
+        histograma = _afiseaza(nume)
+        if args.csv:
+            baza, extensie = os.path.splitext(args.csv)
+            histograma.exporta_csv(f"{baza}_{nume.split('.')[0]}{extensie or '.csv'}")
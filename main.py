@@ -1,26 +1,50 @@
+# Primul import: cronologia pornirii masoara de aici incolo
+from pornire import marcheaza
 import threading
+import time
+import uuid
 import requests
-from datetime import datetime
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
-from kivy.uix.textinput import TextInput
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.screenmanager import ScreenManager, Screen, NoTransition
 from kivy.core.window import Window
 from kivy.graphics import Color, RoundedRectangle, Ellipse
-from kivy.core.audio import SoundLoader
+from kivy.properties import StringProperty, ColorProperty
 from kivy.utils import platform
 from kivy.metrics import dp, sp
-from kivy.storage.jsonstore import JsonStore
-from plyer import vibrator
+from firebase_client import client
+from poller import Poller
+from scheduler import PollScheduler
+from ipc import AbonatStare
+from setari import Setari
+from audio import alarma
+from efecte import EfecteAlerta
+from stare import (valori_oprire, valori_trimitere, abonamente_profil,
+                   cheie_sala, moment_istoric, CitireAlerte, INCREMENT, SALI_IMPLICITE)
+from actor import (ActorAlerta, PROFIL, SURSA, RASPUNS, EROARE, CONEXIUNE, ALERTA_TRIMISA,
+                   TRIMITERE_ESUATA, OPRIRE_CERUTA, OPRIRE_TERMINATA, OPRIRE_RESPINSA,
+                   ARATA_CONEXIUNE, ARATA_ALERTA, ARATA_NORMAL, PRIMA_STARE, TACI, SCRIE_OPRIRE)
+from jurnal import JurnalScrieri, TRIMITERE, OPRIRE, SALA_NOUA
+from latenta import MasuratoareAlerta, acum_ms, url_ceas
+from vedere import ModelVedere
 import os
 
+# Widget-urile ecranului de istoric si de profil, sunetul si plyer se
+# importa abia cand e nevoie de ele, ca prima stare sa apara cat mai repede
+marcheaza('importuri')
+
 # ================= CONFIGURARE =================
-FIREBASE_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app/alerta.json"
+FIREBASE_BAZA_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app"
+FIREBASE_ROOT_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app/.json"
+# Canalele tuturor salilor (alerte/<sala>) - o singura citire pentru toate
+FIREBASE_ALERTE_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app/alerte.json"
+FIREBASE_SALI_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app/sali.json"
 FIREBASE_ISTORIC_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app/istoric.json"
+MARIME_PAGINA_ISTORIC = 20
 # ===============================================
 
 # Variabile pentru Android
@@ -39,6 +63,8 @@ if platform == 'android':
 
 
 class ModernButton(Button):
+    culoare = ColorProperty((1, 0, 0, 1))
+
     def __init__(self, **kwargs):
         btn_color = kwargs.pop('btn_color', (1, 0, 0, 1))
         super().__init__(**kwargs)
@@ -48,6 +74,7 @@ class ModernButton(Button):
         with self.canvas.before:
             self.bg_color = Color(rgba=btn_color)
             self.bg_rect = RoundedRectangle(pos=self.pos, size=self.size, radius=[dp(15)])
+        self.culoare = btn_color
 
         self.bind(pos=self.update_bg, size=self.update_bg)
 
@@ -56,10 +83,16 @@ class ModernButton(Button):
         self.bg_rect.size = self.size
 
     def set_color(self, color):
-        self.bg_color.rgba = color
+        self.culoare = color
+
+    def on_culoare(self, instance, culoare):
+        # Proprietate Kivy: aceeasi culoare nu mai ajunge pana aici
+        self.bg_color.rgba = culoare
 
 
 class StatusIndicator(FloatLayout):
+    status = StringProperty('')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.size_hint = (None, None)
@@ -76,6 +109,10 @@ class StatusIndicator(FloatLayout):
         self.indicator.size = self.size
 
     def set_status(self, status):
+        self.status = status
+
+    def on_status(self, instance, status):
+        # Se apeleaza doar cand statusul se schimba - canvas-ul nu se redeseneaza degeaba
         if status == 'alert':
             self.indicator_color.rgba = (1, 0.2, 0.2, 1)
         elif status == 'connected':
@@ -89,25 +126,145 @@ class AlertaApp(App):
         self.culoare_originala = (0.05, 0.05, 0.1, 1)
         Window.clearcolor = self.culoare_originala
 
-        # Incarca setarile salvate
-        self.store = JsonStore('settings.json')
+        # Deschide din timp conexiunea catre Firebase
+        client.incalzeste_async(FIREBASE_ALERTE_URL)
+
+        # Poll-ul citeste doar versiuni.json (cu ETag: 304 daca nimic nou),
+        # indiferent cate sali urmarim; canalul complet al unei sali vine
+        # doar cand i s-a schimbat versiunea
+        self.citire_alerta = CitireAlerte(client, FIREBASE_BAZA_URL)
+
+        # Incarca setarile salvate (acelasi fisier il citeste si serviciul)
+        self.store = Setari()
+
+        # Latenta alertelor: diferenta fata de ceasul serverului + histograme
+        self.masuratori = MasuratoareAlerta('latenta_app.json')
+        threading.Thread(
+            target=self.masuratori.ceas.sincronizeaza,
+            args=(client, url_ceas(FIREBASE_BAZA_URL, self.store.id_dispozitiv())),
+            daemon=True
+        ).start()
+
+        # Trimiterile si opririle trec prin jurnalul de pe disc: daca reteaua
+        # cade, se reiau automat (de aici sau din serviciu)
+        self.jurnal = JurnalScrieri(client, FIREBASE_ROOT_URL, FIREBASE_ALERTE_URL)
+        self._reluare_in_curs = False
+
+        # Eticheta de conexiune, indicatorul si butonul silent se scriu doar
+        # cand se schimba ceva (poll-ul si serviciul confirma la cateva secunde)
+        self.vedere = ModelVedere()
+
+        # Sunetul, vibratia, pulsul butonului si trezirea ecranului unei alerte
+        self.efecte = EfecteAlerta(trezeste_ecran=self.wake_screen)
+
+        # Intervalul de poll se adapteaza la alerta, erori si ecran
+        self.planificator = PollScheduler()
+        self.poll_activ = False
+
+        # Un singur worker pentru poll; rezultatele vin pe thread-ul Kivy
+        self.poller = Poller(
+            self._cerere_poll,
+            lambda: Clock.schedule_once(self._proceseaza_rezultate_poll, 0)
+        )
+        self.poller.start()
+
+        # Cand serviciul din background ruleaza, el e singurul care face poll;
+        # interfata primeste starea pe canalul local si revine la propriul
+        # poll doar daca serviciul nu raspunde
+        self.abonat = AbonatStare(
+            lambda mesaj: Clock.schedule_once(lambda dt: self._la_mesaj_serviciu(mesaj), 0),
+            lambda disponibil: Clock.schedule_once(
+                lambda dt: self._la_disponibilitate_serviciu(disponibil), 0)
+        )
+        self.abonat.start()
+
+        # Cache local pentru istoric; baza se deschide la prima afisare
+        self.istoric_local = None
 
         # Variabile profil
         self.profil = None  # 'sala' sau 'persoana'
         self.nume_utilizator = ""
         self.poate_trimite = False
+        self.sala = None          # canalul pe care trimite profilul 'sala'
+        self.abonamente = []      # canalele urmarite
+        self.sali = dict(SALI_IMPLICITE)  # cheie -> nume, din sali.json
+
+        # Starea alertei traieste cat procesul, nu cat un ecran: o detine
+        # actorul, pe thread-ul Kivy; restul aplicatiei ii trimite evenimente
+        self.actor = ActorAlerta()
+        self.is_muted = False
+        self.silent_mode = False
+        self.conectat = False
+        self.incarca_setari()
+
+        # Ecranele se construiesc o singura data, la prima vizita, si raman
+        # in viata; navigarea doar schimba ecranul curent
+        self.sm = ScreenManager(transition=NoTransition())
+        self.latenta_navigare = {}
+        self._android_initializat = False
 
         # Verifica daca exista profil salvat
         if self.store.exists('profil'):
-            self.profil = self.store.get('profil')['tip']
-            self.nume_utilizator = self.store.get('profil')['nume']
+            profil = self.store.get('profil')
+            self.profil = profil['tip']
+            self.nume_utilizator = profil['nume']
             self.poate_trimite = (self.profil == 'sala')
-            return self.build_main_screen()
+            self.abonamente = abonamente_profil(profil)
+            if self.poate_trimite:
+                self.sala = self.abonamente[0]
+            self.arata_ecran('principal')
+            self.porneste_monitorizare()
         else:
-            return self.build_profile_screen()
+            self.arata_ecran('profil')
+        return self.sm
+
+    def on_start(self):
+        marcheaza('build')
+
+        def _primul_frame(*args):
+            Window.unbind(on_flip=_primul_frame)
+            marcheaza('primul_frame')
+            # Sunetul se decodeaza o singura data per proces, pe alt thread
+            threading.Thread(target=self.incarca_sunet_alarma, daemon=True).start()
+        Window.bind(on_flip=_primul_frame)
+
+    def arata_ecran(self, nume):
+        """Trece la ecranul dat; il construieste doar la prima vizita"""
+        start = time.perf_counter()
+        if not self.sm.has_screen(nume):
+            constructori = {
+                'profil': self.build_profile_screen,
+                'principal': self.build_main_screen,
+                'istoric': self.build_istoric_screen,
+                'diagnostic': self.build_diagnostic_screen,
+            }
+            ecran = Screen(name=nume)
+            ecran.add_widget(constructori[nume]())
+            self.sm.add_widget(ecran)
+        self.sm.current = nume
+
+        # Latenta pana la primul frame desenat cu ecranul nou
+        def _desenat(*args):
+            Window.unbind(on_flip=_desenat)
+            ms = (time.perf_counter() - start) * 1000
+            self.latenta_navigare[nume] = round(ms, 1)
+            print(f"Navigare -> {nume}: {ms:.1f} ms, evenimente Clock active: {len(Clock.get_events())}")
+        Window.bind(on_flip=_desenat)
+
+    def porneste_monitorizare(self):
+        """Serviciul Android (o singura data per proces) si poll-ul, imediat"""
+        if platform == 'android' and not self._android_initializat:
+            self._android_initializat = True
+            Clock.schedule_once(self.init_android, 1)
+        self.citire_alerta.seteaza_abonamente(self.abonamente)
+        self.executa(PROFIL, abonamente=self.abonamente, sala=self.sala, poate_trimite=self.poate_trimite)
+        self.porneste_poll(0)
 
     def build_profile_screen(self):
         """Ecran de selectare profil"""
+        from kivy.uix.textinput import TextInput
+        from kivy.uix.scrollview import ScrollView
+
         self.profile_layout = FloatLayout()
 
         content = BoxLayout(
@@ -124,54 +281,57 @@ class AlertaApp(App):
             font_size='32sp',
             color=(0.9, 0.9, 0.95, 1),
             bold=True,
-            size_hint_y=0.15
+            size_hint_y=0.1
         )
 
         subtitle = Label(
             text="Selecteaza profilul:",
             font_size='20sp',
             color=(0.6, 0.6, 0.7, 1),
-            size_hint_y=0.1
+            size_hint_y=0.07
         )
 
-        # Buton SALA MINIMIS
+        # Buton SALA
         btn_sala = ModernButton(
-            text="SALA MINIMIS\n(Poate trimite alerte)",
+            text="SALA\n(Trimite alerte din sala ei)",
             btn_color=(0.85, 0.15, 0.15, 1),
             font_size='20sp',
             bold=True,
             color=(1, 1, 1, 1),
-            size_hint_y=0.25,
+            size_hint_y=0.14,
             halign='center'
         )
-        btn_sala.bind(on_press=lambda x: self.selecteaza_profil_sala())
-
-        spacer = Label(size_hint_y=0.05)
+        btn_sala.bind(on_press=lambda x: self.arata_alegere_profil('sala'))
 
         # Buton PERSOANA
         btn_persoana = ModernButton(
-            text="PERSOANA\n(Doar primeste alerte)",
+            text="PERSOANA\n(Primeste alertele salilor alese)",
             btn_color=(0.2, 0.5, 0.8, 1),
             font_size='20sp',
             bold=True,
             color=(1, 1, 1, 1),
-            size_hint_y=0.25
+            size_hint_y=0.14,
+            halign='center'
         )
-        btn_persoana.bind(on_press=lambda x: self.arata_input_nume())
+        btn_persoana.bind(on_press=lambda x: self.arata_alegere_profil('persoana'))
 
-        # Input pentru nume (ascuns initial)
+        # Nume + alegerea salilor (ascunse initial)
         self.nume_container = BoxLayout(
             orientation='vertical',
             spacing=dp(8),
-            size_hint_y=0.25,
-            opacity=0
+            size_hint_y=0.55,
+            opacity=0,
+            disabled=True
         )
+        self.profil_ales = None
+        self.butoane_sali = {}
 
         self.nume_input = TextInput(
             hint_text="Introdu numele tau...",
             font_size='18sp',
             multiline=False,
-            size_hint_y=0.5,
+            size_hint_y=None,
+            height=dp(48),
             background_color=(0.15, 0.15, 0.2, 1),
             foreground_color=(1, 1, 1, 1),
             hint_text_color=(0.5, 0.5, 0.6, 1),
@@ -179,90 +339,199 @@ class AlertaApp(App):
             padding=(dp(12), dp(12))
         )
 
+        self.sali_lbl = Label(
+            text="",
+            font_size='14sp',
+            color=(0.6, 0.6, 0.7, 1),
+            size_hint_y=None,
+            height=dp(24)
+        )
+
+        # Lista salilor din sali.json; pot fi zeci, deci cu scroll
+        scroll_sali = ScrollView(do_scroll_x=False)
+        self.lista_sali = BoxLayout(orientation='vertical', spacing=dp(6), size_hint_y=None)
+        self.lista_sali.bind(minimum_height=self.lista_sali.setter('height'))
+        scroll_sali.add_widget(self.lista_sali)
+
         self.btn_confirma_nume = ModernButton(
             text="CONFIRMA",
             btn_color=(0.2, 0.75, 0.3, 1),
             font_size='18sp',
             bold=True,
             color=(1, 1, 1, 1),
-            size_hint_y=0.5
+            size_hint_y=None,
+            height=dp(52)
         )
-        self.btn_confirma_nume.bind(on_press=lambda x: self.selecteaza_profil_persoana())
+        self.btn_confirma_nume.bind(on_press=lambda x: self.confirma_profil())
 
         self.nume_container.add_widget(self.nume_input)
+        self.nume_container.add_widget(self.sali_lbl)
+        self.nume_container.add_widget(scroll_sali)
         self.nume_container.add_widget(self.btn_confirma_nume)
 
         content.add_widget(title)
         content.add_widget(subtitle)
         content.add_widget(btn_sala)
-        content.add_widget(spacer)
         content.add_widget(btn_persoana)
         content.add_widget(self.nume_container)
 
         self.profile_layout.add_widget(content)
         return self.profile_layout
 
-    def arata_input_nume(self):
-        """Arata input-ul pentru nume"""
+    def arata_alegere_profil(self, tip):
+        """Arata numele si salile: o sala de trimis sau salile de urmarit"""
+        self.profil_ales = tip
         self.nume_container.opacity = 1
-        self.nume_input.focus = True
+        self.nume_container.disabled = False
+        if tip == 'sala':
+            self.nume_input.hint_text = "Sau scrie numele unei sali noi..."
+            self.sali_lbl.text = "Din ce sala trimiti alerte?"
+        else:
+            self.nume_input.hint_text = "Introdu numele tau..."
+            self.sali_lbl.text = "De la ce sali primesti alerte?"
+            self.nume_input.focus = True
+        self.afiseaza_lista_sali()
+        self.incarca_sali()
+
+    def afiseaza_lista_sali(self):
+        from kivy.uix.togglebutton import ToggleButton
+
+        alese = set(self.abonamente)
+        self.lista_sali.clear_widgets()
+        self.butoane_sali = {}
+        for cheie, nume in sorted(self.sali.items(), key=lambda s: s[1]):
+            btn = ToggleButton(
+                text=nume,
+                font_size='16sp',
+                size_hint_y=None,
+                height=dp(44),
+                # Sala care trimite e una singura; o persoana poate urmari mai multe
+                group='sala' if self.profil_ales == 'sala' else None,
+                state='down' if cheie in alese else 'normal',
+                background_color=(0.3, 0.3, 0.45, 1)
+            )
+            self.butoane_sali[cheie] = btn
+            self.lista_sali.add_widget(btn)
+
+    def incarca_sali(self):
+        """Aduce lista salilor din Firebase; pana atunci ramane cea cunoscuta"""
+        def _load():
+            try:
+                response = client.get(FIREBASE_SALI_URL)
+                if response.status_code != 200:
+                    raise Exception(f"HTTP {response.status_code}")
+                sali = response.json() or {}
+                Clock.schedule_once(lambda dt: self._dupa_incarcare_sali(sali), 0)
+            except Exception as e:
+                print(f"Eroare incarcare sali: {e}")
+
+        threading.Thread(target=_load, daemon=True).start()
+
+    def _dupa_incarcare_sali(self, sali):
+        alese = [c for c, btn in self.butoane_sali.items() if btn.state == 'down']
+        self.sali.update({c: n for c, n in sali.items() if isinstance(n, str)})
+        self.abonamente = alese or self.abonamente
+        self.afiseaza_lista_sali()
+
+    def confirma_profil(self):
+        alese = [c for c, btn in self.butoane_sali.items() if btn.state == 'down']
+        if self.profil_ales == 'sala':
+            self.selecteaza_profil_sala(alese)
+        else:
+            self.selecteaza_profil_persoana(alese)
+
+    def selecteaza_profil_sala(self, alese):
+        """Selecteaza profilul SALA: o sala din lista sau una noua"""
+        nume = self.nume_input.text.strip().upper()
+        if nume:
+            sala = cheie_sala(nume)
+            if not sala:
+                self.nume_input.text = ""
+                self.nume_input.hint_text = "Nume de sala invalid!"
+                return
+            if sala not in self.sali:
+                self.creeaza_sala(sala, nume)
+        elif alese:
+            sala = alese[0]
+            nume = self.sali[sala]
+        else:
+            self.sali_lbl.text = "Alege sala sau scrie numele ei!"
+            return
 
-    def selecteaza_profil_sala(self):
-        """Selecteaza profilul SALA MINIMIS"""
         self.profil = 'sala'
-        self.nume_utilizator = "SALA MINIMIS"
+        self.nume_utilizator = nume
         self.poate_trimite = True
+        self.sala = sala
+        self.abonamente = [sala]
         self.salveaza_profil()
         self.trece_la_ecran_principal()
 
-    def selecteaza_profil_persoana(self):
+    def creeaza_sala(self, sala, nume):
+        """Anunta sala noua in sali.json (prin jurnal, ajunge si daca suntem offline)"""
+        self.sali[sala] = nume
+        valori = {
+            f'sali/{sala}': nume,
+            f'alerte/{sala}/status': False,
+            f'alerte/{sala}/cine': '',
+            f'versiuni/{sala}': INCREMENT,
+        }
+
+        def _request():
+            try:
+                self.jurnal.trimite(SALA_NOUA, valori, sala=sala)
+            except Exception as e:
+                print(f"Eroare creare sala (ramane in jurnal): {e}")
+
+        threading.Thread(target=_request, daemon=True).start()
+
+    def selecteaza_profil_persoana(self, alese):
         """Selecteaza profilul PERSOANA"""
         nume = self.nume_input.text.strip()
         if not nume:
             self.nume_input.hint_text = "Te rog introdu un nume!"
             return
+        if not alese:
+            self.sali_lbl.text = "Alege cel putin o sala!"
+            return
 
         self.profil = 'persoana'
         self.nume_utilizator = nume.upper()
         self.poate_trimite = False
+        self.sala = None
+        self.abonamente = alese
         self.salveaza_profil()
         self.trece_la_ecran_principal()
 
     def salveaza_profil(self):
         """Salveaza profilul selectat"""
-        self.store.put('profil', tip=self.profil, nume=self.nume_utilizator)
+        self.store.put('profil', tip=self.profil, nume=self.nume_utilizator,
+                       sala=self.sala, abonamente=self.abonamente)
+        # Serviciul urmareste aceleasi sali - il anuntam sa reciteasca profilul
+        self.abonat.trimite({'tip': 'setari'})
 
     def trece_la_ecran_principal(self):
         """Trece de la ecranul de profil la ecranul principal"""
         Window.clearcolor = self.culoare_originala
-        self.root.clear_widgets()
-        main_screen = self.build_main_screen()
-        self.root.add_widget(main_screen)
+        if self.sm.has_screen('principal'):
+            self.aplica_profil()
+        self.arata_ecran('principal')
 
-        # Initializare Android
-        if platform == 'android':
-            Clock.schedule_once(self.init_android, 1)
+        # Porneste serviciul si verificarea serverului
+        self.porneste_monitorizare()
+
+    def aplica_profil(self):
+        """Ecranul principal exista deja - il aducem la profilul nou"""
+        self.status_lbl.text = f"{self.nume_utilizator}"
+        self.btn_panica.disabled = not self.poate_trimite
+        self.btn_panica.opacity = 1 if self.poate_trimite else 0
+        self.info_lbl.text = "Se initializeaza..."
 
-        # Porneste verificarea serverului
-        Clock.schedule_interval(self.verifica_server, 3)
+        # Prima citire dupa schimbarea profilului trebuie sa fie completa;
+        # ultima stare cunoscuta o reevalueaza actorul la evenimentul PROFIL
+        self.citire_alerta.reseteaza()
 
     def build_main_screen(self):
         """Construieste ecranul principal de alerta"""
-        self.alerta_activa = False
-        self.sunt_expeditor = False
-        self.se_proceseaza_oprire = False  # Flag pentru a preveni race condition
-        self.ultima_alerta_expeditor = ""  # Memorează cine a trimis ultima alertă
-        self.is_muted = False
-        self.silent_mode = False
-        self.conectat = False
-        self.erori_consecutive = 0
-
-        # Incarca setari
-        self.incarca_setari()
-
-        self.alarm_sound = None
-        self.incarca_sunet_alarma()
-
         self.main_layout = FloatLayout()
 
         self.layout = BoxLayout(
@@ -400,8 +669,19 @@ class AlertaApp(App):
         )
         self.btn_istoric.bind(on_press=self.arata_istoric)
 
+        # Buton diagnostic - consumul serviciului pe ore
+        btn_diagnostic = ModernButton(
+            text="Diagnostic",
+            btn_color=(0.2, 0.2, 0.25, 1),
+            font_size='12sp',
+            color=(0.6, 0.6, 0.7, 1),
+            size_hint_x=0.35
+        )
+        btn_diagnostic.bind(on_press=self.arata_diagnostic)
+
         bottom_buttons.add_widget(self.btn_schimba_profil)
         bottom_buttons.add_widget(self.btn_istoric)
+        bottom_buttons.add_widget(btn_diagnostic)
 
         spacer2 = Label(size_hint_y=0.02)
 
@@ -417,12 +697,6 @@ class AlertaApp(App):
         self.layout.add_widget(bottom_buttons)
 
         self.main_layout.add_widget(self.layout)
-
-        # Initializare Android daca profilul era deja salvat
-        if platform == 'android' and self.store.exists('profil'):
-            Clock.schedule_once(self.init_android, 1)
-            Clock.schedule_interval(self.verifica_server, 3)
-
         return self.main_layout
 
     def schimba_profil(self, instance):
@@ -431,27 +705,29 @@ class AlertaApp(App):
             self.store.delete('profil')
 
         # Opreste verificarea serverului
-        Clock.unschedule(self.verifica_server)
+        self.opreste_poll()
 
-        # Revine la ecranul de profil
-        self.root.clear_widgets()
-        profile_screen = self.build_profile_screen()
-        self.root.add_widget(profile_screen)
+        # Revine la ecranul de profil, golit de ce s-a introdus data trecuta
+        if self.sm.has_screen('profil'):
+            self.nume_input.text = ""
+            self.nume_container.opacity = 0
+            self.nume_container.disabled = True
+        self.arata_ecran('profil')
 
     def arata_istoric(self, instance):
         """Afiseaza ecranul cu istoricul alertelor"""
-        # Opreste temporar verificarea serverului
-        Clock.unschedule(self.verifica_server)
-
-        self.root.clear_widgets()
-        istoric_screen = self.build_istoric_screen()
-        self.root.add_widget(istoric_screen)
+        # Poll-ul continua: o alerta noua ne aduce inapoi pe ecranul principal
+        self.arata_ecran('istoric')
 
         # Incarca datele din Firebase
         self.incarca_istoric()
 
     def build_istoric_screen(self):
         """Construieste ecranul de istoric"""
+        from kivy.uix.recycleview import RecycleView
+        from kivy.uix.recycleboxlayout import RecycleBoxLayout
+        from istoric_ui import IstoricItem
+
         self.istoric_layout = FloatLayout()
 
         content = BoxLayout(
@@ -493,30 +769,117 @@ class AlertaApp(App):
             size_hint_y=0.1
         )
 
-        # ScrollView pentru lista de istoric
-        scroll = ScrollView(size_hint_y=0.8)
-        self.istoric_list = BoxLayout(
+        # Lista de istoric: doar randurile vizibile exista ca widget-uri
+        self.istoric_rv = RecycleView(size_hint_y=0.8, viewclass=IstoricItem)
+        layout_rv = RecycleBoxLayout(
             orientation='vertical',
             spacing=dp(8),
             size_hint_y=None,
-            padding=(0, dp(8))
+            padding=(0, dp(8)),
+            default_size=(None, dp(75)),
+            default_size_hint=(1, None)
         )
-        self.istoric_list.bind(minimum_height=self.istoric_list.setter('height'))
-        scroll.add_widget(self.istoric_list)
+        layout_rv.bind(minimum_height=layout_rv.setter('height'))
+        self.istoric_rv.add_widget(layout_rv)
+        # Aproape de capatul listei cerem pagina urmatoare
+        self.istoric_rv.bind(scroll_y=self.verifica_scroll_istoric)
 
         content.add_widget(header)
         content.add_widget(self.istoric_loading)
-        content.add_widget(scroll)
+        content.add_widget(self.istoric_rv)
 
         self.istoric_layout.add_widget(content)
         return self.istoric_layout
 
     def incarca_istoric(self):
-        """Incarca istoricul din Firebase"""
+        """Afiseaza imediat istoricul din cache, apoi aduce doar intrarile noi"""
+        self._deschide_istoric_local()
+        self.afiseaza_istoric_local()
+        self.sincronizeaza_istoric()
+
+    def _deschide_istoric_local(self):
+        if self.istoric_local is None:
+            from istoric_local import IstoricLocal
+            self.istoric_local = IstoricLocal()
+
+    def afiseaza_istoric_local(self):
+        """(Re)construieste lista pornind de la cele mai noi intrari din cache"""
+        self.istoric_cea_mai_veche = None
+        self.istoric_cursor = None
+        self.istoric_se_incarca = False
+        self.istoric_complet = False
+        self.istoric_rv.data = []
+
+        intrari = self.istoric_local.pagina(limita=MARIME_PAGINA_ISTORIC)
+        if intrari:
+            self.istoric_loading.text = ""
+            self.adauga_intrari_istoric(intrari)
+
+    def sincronizeaza_istoric(self):
+        """Cere de la Firebase doar intrarile oprite dupa ultima din cache"""
+        ultimul_oprit_la = self.istoric_local.ultimul_oprit_la()
+        ultima = self.istoric_local.ultima_cheie()
+        # Dupa oprit_la, pus de server: o oprire reluata tarziu din jurnal are
+        # o cheie mai veche decat cele din cache, dar oprit_la mai nou.
+        # Regulile bazei trebuie sa aiba ".indexOn": ["oprit_la"] pe istoric.
+        if ultimul_oprit_la is not None:
+            params = {'orderBy': '"oprit_la"', 'startAt': ultimul_oprit_la}
+        elif ultima:
+            # Doar intrari vechi in cache, fara oprit_la; Firebase cere valorile in ghilimele JSON
+            params = {'orderBy': '"$key"', 'startAt': f'"{ultima}"'}
+        else:
+            params = {'orderBy': '"$key"', 'limitToLast': MARIME_PAGINA_ISTORIC}
+
+        def _sync():
+            try:
+                response = client.get(FIREBASE_ISTORIC_URL, params=params)
+                if response.status_code != 200:
+                    raise Exception(f"HTTP {response.status_code}")
+                data = response.json() or {}
+                # startAt e inclusiv; ce avem deja neschimbat nu se numara
+                noi = self.istoric_local.adauga(data)
+                Clock.schedule_once(lambda dt: self._dupa_sincronizare(noi), 0)
+            except Exception as e:
+                Clock.schedule_once(
+                    lambda dt: self.eroare_istoric(str(e)), 0
+                )
+
+        threading.Thread(target=_sync, daemon=True).start()
+
+    def _dupa_sincronizare(self, noi):
+        if noi:
+            self.afiseaza_istoric_local()
+        if not self.istoric_rv.data:
+            self.istoric_loading.text = "Nu exista istoric"
+        else:
+            self.istoric_loading.text = ""
+
+    def incarca_pagina_istoric(self):
+        """Pagina urmatoare: intai din cache, apoi din Firebase cand cache-ul se termina"""
+        if self.istoric_se_incarca or self.istoric_complet:
+            return
+
+        intrari = self.istoric_local.pagina(inainte_de=self.istoric_cursor, limita=MARIME_PAGINA_ISTORIC)
+        if intrari:
+            self.adauga_intrari_istoric(intrari)
+            return
+
+        self.istoric_se_incarca = True
+        inainte_de = self.istoric_cea_mai_veche
+        params = {'orderBy': '"$key"', 'limitToLast': MARIME_PAGINA_ISTORIC}
+        if inainte_de:
+            # endAt e inclusiv - cerem una in plus si o eliminam
+            params['endAt'] = f'"{inainte_de}"'
+            params['limitToLast'] = MARIME_PAGINA_ISTORIC + 1
+
         def _load():
             try:
-                response = requests.get(FIREBASE_ISTORIC_URL, timeout=10)
-                data = response.json()
+                response = client.get(FIREBASE_ISTORIC_URL, params=params)
+                if response.status_code != 200:
+                    raise Exception(f"HTTP {response.status_code}")
+                data = response.json() or {}
+                data.pop(inainte_de, None)
+                self.istoric_local.adauga(data)
                 Clock.schedule_once(lambda dt: self.afiseaza_istoric(data), 0)
             except Exception as e:
                 Clock.schedule_once(
@@ -525,16 +888,17 @@ class AlertaApp(App):
 
         threading.Thread(target=_load, daemon=True).start()
 
+    def verifica_scroll_istoric(self, scroll, scroll_y):
+        # scroll_y = 0 inseamna capatul de jos al listei
+        if scroll_y <= 0.05:
+            self.incarca_pagina_istoric()
+
     def afiseaza_istoric(self, data):
-        """Afiseaza datele din istoric"""
-        self.istoric_list.clear_widgets()
+        """Adauga o pagina venita din Firebase la finalul listei"""
+        self.istoric_se_incarca = False
         self.istoric_loading.text = ""
 
-        if not data:
-            self.istoric_loading.text = "Nu exista istoric"
-            return
-
-        # Converteste dict in lista si sorteaza dupa timestamp (descrescator)
+        # Raspunsul e un obiect JSON, fara ordine
         entries = []
         if isinstance(data, dict):
             for key, value in data.items():
@@ -542,84 +906,177 @@ class AlertaApp(App):
                     value['_key'] = key
                     entries.append(value)
 
-        # Sorteaza descrescator dupa timestamp
-        entries.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        if len(entries) < MARIME_PAGINA_ISTORIC:
+            self.istoric_complet = True
 
-        # Limiteaza la ultimele 50 de intrari
-        entries = entries[:50]
+        self.adauga_intrari_istoric(entries)
 
-        for entry in entries:
-            item = self.creeaza_item_istoric(entry)
-            self.istoric_list.add_widget(item)
-
-        if not entries:
+        if not self.istoric_rv.data:
             self.istoric_loading.text = "Nu exista istoric"
 
-    def creeaza_item_istoric(self, entry):
-        """Creeaza un widget pentru o intrare din istoric"""
-        item = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=dp(75),
-            padding=dp(8)
-        )
-
-        # Background
-        with item.canvas.before:
-            Color(rgba=(0.15, 0.15, 0.2, 1))
-            item.bg_rect = RoundedRectangle(pos=item.pos, size=item.size, radius=[dp(8)])
-        item.bind(pos=lambda i, p: setattr(i.bg_rect, 'pos', p),
-                  size=lambda i, s: setattr(i.bg_rect, 'size', s))
-
-        timestamp = entry.get('timestamp', 'Necunoscut')
+    def adauga_intrari_istoric(self, entries):
+        # Dupa momentul opririi dat de server; cheile sunt cronologice, dar
+        # generate pe telefon
+        entries = sorted(entries, key=lambda e: (moment_istoric(e), e['_key']), reverse=True)
+        self.istoric_rv.data.extend(self.date_item_istoric(entry) for entry in entries)
+
+        if entries:
+            # Cache-ul pagineaza dupa (moment, cheie); Firebase, dupa cheie
+            self.istoric_cursor = (moment_istoric(entries[-1]), entries[-1]['_key'])
+            chei = [entry['_key'] for entry in entries]
+            if self.istoric_cea_mai_veche:
+                chei.append(self.istoric_cea_mai_veche)
+            self.istoric_cea_mai_veche = min(chei)
+
+    def date_item_istoric(self, entry):
+        """Datele afisate de un IstoricItem pentru o intrare din istoric"""
+        if isinstance(entry.get('oprit_la'), (int, float)):
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry['oprit_la'] / 1000))
+        else:
+            timestamp = entry.get('timestamp', 'Necunoscut')
         expeditor = entry.get('expeditor', 'Necunoscut')
         confirmat_de = entry.get('confirmat_de', 'Necunoscut')
         tip = entry.get('tip', 'confirmat')
 
-        # Linia 1: Data si ora
-        lbl_timp = Label(
-            text=f"📅 {timestamp}",
-            font_size='14sp',
-            color=(0.7, 0.7, 0.8, 1),
-            halign='left',
-            valign='middle',
-            size_hint_y=0.4
-        )
-        lbl_timp.bind(size=lbl_timp.setter('text_size'))
-
-        # Linia 2: Detalii
         if tip == 'anulat':
             detalii = f"🔴 Alerta de la {expeditor} - ANULATA de {confirmat_de}"
-            culoare = (1, 0.5, 0.3, 1)
+            culoare = [1, 0.5, 0.3, 1]
         else:
             detalii = f"🟢 Alerta de la {expeditor} - CONFIRMATA de {confirmat_de}"
-            culoare = (0.3, 0.9, 0.4, 1)
-
-        lbl_detalii = Label(
-            text=detalii,
-            font_size='13sp',
-            color=culoare,
-            halign='left',
-            valign='middle',
-            size_hint_y=0.6
-        )
-        lbl_detalii.bind(size=lbl_detalii.setter('text_size'))
-
-        item.add_widget(lbl_timp)
-        item.add_widget(lbl_detalii)
+            culoare = [0.3, 0.9, 0.4, 1]
 
-        return item
+        return {
+            'timp': f"📅 {timestamp}",
+            'detalii': detalii,
+            'culoare_detalii': culoare,
+        }
 
     def eroare_istoric(self, mesaj):
         """Afiseaza eroare la incarcarea istoricului"""
+        self.istoric_se_incarca = False
         self.istoric_loading.text = f"Eroare: {mesaj}"
         self.istoric_loading.color = (1, 0.3, 0.3, 1)
 
     def inchide_istoric(self, instance):
         """Revine la ecranul principal"""
-        self.root.clear_widgets()
-        main_screen = self.build_main_screen()
-        self.root.add_widget(main_screen)
+        self.arata_ecran('principal')
+
+    def arata_diagnostic(self, instance):
+        """Consumul serviciului pe ore, ca sa comparam modurile de monitorizare"""
+        self.arata_ecran('diagnostic')
+        self.actualizeaza_diagnostic()
+
+    def actualizeaza_diagnostic(self, *args):
+        # Serviciul scrie fisierul la cateva minute; il rugam sa salveze si ora in curs
+        if self.abonat.trimite({'tip': 'consum'}):
+            Clock.schedule_once(lambda dt: self.afiseaza_diagnostic(), 0.3)
+        else:
+            self.afiseaza_diagnostic()
+
+    def build_diagnostic_screen(self):
+        """Construieste ecranul de diagnostic (acelasi rand ca istoricul)"""
+        from kivy.uix.recycleview import RecycleView
+        from kivy.uix.recycleboxlayout import RecycleBoxLayout
+        from istoric_ui import IstoricItem
+
+        layout = FloatLayout()
+
+        content = BoxLayout(
+            orientation='vertical',
+            padding=dp(15),
+            spacing=dp(10),
+            size_hint=(0.96, 0.96),
+            pos_hint={'center_x': 0.5, 'center_y': 0.5}
+        )
+
+        header = BoxLayout(orientation='horizontal', size_hint_y=0.1, spacing=dp(10))
+
+        btn_inapoi = ModernButton(
+            text="< Inapoi",
+            btn_color=(0.3, 0.3, 0.4, 1),
+            font_size='14sp',
+            color=(1, 1, 1, 1),
+            size_hint_x=0.3
+        )
+        btn_inapoi.bind(on_press=lambda instance: self.arata_ecran('principal'))
+
+        title = Label(
+            text="DIAGNOSTIC",
+            font_size='22sp',
+            color=(0.9, 0.9, 0.95, 1),
+            bold=True,
+            size_hint_x=0.4
+        )
+
+        btn_actualizeaza = ModernButton(
+            text="Actualizeaza",
+            btn_color=(0.25, 0.25, 0.35, 1),
+            font_size='14sp',
+            color=(1, 1, 1, 1),
+            size_hint_x=0.3
+        )
+        btn_actualizeaza.bind(on_press=self.actualizeaza_diagnostic)
+
+        header.add_widget(btn_inapoi)
+        header.add_widget(title)
+        header.add_widget(btn_actualizeaza)
+
+        # Totalul ultimelor 24 de ore
+        self.diagnostic_total = Label(
+            text="",
+            font_size='13sp',
+            color=(0.6, 0.6, 0.7, 1),
+            size_hint_y=0.14,
+            halign='center',
+            valign='middle'
+        )
+        self.diagnostic_total.bind(size=self.diagnostic_total.setter('text_size'))
+
+        self.diagnostic_rv = RecycleView(size_hint_y=0.76, viewclass=IstoricItem)
+        layout_rv = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(8),
+            size_hint_y=None,
+            padding=(0, dp(8)),
+            default_size=(None, dp(90)),
+            default_size_hint=(1, None)
+        )
+        layout_rv.bind(minimum_height=layout_rv.setter('height'))
+        self.diagnostic_rv.add_widget(layout_rv)
+
+        content.add_widget(header)
+        content.add_widget(self.diagnostic_total)
+        content.add_widget(self.diagnostic_rv)
+
+        layout.add_widget(content)
+        return layout
+
+    def afiseaza_diagnostic(self):
+        from consum import citeste_consum, total
+
+        actualizat_la, ore = citeste_consum()
+        if not ore:
+            self.diagnostic_total.text = "Nicio masuratoare salvata de serviciu"
+            self.diagnostic_rv.data = []
+            return
+
+        self.diagnostic_total.text = (
+            f"Ultimele 24 h: {self.text_consum(total(ore[:24]))}\n"
+            f"Actualizat la {actualizat_la}"
+        )
+        self.diagnostic_rv.data = [
+            {'timp': ora, 'detalii': self.text_consum(contoare), 'culoare_detalii': [0.7, 0.8, 0.95, 1]}
+            for ora, contoare in ore
+        ]
+
+    def text_consum(self, c):
+        return (
+            f"{c.get('cicluri', 0)} poll, {c.get('evenimente_stream', 0)} stream, "
+            f"{c.get('cereri', 0)} cereri, {c.get('octeti_trimisi', 0) / 1024:.1f}/"
+            f"{c.get('octeti_primiti', 0) / 1024:.1f} KB | wake lock "
+            f"{c.get('wake_lock_ms', 0) / 60000:.1f} min | JSON {c.get('parsare_ms', 0):.1f} ms | "
+            f"{c.get('notificari', 0)} notificari"
+        )
 
     def init_android(self, dt):
         """Initializeaza componentele specifice Android"""
@@ -669,11 +1126,27 @@ class AlertaApp(App):
 
     def on_pause(self):
         print("Aplicatia in background - serviciul continua")
+        print(f"Statistici cereri Firebase: {client.rezumat_statistici()}")
+        print(f"Contoare poll: {self.poller.contoare()}")
+        print(f"Citire versiuni: {self.citire_alerta.statistici()}")
+        print(f"Latenta alerte (ms): {self.masuratori.histograma.rezumat()}")
+        print(f"Sunet alarma: {alarma.statistici()}")
+        print(f"Efecte alerta: {self.efecte.statistici()}")
+        print(f"Jurnal scrieri: {self.jurnal.statistici()}")
+        print(f"Scrieri widget-uri: {self.vedere.statistici()}")
+        print(f"Actor alerta: {self.actor.statistici()}")
+        # Ultimele evenimente ale actorului, de reluat cu python actor.py
+        self.actor.salveaza_log(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'actor_evenimente.jsonl'))
+        print(f"Navigare (ms): {self.latenta_navigare}, evenimente Clock active: {len(Clock.get_events())}")
+        self.planificator.seteaza_ecran(False)
         return True
 
     def on_resume(self):
         print("Aplicatia a revenit din background")
-        Clock.schedule_once(lambda dt: self.verifica_server(0), 0.5)
+        # Conexiunea keep-alive poate fi inchisa cat timp am stat in background
+        client.incalzeste_async(FIREBASE_ALERTE_URL)
+        self.planificator.seteaza_ecran(True)
+        self.programeaza_poll(0.5)
 
     def on_stop(self):
         print("Aplicatia se opreste - serviciul ramane activ")
@@ -689,6 +1162,8 @@ class AlertaApp(App):
     def salveaza_setari(self):
         try:
             self.store.put('silent_mode', enabled=self.silent_mode)
+            # Serviciul tine setarile in memorie - il anuntam sa le reciteasca
+            self.abonat.trimite({'tip': 'setari'})
         except Exception as e:
             print(f"Eroare salvare setari: {e}")
 
@@ -699,60 +1174,53 @@ class AlertaApp(App):
 
     def actualizeaza_buton_silent(self):
         if self.silent_mode:
-            self.btn_silent.text = "SILENT ON"
-            self.btn_silent.set_color((0.6, 0.3, 0.6, 1))
-            self.conexiune_lbl.text = "Mod silentios ACTIV"
-            self.conexiune_lbl.color = (0.6, 0.3, 0.6, 1)
+            self.vedere.seteaza(self.btn_silent, text="SILENT ON", culoare=(0.6, 0.3, 0.6, 1))
+            self.vedere.seteaza(self.conexiune_lbl, text="Mod silentios ACTIV", color=(0.6, 0.3, 0.6, 1))
         else:
-            self.btn_silent.text = "SILENT OFF"
-            self.btn_silent.set_color((0.3, 0.3, 0.4, 1))
+            self.vedere.seteaza(self.btn_silent, text="SILENT OFF", culoare=(0.3, 0.3, 0.4, 1))
             if self.conectat:
-                self.conexiune_lbl.text = "Conectat"
-                self.conexiune_lbl.color = (0.2, 0.8, 0.2, 1)
+                self.actualizeaza_stare_conexiune(True)
 
     def incarca_sunet_alarma(self):
-        try:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            alarm_wav = os.path.join(base_path, 'alarm.wav')
-            alarm_mp3 = os.path.join(base_path, 'alarm.mp3')
-
-            if os.path.exists(alarm_wav):
-                self.alarm_sound = SoundLoader.load(alarm_wav)
-            elif os.path.exists(alarm_mp3):
-                self.alarm_sound = SoundLoader.load(alarm_mp3)
-            elif os.path.exists('alarm.wav'):
-                self.alarm_sound = SoundLoader.load('alarm.wav')
-            elif os.path.exists('alarm.mp3'):
-                self.alarm_sound = SoundLoader.load('alarm.mp3')
-            else:
-                print("Nu s-a gasit fisier alarm.wav/mp3")
-
-            if self.alarm_sound:
-                self.alarm_sound.loop = True
-                self.alarm_sound.volume = 1.0
-        except Exception as e:
-            print(f"Eroare incarcare sunet: {e}")
+        alarma.incarca()
+        marcheaza('sunet_incarcat')
+        print(f"Sunet alarma: {alarma.statistici()}")
 
     def trimite_alerta(self, instance):
-        self.sunt_expeditor = True
         self.info_lbl.text = "Alerta trimisa, se asteapta confirmare..."
         self.info_lbl.color = (1, 0.7, 0.2, 1)
         self.btn_panica.disabled = True
 
+        # Dupa o alerta trimisa de aici vrem sa vedem repede confirmarea
+        self.planificator.trimitere_locala()
+        self.programeaza_poll(self.planificator.urmatorul_interval())
+
+        # ID-ul si momentul apasarii (in ceasul serverului) permit receptorilor
+        # sa masoare latenta; trimis_la il completeaza serverul
+        alerta_id = uuid.uuid4().hex[:12]
+        apasat_la = int(self.masuratori.ceas.acum_server_ms())
+        start = time.perf_counter()
+
+        sala = self.sala
+        valori = valori_trimitere(sala, self.nume_utilizator, alerta_id, apasat_la)
+        self.executa(ALERTA_TRIMISA, sala=sala, alerta_id=alerta_id)
+
         def _request():
             try:
-                payload = {'status': True, 'cine': self.nume_utilizator}
-                response = requests.patch(FIREBASE_URL, json=payload, timeout=10)
-                if response.status_code == 200:
+                if self.jurnal.trimite(TRIMITERE, valori, sala=sala, alerta_id=alerta_id):
+                    self.masuratori.durata('confirmare_trimitere', (time.perf_counter() - start) * 1000)
                     Clock.schedule_once(lambda dt: self.alerta_trimisa_ok(), 0)
                 else:
-                    Clock.schedule_once(lambda dt: self.eroare_trimitere("Eroare server"), 0)
+                    Clock.schedule_once(lambda dt: self.eroare_trimitere(alerta_id, "Respinsa de server"), 0)
+            # Alerta ramane in jurnal si pleaca singura cand revine conexiunea
             except requests.exceptions.Timeout:
-                Clock.schedule_once(lambda dt: self.eroare_trimitere("Timeout"), 0)
+                Clock.schedule_once(
+                    lambda dt: self.eroare_trimitere(alerta_id, "Timeout - se retrimite automat"), 0)
             except requests.exceptions.ConnectionError:
-                Clock.schedule_once(lambda dt: self.eroare_trimitere("Fara conexiune"), 0)
+                Clock.schedule_once(
+                    lambda dt: self.eroare_trimitere(alerta_id, "Fara conexiune - se retrimite automat"), 0)
             except Exception as e:
-                Clock.schedule_once(lambda dt: self.eroare_trimitere(str(e)), 0)
+                Clock.schedule_once(lambda dt: self.eroare_trimitere(alerta_id, str(e)), 0)
 
         threading.Thread(target=_request, daemon=True).start()
 
@@ -760,65 +1228,144 @@ class AlertaApp(App):
         self.info_lbl.text = "Alerta trimisa! Se asteapta confirmare..."
         self.info_lbl.color = (1, 0.7, 0.2, 1)
 
-    def eroare_trimitere(self, mesaj):
+    def eroare_trimitere(self, alerta_id, mesaj):
         self.info_lbl.text = f"Eroare: {mesaj}"
         self.info_lbl.color = (1, 0.3, 0.3, 1)
         if self.poate_trimite:
             self.btn_panica.disabled = False
-        self.sunt_expeditor = False
+        self.executa(TRIMITERE_ESUATA, alerta_id=alerta_id)
 
-    def verifica_server(self, dt):
-        def _check():
-            # Nu verifica dacă se procesează oprirea (previne race condition)
-            if self.se_proceseaza_oprire:
-                return
+    def porneste_poll(self, intarziere=None):
+        self.poll_activ = True
+        if intarziere is None:
+            intarziere = self.planificator.urmatorul_interval()
+        self.programeaza_poll(intarziere)
 
-            try:
-                response = requests.get(FIREBASE_URL, timeout=10)
-                data = response.json()
-
-                self.erori_consecutive = 0
-                Clock.schedule_once(lambda dt: self.actualizeaza_stare_conexiune(True), 0)
-
-                if data:
-                    status = data.get('status', False)
-                    cine = data.get('cine', 'Necunoscut')
+    def opreste_poll(self):
+        self.poll_activ = False
+        Clock.unschedule(self.verifica_server)
 
-                    # Verificare suplimentară pentru a preveni re-trigger
-                    if status == True and not self.se_proceseaza_oprire:
-                        self.activeaza_alarma_pe_ui(cine)
-                    elif status == False and self.alerta_activa:
-                        self.dezactiveaza_alarma_pe_ui()
-                    elif status == False and not self.alerta_activa and not self.conectat:
-                        Clock.schedule_once(lambda dt: self.prima_conectare(), 0)
+    def programeaza_poll(self, intarziere):
+        """Exista mereu cel mult un poll programat"""
+        Clock.unschedule(self.verifica_server)
+        if self.poll_activ:
+            Clock.schedule_once(self.verifica_server, intarziere)
 
-            except requests.exceptions.Timeout:
-                self.erori_consecutive += 1
-                Clock.schedule_once(lambda dt: self.actualizeaza_stare_conexiune(False, "Timeout"), 0)
-            except requests.exceptions.ConnectionError:
-                self.erori_consecutive += 1
-                Clock.schedule_once(lambda dt: self.actualizeaza_stare_conexiune(False, "Fara conexiune"), 0)
-            except Exception as e:
-                self.erori_consecutive += 1
-                Clock.schedule_once(lambda dt: self.actualizeaza_stare_conexiune(False, str(e)[:30]), 0)
+    def verifica_server(self, dt):
+        self.programeaza_poll(self.planificator.urmatorul_interval())
 
-        threading.Thread(target=_check, daemon=True).start()
+        # Cat timp serviciul ne trimite starea nu facem poll propriu; in
+        # timpul unei opriri poll-ul continua, actorul stie ce sa ignore
+        if self.abonat.disponibil:
+            self.poller.sari()
+            return
+        self.poller.tick()
+
+    def _cerere_poll(self):
+        """Ruleaza pe thread-ul poller-ului; returneaza (modificat, data, primit_la)"""
+        modificat, data = self.citire_alerta.citeste()
+        return modificat, data, acum_ms()
+
+    def _proceseaza_rezultate_poll(self, dt):
+        """Rezultatele poll-ului devin evenimente pentru actor, pe thread-ul Kivy"""
+        for secventa, rezultat, eroare in self.poller.goleste():
+            if eroare is None:
+                modificat, data, primit_la = rezultat
+                marcheaza('primul_poll')
+                self.planificator.succes()
+                self.executa(RASPUNS, sursa='poll', seq=secventa, modificat=modificat,
+                             data=data, primit_la=primit_la)
+                continue
+
+            self.planificator.eroare()
+            if isinstance(eroare, requests.exceptions.Timeout):
+                mesaj = "Timeout"
+            elif isinstance(eroare, requests.exceptions.ConnectionError):
+                mesaj = "Fara conexiune"
+            else:
+                mesaj = str(eroare)[:30]
+            self.executa(EROARE, sursa='poll', seq=secventa, mesaj=mesaj)
+
+    def executa(self, eveniment, **date):
+        """Trimite un eveniment actorului si aplica pe UI comenzile rezultate"""
+        for comanda, args in self.actor.trimite(eveniment, **date):
+            if comanda == ARATA_CONEXIUNE:
+                self.actualizeaza_stare_conexiune(args['conectat'], args['eroare'])
+                if args['conectat']:
+                    self.reia_jurnal()
+            elif comanda == ARATA_ALERTA:
+                if args['stare'] is not None:
+                    self.masuratori.alerta_noua(args['stare'], args['primit_la'])
+                self._interfata_alerta(args['cine'], args['alte_sali'], args['propria'])
+            elif comanda == ARATA_NORMAL:
+                self._interfata_normala()
+            elif comanda == PRIMA_STARE:
+                self.prima_conectare()
+            elif comanda == TACI:
+                self.efecte.taci()
+            elif comanda == SCRIE_OPRIRE:
+                self.scrie_oprire(**args)
+
+    def _la_mesaj_serviciu(self, mesaj):
+        # Pe ecranul de profil (la prima pornire) nu avem unde afisa starea
+        if not self.sm.has_screen('principal'):
+            return
+        tip = mesaj.get('tip')
+        if tip in ('conexiune', 'heartbeat'):
+            self.executa(CONEXIUNE, conectat=bool(mesaj.get('conectat')), eroare=mesaj.get('eroare'))
+        elif tip == 'stare' and self.poll_activ:
+            marcheaza('prima_stare_serviciu')
+            self.executa(RASPUNS, sursa='serviciu', seq=mesaj.get('seq', 0),
+                         data=mesaj.get('data'), primit_la=mesaj.get('primit_la'))
+
+    def _la_disponibilitate_serviciu(self, disponibil):
+        if disponibil:
+            print("Serviciul publica starea - poll-ul local e oprit")
+            # Secventele serviciului o iau de la capat la fiecare pornire a lui
+            self.executa(SURSA, sursa='serviciu', seq=0)
+            return
+        print("Serviciul nu raspunde - revin la poll propriu")
+        # Un poll pornit inainte de serviciu ar aduce o stare mai veche
+        self.executa(SURSA, sursa='poll', seq=self.poller.secventa())
+        self.citire_alerta.reseteaza()
+        self.programeaza_poll(0)
 
     def actualizeaza_stare_conexiune(self, conectat, eroare=None):
+        """Apelata la fiecare poll/heartbeat; widget-urile se ating doar la schimbare"""
         self.conectat = conectat
         if conectat:
-            if not self.alerta_activa:
-                self.status_indicator.set_status('connected')
+            if not self.actor.alerta_activa:
+                self.vedere.seteaza(self.status_indicator, status='connected')
             if self.silent_mode:
-                self.conexiune_lbl.text = "Mod silentios ACTIV"
-                self.conexiune_lbl.color = (0.6, 0.3, 0.6, 1)
+                text, culoare = "Mod silentios ACTIV", (0.6, 0.3, 0.6, 1)
             else:
-                self.conexiune_lbl.text = "Conectat"
-                self.conexiune_lbl.color = (0.2, 0.8, 0.2, 1)
+                text, culoare = "Conectat", (0.2, 0.8, 0.2, 1)
         else:
-            self.status_indicator.set_status('disconnected')
-            self.conexiune_lbl.text = f"Deconectat: {eroare}" if eroare else "Deconectat"
-            self.conexiune_lbl.color = (1, 0.3, 0.3, 1)
+            self.vedere.seteaza(self.status_indicator, status='disconnected')
+            text = f"Deconectat: {eroare}" if eroare else "Deconectat"
+            culoare = (1, 0.3, 0.3, 1)
+
+        in_asteptare = self.jurnal.in_asteptare()
+        if in_asteptare:
+            text += f" ({in_asteptare} netrimise)"
+        self.vedere.seteaza(self.conexiune_lbl, text=text, color=culoare)
+
+    def reia_jurnal(self):
+        """Retrimite in fundal scrierile ramase in jurnal, daca exista"""
+        if self._reluare_in_curs or not self.jurnal.in_asteptare():
+            return
+        self._reluare_in_curs = True
+
+        def _reia():
+            try:
+                self.jurnal.reia()
+            except Exception as e:
+                print(f"Eroare reluare jurnal: {e}")
+            finally:
+                self._reluare_in_curs = False
+            print(f"Jurnal scrieri: {self.jurnal.statistici()}")
+
+        threading.Thread(target=_reia, daemon=True).start()
 
     def prima_conectare(self):
         if self.poate_trimite:
@@ -832,12 +1379,7 @@ class AlertaApp(App):
 
     def mute_alarma(self, instance):
         self.is_muted = True
-
-        if self.alarm_sound:
-            self.alarm_sound.stop()
-
-        if hasattr(self, 'vibratie_event'):
-            self.vibratie_event.cancel()
+        self.efecte.taci()
 
         self.btn_mute.text = "MUTED"
         self.btn_mute.set_color((0.3, 0.3, 0.35, 1))
@@ -846,77 +1388,41 @@ class AlertaApp(App):
         self.info_lbl.text = f"{self.info_lbl.text}\n(Sunet oprit)"
 
     def opreste_alarma_global(self, instance):
-        # Previne double-click și race condition
-        if self.se_proceseaza_oprire:
-            return
-        self.se_proceseaza_oprire = True
-
-        # Salveaza in istoric cine a confirmat
-        expeditor_alerta = getattr(self, 'expeditor_curent', 'Necunoscut')
-        era_expeditor = self.sunt_expeditor  # Salvăm înainte de reset
-
-        # Oprește sunetul și vibrația imediat
-        if self.alarm_sound:
-            self.alarm_sound.stop()
-        if hasattr(self, 'vibratie_event'):
-            try:
-                self.vibratie_event.cancel()
-            except:
-                pass
+        # Dublu click, sau alerta deja oprita: actorul nu mai cere nimic
+        self.executa(OPRIRE_CERUTA)
 
+    def scrie_oprire(self, sala, alerta_id, nr, expeditor, era_expeditor):
+        """Trimite oprirea pe alt thread; actorul afla cand s-a terminat"""
         def _reset():
             try:
-                # IMPORTANT: Resetează Firebase PRIMUL
-                requests.patch(FIREBASE_URL, json={'status': False, 'cine': ''}, timeout=10)
-
-                # Apoi salvează în istoric
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                istoric_entry = {
-                    'timestamp': timestamp,
-                    'expeditor': expeditor_alerta,
-                    'confirmat_de': self.nume_utilizator,
-                    'tip': 'anulat' if era_expeditor else 'confirmat'
-                }
-                requests.post(FIREBASE_ISTORIC_URL, json=istoric_entry, timeout=10)
-
-                # Actualizează UI-ul DUPĂ ce Firebase e resetat
-                Clock.schedule_once(lambda dt: self._finalizeaza_oprire(), 0)
+                # O singura scriere: resetarea alertei + intrarea in istoric
+                _, valori = valori_oprire(sala, expeditor, self.nume_utilizator, era_expeditor,
+                                          self.masuratori.ceas.acum_server_ms(), nr)
+                if not self.jurnal.trimite(OPRIRE, valori, sala=sala, alerta_id=alerta_id):
+                    Clock.schedule_once(lambda dt: self.eroare_oprire(sala, alerta_id), 0)
+                    return
             except Exception as e:
-                print(f"Eroare salvare istoric: {e}")
-                # Chiar dacă e eroare, resetăm UI-ul
-                Clock.schedule_once(lambda dt: self._finalizeaza_oprire(), 0)
+                # Si asa, interfata revine la normal; scrierea pleaca din jurnal
+                print(f"Eroare oprire alerta (ramane in jurnal): {e}")
+            Clock.schedule_once(lambda dt: self.executa(OPRIRE_TERMINATA, sala=sala, alerta_id=alerta_id), 0)
 
         threading.Thread(target=_reset, daemon=True).start()
 
-    def _finalizeaza_oprire(self):
-        """Finalizează oprirea alertei după ce Firebase a fost resetat"""
-        self.dezactiveaza_alarma_pe_ui()
-        # Resetăm flag-ul după un scurt delay pentru siguranță
-        Clock.schedule_once(lambda dt: setattr(self, 'se_proceseaza_oprire', False), 1)
-
-    def activeaza_alarma_pe_ui(self, nume_expeditor):
-        Clock.schedule_once(lambda dt: self._interfata_alerta(nume_expeditor), 0)
-
-    def dezactiveaza_alarma_pe_ui(self):
-        Clock.schedule_once(lambda dt: self._interfata_normala(), 0)
-
-    def _interfata_alerta(self, nume):
-        # Previne re-trigger în timpul procesării opririi
-        if self.se_proceseaza_oprire:
-            return
-
-        if self.alerta_activa:
-            return
+    def eroare_oprire(self, sala, alerta_id):
+        """Serverul a respins oprirea: alerta ramane activa pentru toti, deci si aici"""
+        self.executa(OPRIRE_RESPINSA, sala=sala, alerta_id=alerta_id)
+        self.info_lbl.text = f"{self.info_lbl.text}\nEroare: oprirea a fost respinsa de server"
+        self.info_lbl.color = (1, 0.3, 0.3, 1)
 
-        self.alerta_activa = True
-        self.expeditor_curent = nume  # Salvam pentru istoric
-        self.ultima_alerta_expeditor = nume  # Memorăm expeditorul
+    def _interfata_alerta(self, nume, alte_sali=0, propria=False):
+        """Doar widget-urile; actorul a decis deja ca alerta trebuie afisata"""
+        self.planificator.seteaza_alerta(True)
+        if self.sm.current != 'principal':
+            self.arata_ecran('principal')
         self.status_indicator.set_status('alert')
 
-        # Verificam daca suntem expeditorul (verificare îmbunătățită)
-        # Verificăm atât flag-ul cât și numele pentru siguranță
-        este_propria_alerta = (nume == self.nume_utilizator)
-        if este_propria_alerta and (self.sunt_expeditor or self.poate_trimite):
+        # Alerta propriei sali, trimisa de aici sau de alt telefon al salii
+        if propria:
             self.info_lbl.text = "Alerta trimisa, se asteapta confirmare..."
             self.info_lbl.color = (1, 0.7, 0.2, 1)
             self.info_lbl.font_size = '22sp'
@@ -938,6 +1444,7 @@ class AlertaApp(App):
             self.btn_stop.opacity = 1
             self.btn_panica.disabled = True
             self.btn_panica.opacity = 0
+            self._masoara_afisare()
             return
 
         # Alarma completa pentru receptori
@@ -946,6 +1453,8 @@ class AlertaApp(App):
         self.status_lbl.text = f"{self.nume_utilizator}"
         self.status_lbl.color = (1, 0.3, 0.3, 1)
         self.info_lbl.text = f"ALERTA DE LA: {nume}"
+        if alte_sali:
+            self.info_lbl.text += f"\n(+{alte_sali} alte sali in alerta)"
         self.info_lbl.color = (1, 0.9, 0.2, 1)
         self.info_lbl.font_size = '24sp'
         self.info_lbl.bold = True
@@ -959,15 +1468,18 @@ class AlertaApp(App):
         self.btn_panica.disabled = True
         self.btn_panica.opacity = 0
 
-        if not self.is_muted:
-            if self.alarm_sound:
-                self.alarm_sound.play()
-            self.vibratie_event = Clock.schedule_interval(self.vibreaza_hardware, 2)
+        self._masoara_afisare()
 
-        self.pulse_event = Clock.schedule_interval(self.pulse_stop_button, 0.8)
+        # Totul porneste si se opreste impreuna (efecte.py)
+        if self.efecte.porneste(self.btn_stop, sunet=not self.is_muted):
+            self.masuratori.etapa('sunet')
 
-        if platform == 'android':
-            self.wake_screen()
+    def _masoara_afisare(self):
+        """Inregistreaza momentul primului frame desenat cu alerta"""
+        def _la_flip(*args):
+            Window.unbind(on_flip=_la_flip)
+            self.masuratori.etapa('afisare')
+        Window.bind(on_flip=_la_flip)
 
     def wake_screen(self):
         if platform == 'android':
@@ -984,13 +1496,8 @@ class AlertaApp(App):
                 print(f"Eroare wake screen: {e}")
 
     def _interfata_normala(self):
-        if not self.alerta_activa:
-            return
-
-        self.alerta_activa = False
-        self.sunt_expeditor = False
+        self.planificator.seteaza_alerta(False)
         self.is_muted = False
-        self.ultima_alerta_expeditor = ""  # Resetăm expeditorul
         Window.clearcolor = self.culoare_originala
 
         self.status_lbl.text = f"{self.nume_utilizator}"
@@ -1005,8 +1512,9 @@ class AlertaApp(App):
 
         self.status_indicator.set_status('connected')
 
-        if self.alarm_sound:
-            self.alarm_sound.stop()
+        # Sunet, vibratie si puls - toate, orice ar fi apucat sa porneasca
+        self.efecte.opreste()
+        print(f"Efecte alerta: {self.efecte.statistici()}")
 
         self.btn_stop.disabled = True
         self.btn_stop.opacity = 0
@@ -1021,26 +1529,8 @@ class AlertaApp(App):
 
         self.actualizeaza_buton_silent()
 
-        if hasattr(self, 'pulse_event'):
-            self.pulse_event.cancel()
-        if hasattr(self, 'vibratie_event'):
-            self.vibratie_event.cancel()
-
-    def pulse_stop_button(self, dt):
-        if self.btn_stop.opacity == 1:
-            self.btn_stop.opacity = 0.7
-        else:
-            self.btn_stop.opacity = 1
-
-    def vibreaza_hardware(self, dt):
-        if self.is_muted:
-            return
-        try:
-            vibrator.vibrate(1)
-        except NotImplementedError:
-            print("Bzzzt! (Vibratie simulata pe PC)")
-        except Exception as e:
-            print(f"Eroare vibratie: {e}")
+        # O alerta s-a incheiat - salvam latentele masurate (scriere rara)
+        self.masuratori.histograma.salveaza()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,315 @@
+"""
+Monitorizarea alertelor fara dependinte de platforma: stream-ul sau poll-ul
+pe Firebase, urmarirea salilor, jurnalul de scrieri, canalul IPC catre
+interfata si masuratorile de latenta. Ce tine de telefon sau de desktop
+vine din doua backend-uri primite la construire:
+
+notificator - porneste()                        notificarea persistenta, la start
+              alerta(expeditor, sala)           alerta cu sunet
+              alerta_silentioasa(expeditor, sala)
+              sterge_alerta(sala)
+              opreste()
+energie     - tine_treaz() / elibereaza()       CPU-ul activ cat ruleaza bucla
+              trezeste_ecran()
+              ecran_pornit()                    pentru intervalul de poll
+
+Backend-uri: Android in service.py, Linux in desktop.py, in memorie aici
+(NotificatorMemorie, EnergieMemorie) pentru teste si masuratori.
+"""
+import threading
+from consum import ContorConsum, CALE_CONSUM
+from firebase_client import client as client_comun
+from ipc import PublicatorStare
+from jurnal import JurnalScrieri, CALE_JURNAL
+from latenta import MasuratoareAlerta, acum_ms, url_ceas
+from scheduler import PollScheduler
+from setari import Setari
+from stare import UrmarireSali, CitireAlerte, abonamente_profil, PORNITA, OPRITA
+from stream import FirebaseStream
+
+# Configurare Firebase - trebuie sa fie aceeasi ca in main.py
+FIREBASE_BAZA_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app"
+
+# "stream" - o singura conexiune deschisa pe alerte.json (toate salile,
+#            filtrate local dupa abonamente)
+# "poll"   - interogare periodica a versiuni.json, cu interval adaptiv (scheduler.py)
+MOD_MONITORIZARE = "stream"
+
+# Cat de des verificam mtime-ul settings.json (secunde)
+INTERVAL_REVALIDARE_SETARI = 30
+
+
+class _PublicatorNul:
+    """In locul canalului IPC, cand nu exista interfata care sa asculte"""
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def publica_stare(self, data, primit_la=None):
+        pass
+
+    def publica_conexiune(self, conectat, eroare=None):
+        pass
+
+
+class NotificatorMemorie:
+    """Notificator fals: tine minte ce s-a afisat, fara sa afiseze nimic"""
+
+    def __init__(self):
+        self.evenimente = []
+        self.active = {}
+        self.pornit = False
+
+    def porneste(self):
+        self.pornit = True
+
+    def opreste(self):
+        self.pornit = False
+
+    def alerta(self, expeditor, sala=None):
+        self.evenimente.append(('alerta', sala, expeditor))
+        self.active[sala] = expeditor
+
+    def alerta_silentioasa(self, expeditor, sala=None):
+        self.evenimente.append(('silentioasa', sala, expeditor))
+        self.active[sala] = expeditor
+
+    def sterge_alerta(self, sala=None):
+        self.evenimente.append(('sterge', sala, None))
+        self.active.pop(sala, None)
+
+
+class EnergieMemorie:
+    """Backend de energie fals; ecranul se aprinde si se stinge din test"""
+
+    def __init__(self, ecran=True):
+        self.ecran = ecran
+        self.treaz = False
+        self.treziri = 0
+
+    def tine_treaz(self):
+        self.treaz = True
+
+    def elibereaza(self):
+        self.treaz = False
+
+    def trezeste_ecran(self):
+        self.treziri += 1
+
+    def ecran_pornit(self):
+        return self.ecran
+
+
+class MonitorAlerte:
+    def __init__(self, notificator, energie, client=client_comun, url_baza=FIREBASE_BAZA_URL,
+                 mod=MOD_MONITORIZARE, abonamente=None, setari=None, ipc=True,
+                 cale_jurnal=CALE_JURNAL, fisier_latente='latenta_serviciu.json', cale_consum=CALE_CONSUM):
+        """
+        abonamente - salile urmarite, fixe; implicit se iau din profilul salvat
+                     si se schimba odata cu el
+        ipc        - publica starea pe socket-ul local pentru interfata Kivy
+        """
+        self.notificator = notificator
+        self.energie = energie
+        self.client = client
+        self.url_baza = url_baza
+        self.url_alerte = f"{url_baza}/alerte.json"
+        self.mod = mod
+        self.running = True
+        self._oprire = threading.Event()
+        self.stream = None
+        self.planificator = PollScheduler()
+        self.masuratori = MasuratoareAlerta(fisier_latente)
+
+        # Cicluri, cereri, octeti, wake lock, decodare JSON si notificari, pe
+        # ore; toate cererile clientului din acest proces intra la socoteala
+        self.consum = ContorConsum(cale_consum)
+        self.client.contor = self.consum
+
+        # Scrierile ramase netrimise de aplicatie (poate oprita intre timp)
+        # se reiau de aici cand revine conexiunea
+        self.jurnal = JurnalScrieri(client, f"{url_baza}/.json", self.url_alerte, cale=cale_jurnal)
+        self._reluare_in_curs = False
+
+        # Interfata primeste starea de aici si nu mai face propriul poll
+        if ipc:
+            self.publicator = PublicatorStare(la_mesaj=self.la_mesaj_interfata)
+        else:
+            self.publicator = _PublicatorNul()
+
+        # Setarile stau in memorie; se recitesc cand anunta interfata
+        # sau cand verificarea periodica gaseste alt mtime
+        self.setari = setari if setari is not None else Setari()
+        self.abonamente_fixe = list(abonamente) if abonamente else None
+
+        # Starea fiecarei sali urmarite; ultima stare a alerte.json se
+        # pastreaza ca sa reevaluam cand se schimba abonamentele
+        abonamente = self.abonamente()
+        self.urmarire = UrmarireSali(abonamente)
+        # In modul poll citim doar versiuni.json; canalul, la schimbare
+        self.citire_alerta = CitireAlerte(client, url_baza, abonamente)
+        self.ultima_stare = None
+        self._lock_stare = threading.Lock()
+
+        self.notificator.porneste()
+
+    def abonamente(self):
+        if self.abonamente_fixe:
+            return list(self.abonamente_fixe)
+        return abonamente_profil(self.setari.profil())
+
+    def is_silent_mode(self):
+        """Verifica daca modul silentios este activ (din memorie, fara I/O)"""
+        return self.setari.silent_mode()
+
+    def la_mesaj_interfata(self, mesaj):
+        if mesaj.get('tip') == 'setari':
+            if self.setari.reincarca_daca_modificat():
+                self.actualizeaza_abonamente()
+        elif mesaj.get('tip') == 'consum':
+            # Ecranul de diagnostic vrea si ora in curs
+            self.consum.salveaza()
+
+    def revalideaza_setari(self):
+        """Verificare periodica, in afara caii de alerta"""
+        while not self._oprire.wait(INTERVAL_REVALIDARE_SETARI):
+            if self.setari.reincarca_daca_modificat():
+                self.actualizeaza_abonamente()
+            self.consum.salveaza_daca_e_cazul()
+
+    def actualizeaza_abonamente(self):
+        """Profilul s-a schimbat: reevaluam ultima stare pentru salile noi"""
+        abonamente = self.abonamente()
+        with self._lock_stare:
+            if abonamente == self.urmarire.abonamente:
+                return
+            for sala in set(self.urmarire.active()) - set(abonamente):
+                self.notificator.sterge_alerta(sala)
+            self.urmarire.seteaza_abonamente(abonamente)
+            self.citire_alerta.seteaza_abonamente(abonamente)
+        print(f"Sali urmarite: {abonamente}")
+        if self.ultima_stare is not None:
+            self.proceseaza_stare(self.ultima_stare)
+
+    def verifica_alerta(self):
+        """Verifica starea alertei pe Firebase"""
+        self.consum.adauga('cicluri')
+        try:
+            modificat, data = self.citire_alerta.citeste()
+            primit_la = acum_ms()
+            self.planificator.succes()
+            self.publicator.publica_conexiune(True)
+            self.reia_jurnal()
+            # 304 - nimic nou, nu are rost sa evaluam starea
+            if modificat:
+                self.publicator.publica_stare(data, primit_la)
+                self.proceseaza_stare(data, primit_la)
+        except Exception as e:
+            self.planificator.eroare()
+            self.publicator.publica_conexiune(False, str(e)[:30])
+            print(f"Eroare verificare alerta: {e}")
+        self.planificator.seteaza_alerta(self.urmarire.activa)
+
+    def reia_jurnal(self):
+        """Retrimite pe alt thread scrierile din jurnal, daca exista"""
+        if self._reluare_in_curs or not self.jurnal.in_asteptare():
+            return
+        self._reluare_in_curs = True
+
+        def _reia():
+            try:
+                self.jurnal.reia()
+                print(f"Jurnal scrieri: {self.jurnal.statistici()}")
+            except Exception as e:
+                print(f"Eroare reluare jurnal: {e}")
+            finally:
+                self._reluare_in_curs = False
+
+        threading.Thread(target=_reia, daemon=True).start()
+
+    def la_eveniment_stream(self, data):
+        primit_la = acum_ms()
+        self.consum.adauga('evenimente_stream')
+        self.publicator.publica_conexiune(True)
+        self.publicator.publica_stare(data, primit_la)
+        self.proceseaza_stare(data, primit_la)
+        self.reia_jurnal()
+
+    def la_eroare_stream(self, eroare):
+        self.publicator.publica_conexiune(False, str(eroare)[:30])
+
+    def proceseaza_stare(self, data, primit_la=None):
+        """Aplica starea alerte.json primita prin poll sau stream"""
+        with self._lock_stare:
+            self.ultima_stare = data
+            tranzitii = self.urmarire.aplica(data)
+
+        for sala, tranzitie, stare in tranzitii:
+            # Daca s-a activat o alerta noua
+            if tranzitie == PORNITA:
+                cine = stare.get('cine', 'Necunoscut')
+                self.masuratori.alerta_noua(stare, primit_la)
+
+                # Verifica daca modul silentios este activ
+                if not self.is_silent_mode():
+                    self.notificator.alerta(cine, sala)
+                    self.masuratori.etapa('notificare')
+                    self.energie.trezeste_ecran()
+                    self.consum.adauga('treziri_ecran')
+                else:
+                    # Mod silentios - doar notificare discreta fara sunet
+                    self.notificator.alerta_silentioasa(cine, sala)
+                    self.masuratori.etapa('notificare')
+                self.consum.adauga('notificari')
+                self.masuratori.histograma.salveaza()
+
+            # Daca alerta s-a oprit
+            elif tranzitie == OPRITA:
+                self.notificator.sterge_alerta(sala)
+
+    def run(self):
+        """Bucla principala; ruleaza pana la stop()"""
+        self.energie.tine_treaz()
+        self.consum.wake_lock_pornit()
+        self.client.incalzeste(self.url_alerte)
+        self.masuratori.ceas.sincronizeaza(self.client, url_ceas(self.url_baza, self.setari.id_dispozitiv()))
+
+        try:
+            self.publicator.start()
+        except Exception as e:
+            # Fara canal local interfata isi face singura poll-ul
+            print(f"Eroare pornire canal IPC: {e}")
+
+        threading.Thread(target=self.revalideaza_setari, daemon=True).start()
+
+        try:
+            if self.mod == "stream":
+                # Dupa fiecare reconectare, Firebase retrimite starea completa
+                self.stream = FirebaseStream(
+                    self.url_alerte, self.la_eveniment_stream,
+                    on_error=self.la_eroare_stream, client=self.client
+                )
+                if self.running:
+                    self.stream.run()
+            else:
+                # Faza aleatoare: telefoanele nu interogheaza toate in aceeasi secunda
+                self._oprire.wait(self.planificator.faza_initiala())
+                while self.running:
+                    self.planificator.seteaza_ecran(self.energie.ecran_pornit())
+                    self.verifica_alerta()
+                    self._oprire.wait(self.planificator.urmatorul_interval())
+        finally:
+            self.publicator.stop()
+            self.energie.elibereaza()
+            self.consum.wake_lock_oprit()
+            self.consum.salveaza()
+
+    def stop(self):
+        self.running = False
+        self._oprire.set()
+        if self.stream:
+            self.stream.stop()
+        self.notificator.opreste()
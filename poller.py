@@ -0,0 +1,127 @@
+"""
+Worker de poll unic: un singur thread care executa cererile, niciodata
+mai mult de una in zbor. Tick-urile care vin in timpul unei cereri sunt
+comasate intr-o singura cerere urmatoare.
+
+Fiecare start() are generatia lui: dupa stop() + start(), worker-ul vechi
+iese la prima trezire, iar cel nou nu porneste nimic cat timp cererea
+celui vechi e inca in zbor.
+"""
+import queue
+import threading
+
+
+class Poller:
+    def __init__(self, cerere, notifica=None):
+        """
+        cerere   - functie rulata pe thread-ul worker; rezultatul ei (sau
+                   exceptia aruncata) ajunge in coada de rezultate
+        notifica - apelata din worker dupa fiecare rezultat nou (de ex.
+                   programeaza golirea cozii pe thread-ul UI)
+        """
+        self.cerere = cerere
+        self.notifica = notifica
+        self.rezultate = queue.Queue()
+
+        self._conditie = threading.Condition()
+        self._cerere_in_asteptare = False
+        self._in_zbor = False
+        self._running = False
+        self._thread = None
+        self._generatie = 0
+        self._secventa = 0
+
+        # Contoare
+        self.tickuri = 0
+        self.executate = 0
+        self.comasate = 0
+        self.sarite = 0
+
+    def start(self):
+        with self._conditie:
+            if self._running:
+                return
+            self._running = True
+            self._generatie += 1
+            generatie = self._generatie
+        self._thread = threading.Thread(target=self._bucla, args=(generatie,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._conditie:
+            self._running = False
+            self._cerere_in_asteptare = False
+            self._conditie.notify_all()
+
+    def tick(self):
+        """Cere un poll; daca exista deja unul in zbor sau in asteptare, se comaseaza"""
+        with self._conditie:
+            self.tickuri += 1
+            if not self._running:
+                self.sarite += 1
+                return
+            if self._cerere_in_asteptare:
+                # Exista deja o cerere programata; acest tick nu mai adauga nimic
+                self.comasate += 1
+                return
+            # Daca o cerere e in zbor, aceasta porneste imediat dupa ea
+            self._cerere_in_asteptare = True
+            self._conditie.notify_all()
+
+    def sari(self):
+        """Inregistreaza un tick ignorat intentionat de apelant"""
+        with self._conditie:
+            self.tickuri += 1
+            self.sarite += 1
+
+    def goleste(self):
+        """Returneaza toate rezultatele disponibile (se apeleaza pe thread-ul UI)"""
+        rezultate = []
+        while True:
+            try:
+                rezultate.append(self.rezultate.get_nowait())
+            except queue.Empty:
+                return rezultate
+
+    def secventa(self):
+        """Secventa ultimei cereri pornite; un rezultat cu secventa cel mult atat e deja pornit"""
+        with self._conditie:
+            return self._secventa
+
+    def contoare(self):
+        with self._conditie:
+            return {
+                'tickuri': self.tickuri,
+                'executate': self.executate,
+                'comasate': self.comasate,
+                'sarite': self.sarite,
+                'in_zbor': self._in_zbor,
+            }
+
+    def _bucla(self, generatie):
+        while True:
+            with self._conditie:
+                while (self._running and self._generatie == generatie
+                       and (self._in_zbor or not self._cerere_in_asteptare)):
+                    self._conditie.wait()
+                if not self._running or self._generatie != generatie:
+                    return
+                self._cerere_in_asteptare = False
+                self._in_zbor = True
+                self._secventa += 1
+                secventa = self._secventa
+
+            try:
+                rezultat = (secventa, self.cerere(), None)
+            except Exception as e:
+                rezultat = (secventa, None, e)
+
+            with self._conditie:
+                self._in_zbor = False
+                self.executate += 1
+                # Un worker pornit intre timp astepta sa se termine cererea asta
+                self._conditie.notify_all()
+
+            self.rezultate.put(rezultat)
+            if self.notifica:
+                self.notifica()
@@ -0,0 +1,39 @@
+"""
+Cronologia pornirii aplicatiei: momentul importurilor, al build-ului, al
+primului frame si al primei stari primite, in ms de la pornirea
+procesului. Se importa primul in main.py, inaintea Kivy.
+"""
+import os
+import time
+
+
+def _varsta_proces():
+    """Secunde de la pornirea procesului (Linux/Android); 0 daca nu se poate afla"""
+    try:
+        with open('/proc/self/stat') as f:
+            # Campul 22 (starttime), numarat dupa numele procesului dintre paranteze
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(uptime - start_ticks / os.sysconf('SC_CLK_TCK'), 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+_START = time.perf_counter() - _varsta_proces()
+_etape = {}
+
+
+def marcheaza(nume):
+    """Noteaza prima aparitie a unei etape; apelurile urmatoare sunt ignorate"""
+    if nume in _etape:
+        return
+    _etape[nume] = (time.perf_counter() - _START) * 1000
+    print(f"Pornire: {nume} la {_etape[nume]:.0f} ms")
+
+
+def cronologie():
+    return dict(_etape)
+
+
+marcheaza('interpretor')
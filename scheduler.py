@@ -0,0 +1,108 @@
+"""
+Planificator adaptiv pentru poll: decide cat asteptam pana la urmatoarea
+interogare in functie de starea alertei, erorile consecutive si daca
+ecranul e pornit. Jitter-ul si faza aleatoare impiedica toate
+dispozitivele sa loveasca Firebase in acelasi moment dupa o cadere de retea.
+"""
+import random
+import time
+
+# Peste atatea erori consecutive backoff-ul e oricum la backoff_maxim
+EXPONENT_MAXIM = 16
+
+
+class PoliticaPoll:
+    """Parametrii planificatorului (secunde); orice valoare poate fi suprascrisa"""
+
+    interval_normal = 3.0
+    interval_alerta = 1.0           # cat timp e o alerta activa
+    interval_dupa_trimitere = 1.0   # imediat dupa o alerta trimisa de pe acest telefon
+    durata_dupa_trimitere = 30.0
+    interval_inactiv = 15.0         # ecran stins / aplicatie in background
+    backoff_maxim = 60.0
+    factor_backoff = 2.0
+    jitter = 0.2                    # +/- 20% pe intervalele normale
+
+    def __init__(self, **kwargs):
+        for cheie, valoare in kwargs.items():
+            if not hasattr(PoliticaPoll, cheie):
+                raise ValueError(f"Parametru necunoscut: {cheie}")
+            setattr(self, cheie, valoare)
+
+
+class CeasManual:
+    """Ceas determinist pentru teste: timpul avanseaza doar la cerere"""
+
+    def __init__(self, start=0.0):
+        self.timp = start
+
+    def __call__(self):
+        return self.timp
+
+    def avanseaza(self, secunde):
+        self.timp += secunde
+
+
+class PollScheduler:
+    def __init__(self, politica=None, ceas=time.monotonic, rng=None):
+        self.politica = politica or PoliticaPoll()
+        self.ceas = ceas
+        self.rng = rng or random.Random()
+
+        self.alerta_activa = False
+        self.ecran_activ = True
+        self.erori_consecutive = 0
+        self._trimitere_la = None
+        self._resincronizeaza_faza = False
+
+    # ---------- evenimente ----------
+    def succes(self):
+        if self.erori_consecutive:
+            # Tocmai ne-am revenit dupa o cadere: alegem o faza noua,
+            # altfel toate telefoanele ar ramane sincronizate pe aceeasi secunda
+            self._resincronizeaza_faza = True
+        self.erori_consecutive = 0
+
+    def eroare(self):
+        self.erori_consecutive += 1
+
+    def trimitere_locala(self):
+        self._trimitere_la = self.ceas()
+
+    def seteaza_alerta(self, activa):
+        self.alerta_activa = activa
+
+    def seteaza_ecran(self, activ):
+        self.ecran_activ = activ
+
+    # ---------- decizie ----------
+    def faza_initiala(self):
+        """Intarziere aleatoare inainte de primul poll"""
+        return self.rng.uniform(0, self.politica.interval_normal)
+
+    def interval_de_baza(self):
+        p = self.politica
+        if self.alerta_activa:
+            return p.interval_alerta
+        if self._trimitere_la is not None and self.ceas() - self._trimitere_la < p.durata_dupa_trimitere:
+            return p.interval_dupa_trimitere
+        if not self.ecran_activ:
+            return p.interval_inactiv
+        return p.interval_normal
+
+    def urmatorul_interval(self):
+        p = self.politica
+        baza = self.interval_de_baza()
+
+        if self.erori_consecutive:
+            # Backoff exponential, cu jitter intre intervalul de baza si limita;
+            # exponentul e limitat, altfel o cadere lunga da OverflowError
+            exponent = min(self.erori_consecutive, EXPONENT_MAXIM)
+            limita = min(p.backoff_maxim, baza * p.factor_backoff ** exponent)
+            return self.rng.uniform(baza, max(baza, limita))
+
+        if self._resincronizeaza_faza:
+            self._resincronizeaza_faza = False
+            return self.rng.uniform(0, baza)
+
+        return baza * self.rng.uniform(1 - p.jitter, 1 + p.jitter)
@@ -1,15 +1,13 @@
 """
 Serviciu Android pentru verificarea alertelor in background.
 Acest serviciu ruleaza continuu si verifica Firebase pentru alerte noi.
+
+Bucla de monitorizare e in monitor.py, comuna cu daemonul desktop
+(desktop.py); aici sunt doar backend-urile Android: notificarile, serviciul
+foreground si wake lock-urile.
 """
-import time
-import json
-import os
-import requests
 from jnius import autoclass
-
-# Configurare Firebase - trebuie sa fie aceeasi ca in main.py
-FIREBASE_URL = "https://mesaje-bce12-default-rtdb.europe-west1.firebasedatabase.app/alerta.json"
+from monitor import MonitorAlerte
 
 # Clase Android necesare
 PythonService = autoclass('org.kivy.android.PythonService')
@@ -28,49 +26,25 @@ Uri = autoclass('android.net.Uri')
 CHANNEL_ID = "alerta_channel"
 NOTIFICATION_ID = 1001
 
-class AlertService:
-    def __init__(self):
-        self.service = PythonService.mService
-        self.context = self.service.getApplicationContext()
-        self.ultima_stare_alerta = False
-        self.running = True
-
-        # Calea catre fisierul de setari
-        self.settings_path = os.path.join(
-            self.context.getFilesDir().getAbsolutePath(),
-            'app', 'settings.json'
-        )
 
-        # Obtine wake lock pentru a mentine CPU activ
-        power_manager = self.context.getSystemService(Context.POWER_SERVICE)
-        self.wake_lock = power_manager.newWakeLock(
-            PowerManager.PARTIAL_WAKE_LOCK,
-            "AlertaApp::BackgroundService"
-        )
+class NotificatorAndroid:
+    """Notificarea persistenta a serviciului foreground si cate o notificare de alerta per sala"""
 
+    def __init__(self, service):
+        self.service = service
+        self.context = service.getApplicationContext()
+        self._id_notificari = {}
+
+    def porneste(self):
         self.create_notification_channel()
         self.start_foreground()
 
-    def is_silent_mode(self):
-        """Verifica daca modul silentios este activ"""
-        try:
-            # Incearca mai multe locatii posibile pentru settings.json
-            possible_paths = [
-                self.settings_path,
-                '/data/data/org.test.alertasala/files/app/settings.json',
-                '/data/data/org.test.alertasala/files/settings.json',
-            ]
-
-            for path in possible_paths:
-                if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        data = json.load(f)
-                        if 'silent_mode' in data:
-                            return data['silent_mode'].get('enabled', False)
-            return False
-        except Exception as e:
-            print(f"Eroare citire setari silent mode: {e}")
-            return False
+    def opreste(self):
+        pass
+
+    def id_notificare(self, sala):
+        """Fiecare sala are notificarea ei de alerta"""
+        return self._id_notificari.setdefault(sala, NOTIFICATION_ID + 1 + len(self._id_notificari))
 
     def create_notification_channel(self):
         """Creeaza canal de notificari pentru Android 8+"""
@@ -120,7 +94,7 @@ class AlertService:
 
         self.service.startForeground(NOTIFICATION_ID, notification)
 
-    def show_alert_notification(self, expeditor):
+    def alerta(self, expeditor, sala=None):
         """Afiseaza notificare de alerta cu sunet si vibratie"""
         package_name = self.context.getPackageName()
         launch_intent = self.context.getPackageManager().getLaunchIntentForPackage(package_name)
@@ -159,9 +133,9 @@ class AlertService:
             .build())
 
         notification_manager = self.context.getSystemService(Context.NOTIFICATION_SERVICE)
-        notification_manager.notify(NOTIFICATION_ID + 1, notification)
+        notification_manager.notify(self.id_notificare(sala), notification)
 
-    def show_silent_notification(self, expeditor):
+    def alerta_silentioasa(self, expeditor, sala=None):
         """Afiseaza notificare discreta fara sunet (mod silentios)"""
         package_name = self.context.getPackageName()
         launch_intent = self.context.getPackageManager().getLaunchIntentForPackage(package_name)
@@ -194,53 +168,45 @@ class AlertService:
             .build())
 
         notification_manager = self.context.getSystemService(Context.NOTIFICATION_SERVICE)
-        notification_manager.notify(NOTIFICATION_ID + 1, notification)
+        notification_manager.notify(self.id_notificare(sala), notification)
 
-    def clear_alert_notification(self):
-        """Sterge notificarea de alerta"""
+    def sterge_alerta(self, sala=None):
+        """Sterge notificarea de alerta a salii"""
         try:
             notification_manager = self.context.getSystemService(Context.NOTIFICATION_SERVICE)
-            notification_manager.cancel(NOTIFICATION_ID + 1)
+            notification_manager.cancel(self.id_notificare(sala))
         except Exception as e:
             print(f"Eroare stergere notificare: {e}")
 
-    def verifica_alerta(self):
-        """Verifica starea alertei pe Firebase"""
-        try:
-            response = requests.get(FIREBASE_URL, timeout=10)
-            data = response.json()
-
-            if data:
-                status = data.get('status', False)
-                cine = data.get('cine', 'Necunoscut')
-
-                # Daca s-a activat o alerta noua
-                if status == True and not self.ultima_stare_alerta:
-                    self.ultima_stare_alerta = True
-
-                    # Verifica daca modul silentios este activ
-                    if not self.is_silent_mode():
-                        self.show_alert_notification(cine)
-                        # Trezeste ecranul
-                        self.wake_screen()
-                    else:
-                        # Mod silentios - doar notificare discreta fara sunet
-                        self.show_silent_notification(cine)
-
-                # Daca alerta s-a oprit
-                elif status == False and self.ultima_stare_alerta:
-                    self.ultima_stare_alerta = False
-                    # Sterge notificarea de alerta
-                    self.clear_alert_notification()
 
-        except Exception as e:
-            print(f"Eroare verificare alerta: {e}")
+class EnergieAndroid:
+    """Wake lock partial pentru bucla serviciului si trezirea ecranului la alerta"""
 
-    def wake_screen(self):
+    def __init__(self, context):
+        self.context = context
+        self.power_manager = context.getSystemService(Context.POWER_SERVICE)
+        self.wake_lock = self.power_manager.newWakeLock(
+            PowerManager.PARTIAL_WAKE_LOCK,
+            "AlertaApp::BackgroundService"
+        )
+
+    def tine_treaz(self):
+        self.wake_lock.acquire()
+
+    def elibereaza(self):
+        if self.wake_lock.isHeld():
+            self.wake_lock.release()
+
+    def ecran_pornit(self):
+        try:
+            return self.power_manager.isInteractive()
+        except Exception:
+            return True
+
+    def trezeste_ecran(self):
         """Trezeste ecranul telefonului"""
         try:
-            power_manager = self.context.getSystemService(Context.POWER_SERVICE)
-            wake_lock = power_manager.newWakeLock(
+            wake_lock = self.power_manager.newWakeLock(
                 PowerManager.FULL_WAKE_LOCK |
                 PowerManager.ACQUIRE_CAUSES_WAKEUP |
                 PowerManager.ON_AFTER_RELEASE,
@@ -250,17 +216,11 @@ class AlertService:
         except Exception as e:
             print(f"Eroare wake screen: {e}")
 
-    def run(self):
-        """Bucla principala a serviciului"""
-        self.wake_lock.acquire()
 
-        try:
-            while self.running:
-                self.verifica_alerta()
-                time.sleep(3)  # Verifica la fiecare 3 secunde
-        finally:
-            if self.wake_lock.isHeld():
-                self.wake_lock.release()
+class AlertService(MonitorAlerte):
+    def __init__(self):
+        service = PythonService.mService
+        super().__init__(NotificatorAndroid(service), EnergieAndroid(service.getApplicationContext()))
 
 
 if __name__ == '__main__':
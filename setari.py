@@ -0,0 +1,101 @@
+"""
+Setari comune aplicatiei si serviciului (settings.json).
+Acelasi format ca JsonStore-ul Kivy folosit inainte, dar:
+- fisierul se scrie atomic (fisier temporar + os.replace);
+- valorile stau in memorie; fisierul se reciteste doar cand i se schimba
+  mtime-ul, la cererea explicita a celui care citeste.
+"""
+import json
+import os
+import threading
+import uuid
+
+# Aplicatia si serviciul ruleaza amandoua din acelasi director (files/app
+# pe Android), deci calea se stabileste o singura data, aici
+CALE_SETARI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.json')
+
+
+class Setari:
+    def __init__(self, cale=CALE_SETARI):
+        self.cale = cale
+        self._lock = threading.Lock()
+        self._date = {}
+        self._mtime = None
+        self.reincarca_daca_modificat()
+
+    # ---------- API compatibil cu JsonStore ----------
+    def exists(self, cheie):
+        with self._lock:
+            return cheie in self._date
+
+    def get(self, cheie):
+        with self._lock:
+            return dict(self._date[cheie])
+
+    def put(self, cheie, **valori):
+        with self._lock:
+            self._date[cheie] = valori
+            self._scrie()
+
+    def delete(self, cheie):
+        with self._lock:
+            del self._date[cheie]
+            self._scrie()
+
+    # ---------- acces rapid ----------
+    def silent_mode(self):
+        """Citire din memorie, fara I/O - sigura pe calea de alerta"""
+        with self._lock:
+            return bool(self._date.get('silent_mode', {}).get('enabled', False))
+
+    def profil(self):
+        """Profilul salvat (tip, nume, sala, abonamente), din memorie; {} daca lipseste"""
+        with self._lock:
+            return dict(self._date.get('profil', {}))
+
+    def id_dispozitiv(self):
+        """Id aleator al telefonului, generat la prima cerere si pastrat in setari"""
+        with self._lock:
+            if 'dispozitiv' not in self._date:
+                # Se scrie tot dictionarul: intai ce a salvat intre timp celalalt
+                # proces (profil, silent), ca sa nu-l acoperim cu copia noastra
+                self._reincarca()
+            if 'dispozitiv' not in self._date:
+                self._date['dispozitiv'] = {'id': uuid.uuid4().hex[:12]}
+                self._scrie()
+            return self._date['dispozitiv']['id']
+
+    # ---------- sincronizare cu fisierul ----------
+    def reincarca_daca_modificat(self):
+        """Reciteste fisierul doar daca s-a schimbat de la ultima citire"""
+        with self._lock:
+            return self._reincarca()
+
+    def _reincarca(self):
+        """Ca reincarca_daca_modificat, cu lock-ul deja luat"""
+        try:
+            mtime = os.stat(self.cale).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.cale, 'r') as f:
+                self._date = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            print(f"Eroare citire setari: {e}")
+            return False
+        return True
+
+    def _scrie(self):
+        temporar = f"{self.cale}.tmp"
+        try:
+            with open(temporar, 'w') as f:
+                json.dump(self._date, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporar, self.cale)
+            self._mtime = os.stat(self.cale).st_mtime_ns
+        except OSError as e:
+            print(f"Eroare salvare setari: {e}")
@@ -0,0 +1,274 @@
+"""
+Logica alertei fara dependinte Android/Kivy, comuna serviciului,
+aplicatiei si simularii de flota (tools/flota.py).
+
+Alertele stau pe canale, cate unul per sala: alerte/<sala> = {status, cine,
+id, nr, versiune, apasat_la, trimis_la, oprit_la}. id il alege telefonul
+care trimite (il stie inainte de raspuns); nr, versiune si momentele
+trimis_la/oprit_la le da serverul: nr creste la fiecare alerta pornita,
+versiune la fiecare scriere pe canal. O alerta e noua daca nr-ul ei e mai
+mare decat ultimul vazut - si doua alerte la rand de la acelasi expeditor
+se deosebesc, fara sa depindem de ceasul vreunui telefon.
+
+Fiecare scriere pe un canal incrementeaza si versiuni/<sala> (pe server,
+{".sv": {"increment": 1}}). Poll-ul citeste
+doar versiuni.json - cate un numar per sala - si aduce canalul complet
+numai cand versiunea unei sali urmarite s-a schimbat (CitireAlerte).
+Stream-ul serviciului ramane pe alerte.json: primeste oricum doar
+schimbarile.
+"""
+import re
+import unicodedata
+from datetime import datetime
+from firebase_client import genereaza_push_id, CitireConditionala
+
+PORNITA = 'pornita'
+OPRITA = 'oprita'
+
+# Fiecare sala are canalul ei, alerte/<sala>; lista salilor (cheie -> nume
+# afisat) sta in sali.json. Profilurile salvate inainte de canale erau toate
+# pe SALA MINIMIS.
+SALA_IMPLICITA = 'sala_minimis'
+SALI_IMPLICITE = {SALA_IMPLICITA: 'SALA MINIMIS'}
+
+# De la atatea canale schimbate deodata, o singura citire a alerte.json
+# costa mai putin decat cate un GET per sala
+PRAG_CITIRE_COMPLETA = 4
+
+INCREMENT = {'.sv': {'increment': 1}}
+TIMESTAMP_SERVER = {'.sv': 'timestamp'}
+
+
+def cheie_sala(nume):
+    """Cheia Firebase pentru un nume de sala: 'Sala Mică 2' -> 'sala_mica_2'"""
+    nume = unicodedata.normalize('NFKD', nume).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '_', nume.lower()).strip('_')[:40]
+
+
+def abonamente_profil(profil):
+    """Salile urmarite de un profil salvat; profilurile vechi nu au abonamente"""
+    if profil.get('abonamente'):
+        return list(profil['abonamente'])
+    return [profil.get('sala') or SALA_IMPLICITA]
+
+
+def numar_alerta(stare):
+    """nr-ul dat de server alertei; 0 pentru canalele scrise de versiuni vechi"""
+    nr = stare.get('nr') if isinstance(stare, dict) else None
+    return nr if isinstance(nr, int) and not isinstance(nr, bool) else 0
+
+
+def oprit_la_server(intrare):
+    """oprit_la pus de server (ms), sau None la intrarile vechi din istoric"""
+    oprit_la = intrare.get('oprit_la')
+    if isinstance(oprit_la, (int, float)) and not isinstance(oprit_la, bool):
+        return int(oprit_la)
+    return None
+
+
+def moment_istoric(intrare):
+    """
+    Momentul opririi (ms, ceasul serverului) pentru ordonarea istoricului.
+    Intrarile vechi au doar textul 'timestamp', scris cu ceasul telefonului.
+    """
+    oprit_la = oprit_la_server(intrare)
+    if oprit_la is not None:
+        return oprit_la
+    try:
+        return int(datetime.strptime(intrare.get('timestamp', ''), "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+    except (TypeError, ValueError):
+        return 0
+
+
+def sali_urmarite(data, abonamente):
+    """Din continutul alerte.json, doar canalele salilor la care suntem abonati"""
+    if not isinstance(data, dict):
+        return {}
+    return {sala: data[sala] for sala in abonamente if isinstance(data.get(sala), dict)}
+
+
+class UrmarireAlerta:
+    """Tranzitiile starii unui canal, ca sa notificam o singura data per alerta"""
+
+    def __init__(self):
+        self.activa = False
+        self.nr = 0
+
+    def aplica(self, data):
+        """Returneaza PORNITA, OPRITA sau None daca nu s-a schimbat nimic"""
+        if not data:
+            return None
+
+        status = data.get('status', False)
+        nr = numar_alerta(data)
+        # Oprirea si alerta urmatoare pot cadea intre doua citiri: nr-ul mai mare
+        # arata ca alerta activa acum e alta decat cea notificata
+        if status == True and (not self.activa or nr > self.nr):
+            self.activa = True
+            self.nr = nr
+            return PORNITA
+        if status == False and self.activa:
+            self.activa = False
+            return OPRITA
+        return None
+
+
+class UrmarireSali:
+    """UrmarireAlerta pentru fiecare sala urmarita, dintr-o singura citire a alerte.json"""
+
+    def __init__(self, abonamente=()):
+        self._sali = {}
+        self.seteaza_abonamente(abonamente)
+
+    def seteaza_abonamente(self, abonamente):
+        self.abonamente = list(abonamente)
+        # O sala scoasa din abonamente nu mai poate fi "activa" pentru noi
+        self._sali = {sala: self._sali.get(sala) or UrmarireAlerta() for sala in self.abonamente}
+
+    @property
+    def activa(self):
+        return any(u.activa for u in self._sali.values())
+
+    def active(self):
+        return [sala for sala, u in self._sali.items() if u.activa]
+
+    def aplica(self, data):
+        """Returneaza lista (sala, PORNITA/OPRITA, starea salii) pentru salile schimbate"""
+        tranzitii = []
+        canale = sali_urmarite(data, self.abonamente)
+        for sala, urmarire in self._sali.items():
+            # Un canal disparut (sters din baza) inseamna alerta oprita
+            stare = canale.get(sala, {'status': False})
+            tranzitie = urmarire.aplica(stare)
+            if tranzitie:
+                tranzitii.append((sala, tranzitie, stare))
+        return tranzitii
+
+
+def valori_trimitere(sala, cine, alerta_id, apasat_la):
+    """Scrierea care porneste alerta pe canalul unei sali"""
+    return {
+        f'alerte/{sala}/status': True,
+        f'alerte/{sala}/cine': cine,
+        f'alerte/{sala}/id': alerta_id,
+        f'alerte/{sala}/nr': INCREMENT,
+        f'alerte/{sala}/versiune': INCREMENT,
+        f'alerte/{sala}/apasat_la': apasat_la,
+        f'alerte/{sala}/trimis_la': TIMESTAMP_SERVER,
+        # oprit_la ramas de la alerta precedenta
+        f'alerte/{sala}/oprit_la': None,
+        f'versiuni/{sala}': INCREMENT,
+    }
+
+
+def valori_oprire(sala, expeditor, confirmat_de, era_expeditor, acum_server_ms=None, nr=0):
+    """
+    Scrierea care opreste alerta salii pentru toti si salveaza in istoric cine a
+    confirmat: un PATCH multi-cale pe radacina bazei, deci ori se aplica
+    amandoua, ori niciuna, cu un singur drum pana la server.
+
+    acum_server_ms - ceasul serverului estimat local; cheia din istoric se
+    genereaza pe telefon si trebuie sa ramana in ordine fata de celelalte.
+    nr - numarul alertei oprite, pastrat in istoric. oprit_la il pune serverul
+    cand primeste scrierea (si pentru o oprire reluata din jurnal).
+    Returneaza (cheie, valori).
+    """
+    cheie = genereaza_push_id(acum_server_ms)
+    moment = datetime.fromtimestamp(acum_server_ms / 1000) if acum_server_ms else datetime.now()
+    intrare = {
+        # Doar pentru versiunile vechi ale aplicatiei, care afiseaza textul
+        'timestamp': moment.strftime("%Y-%m-%d %H:%M:%S"),
+        'oprit_la': TIMESTAMP_SERVER,
+        'nr': nr,
+        'sala': sala,
+        'expeditor': expeditor,
+        'confirmat_de': confirmat_de,
+        'tip': 'anulat' if era_expeditor else 'confirmat'
+    }
+    return cheie, {
+        f'alerte/{sala}/status': False,
+        f'alerte/{sala}/cine': '',
+        f'alerte/{sala}/versiune': INCREMENT,
+        f'alerte/{sala}/oprit_la': TIMESTAMP_SERVER,
+        f'versiuni/{sala}': INCREMENT,
+        f'istoric/{cheie}': intrare,
+    }
+
+
+def confirma_alerta(client, url_radacina, sala, expeditor, confirmat_de, era_expeditor,
+                    acum_server_ms=None, nr=0):
+    """Trimite direct scrierea de oprire (fara jurnal); returneaza cheia din istoric"""
+    cheie, valori = valori_oprire(sala, expeditor, confirmat_de, era_expeditor, acum_server_ms, nr)
+    response = client.patch(url_radacina, json=valori)
+    if response.status_code != 200:
+        raise Exception(f"HTTP {response.status_code}")
+    return cheie
+
+
+class CitireAlerte:
+    """
+    Poll-ul pe calea fierbinte: o citire conditionala (ETag) a versiuni.json,
+    apoi canalele complete doar pentru salile urmarite cu versiune noua.
+    citeste() intoarce (modificat, data) ca CitireConditionala, cu data in
+    forma alerte.json, restransa la salile urmarite.
+    """
+
+    def __init__(self, client, url_baza, abonamente=()):
+        self.client = client
+        self.url_baza = url_baza
+        self.citire_versiuni = CitireConditionala(client, f"{url_baza}/versiuni.json")
+        self.cereri_canal = 0
+        self.seteaza_abonamente(abonamente)
+
+    def seteaza_abonamente(self, abonamente):
+        self.abonamente = list(abonamente)
+        self.reseteaza()
+
+    def reseteaza(self):
+        """Urmatoarea citire aduce din nou toate canalele urmarite"""
+        self.citire_versiuni.reseteaza()
+        self.versiuni = {}
+        self.canale = {}
+
+    def citeste(self):
+        modificat, versiuni = self.citire_versiuni.citeste()
+        if not modificat:
+            return False, None
+
+        versiuni = versiuni if isinstance(versiuni, dict) else {}
+        schimbate = [sala for sala in self.abonamente
+                     if sala not in self.versiuni or versiuni.get(sala) != self.versiuni[sala]]
+        if not schimbate:
+            # S-a schimbat doar o sala pe care nu o urmarim
+            return False, None
+
+        try:
+            if len(schimbate) >= PRAG_CITIRE_COMPLETA:
+                toate = self._get(f"{self.url_baza}/alerte.json") or {}
+                canale = {sala: toate.get(sala) for sala in schimbate}
+            else:
+                canale = {sala: self._get(f"{self.url_baza}/alerte/{sala}.json") for sala in schimbate}
+        except Exception:
+            # Fara canale, versiunile citite nu trebuie sa ramana "vazute"
+            self.citire_versiuni.reseteaza()
+            raise
+
+        for sala, canal in canale.items():
+            # Versiunea citita inainte de canal: daca intre timp s-a mai schimbat,
+            # urmatorul poll vede alta versiune si il reciteste
+            self.versiuni[sala] = versiuni.get(sala)
+            if isinstance(canal, dict):
+                self.canale[sala] = canal
+            else:
+                self.canale.pop(sala, None)
+        return True, dict(self.canale)
+
+    def _get(self, url):
+        response = self.client.get(url)
+        self.cereri_canal += 1
+        if response.status_code != 200:
+            raise Exception(f"HTTP {response.status_code}")
+        return self.client.json(response)
+
+    def statistici(self):
+        return dict(self.citire_versiuni.statistici(), cereri_canal=self.cereri_canal)
@@ -0,0 +1,247 @@
+"""
+Ascultare Firebase prin REST streaming (Server-Sent Events).
+In loc sa interogam alerta.json la fiecare 3 secunde, tinem deschisa o
+singura conexiune pe care Firebase trimite evenimente put/patch.
+"""
+import codecs
+import json
+import random
+import socket
+import time
+import requests
+
+# Parametri reconectare (secunde)
+BACKOFF_MINIM = 1
+BACKOFF_MAXIM = 60
+
+# Firebase trimite keep-alive la ~30 secunde; daca nu primim nimic
+# mai mult de atat, consideram conexiunea moarta si reconectam
+TIMEOUT_CONECTARE = 10
+TIMEOUT_CITIRE = 75
+
+
+class SSEParser:
+    """Parser incremental pentru text/event-stream"""
+
+    def __init__(self):
+        self._buffer = ""
+        self._event = None
+        self._data = []
+
+    def feed(self, chunk):
+        """Primeste o bucata de text si returneaza evenimentele complete"""
+        self._buffer += chunk
+        evenimente = []
+
+        while True:
+            # Liniile se pot termina cu \n, \r\n sau \r
+            idx_n = self._buffer.find("\n")
+            idx_r = self._buffer.find("\r")
+            if idx_n == -1 and idx_r == -1:
+                break
+
+            if idx_r != -1 and (idx_n == -1 or idx_r < idx_n):
+                # \r la finalul buffer-ului poate fi urmat de \n in chunk-ul urmator
+                if idx_r == len(self._buffer) - 1:
+                    break
+                end = idx_r
+                skip = 2 if self._buffer[idx_r + 1] == "\n" else 1
+            else:
+                end = idx_n
+                skip = 1
+
+            linie = self._buffer[:end]
+            self._buffer = self._buffer[end + skip:]
+
+            eveniment = self._proceseaza_linie(linie)
+            if eveniment:
+                evenimente.append(eveniment)
+
+        return evenimente
+
+    def reset(self):
+        self._buffer = ""
+        self._event = None
+        self._data = []
+
+    def _proceseaza_linie(self, linie):
+        # Linie goala = sfarsitul unui eveniment
+        if linie == "":
+            if self._event is None and not self._data:
+                return None
+            eveniment = (self._event or "message", "\n".join(self._data))
+            self._event = None
+            self._data = []
+            return eveniment
+
+        # Comentariu
+        if linie.startswith(":"):
+            return None
+
+        if ":" in linie:
+            camp, valoare = linie.split(":", 1)
+            if valoare.startswith(" "):
+                valoare = valoare[1:]
+        else:
+            camp, valoare = linie, ""
+
+        if camp == "event":
+            self._event = valoare
+        elif camp == "data":
+            self._data.append(valoare)
+        return None
+
+
+def aplica_la_cale(radacina, cale, valoare, merge=False):
+    """Aplica un put/patch Firebase pe copia locala a nodului"""
+    parti = [p for p in cale.split("/") if p]
+
+    if not parti:
+        if merge and isinstance(valoare, dict):
+            # Cheile unui patch pot fi cai ("sala/status"), chiar si pe un nod inca gol
+            rezultat = dict(radacina) if isinstance(radacina, dict) else None
+            for cheie, val in valoare.items():
+                rezultat = aplica_la_cale(rezultat, cheie, val)
+            return rezultat
+        return valoare
+
+    rezultat = dict(radacina) if isinstance(radacina, dict) else {}
+    cheie = parti[0]
+    rest = "/".join(parti[1:])
+    copil = aplica_la_cale(rezultat.get(cheie), rest, valoare, merge)
+
+    # In Firebase, null inseamna stergere
+    if copil is None:
+        rezultat.pop(cheie, None)
+    else:
+        rezultat[cheie] = copil
+    return rezultat or None
+
+
+class FirebaseStream:
+    """
+    Tine deschis un stream REST pe un nod Firebase si apeleaza
+    callback(data) cu starea completa a nodului la fiecare modificare.
+    """
+
+    def __init__(self, url, callback, on_error=None, client=None):
+        self.url = url
+        self.client = client
+        self.callback = callback
+        self.on_error = on_error
+        self.running = False
+        self.data = None
+        self.reconectari = 0
+        self._response = None
+        self._parser = SSEParser()
+
+    def run(self):
+        """Bucla de ascultare cu reconectare; blocheaza thread-ul curent"""
+        self.running = True
+        backoff = BACKOFF_MINIM
+
+        while self.running:
+            try:
+                if self._asculta():
+                    # Am primit date inainte de deconectare, deci reteaua merge
+                    backoff = BACKOFF_MINIM
+            except Exception as e:
+                if not self.running:
+                    # Conexiunea a fost inchisa de stop()
+                    break
+                print(f"Eroare stream: {e}")
+                if self.on_error:
+                    self.on_error(e)
+
+            if not self.running:
+                break
+
+            self.reconectari += 1
+            # Jitter ca sa nu se reconecteze toate dispozitivele simultan
+            time.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(backoff * 2, BACKOFF_MAXIM)
+
+    def stop(self):
+        self.running = False
+        response = self._response
+        if response is not None:
+            # close() asteapta dupa citirea blocata pe thread-ul stream-ului (pana
+            # la urmatorul keep-alive); shutdown() pe socket o deblocheaza imediat
+            try:
+                response.raw.connection.sock.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _asculta(self):
+        """O singura conexiune; returneaza True daca s-au primit evenimente"""
+        primit = False
+        self._parser.reset()
+
+        # Folosim sesiunea clientului comun (DNS in cache, pool de conexiuni)
+        get = self.client.get if self.client else requests.get
+        response = get(
+            self.url,
+            headers={'Accept': 'text/event-stream'},
+            stream=True,
+            timeout=(TIMEOUT_CONECTARE, TIMEOUT_CITIRE)
+        )
+        self._response = response
+
+        try:
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}")
+
+            # Octetii se numara inainte de decodare (diacriticele au 2 octeti);
+            # decodorul incremental pastreaza un caracter taiat intre bucati
+            decodor = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            for bucata in response.iter_content(chunk_size=None):
+                if not self.running:
+                    break
+                if self.client:
+                    self.client.numara_primiti(len(bucata))
+                chunk = decodor.decode(bucata)
+                for event, data in self._parser.feed(chunk):
+                    primit = True
+                    if not self._proceseaza_eveniment(event, data):
+                        return primit
+        finally:
+            self._response = None
+            response.close()
+
+        return primit
+
+    def _proceseaza_eveniment(self, event, data):
+        """Returneaza False daca stream-ul trebuie redeschis"""
+        if event in ("put", "patch"):
+            start = time.perf_counter()
+            mesaj = json.loads(data)
+            if self.client:
+                self.client.numara_parsare(time.perf_counter() - start)
+            cale = mesaj.get('path', '/')
+
+            # Primul put pe "/" dupa (re)conectare contine starea completa
+            self.data = aplica_la_cale(
+                self.data, cale, mesaj.get('data'), merge=(event == "patch")
+            )
+            try:
+                self.callback(self.data)
+            except Exception as e:
+                print(f"Eroare procesare eveniment stream: {e}")
+            return True
+
+        if event == "keep-alive":
+            return True
+
+        if event == "cancel":
+            # Regulile de securitate nu mai permit citirea
+            raise Exception(f"Stream anulat de server: {data}")
+
+        if event == "auth_revoked":
+            print("Autentificare revocata - se redeschide stream-ul")
+            return False
+
+        return True
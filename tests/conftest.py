@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+import requests
+
+RADACINA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RADACINA, os.path.join(RADACINA, 'tools')]
+
+from firebase_client import FirebaseClient  # noqa: E402
+from rtdb_local import RtdbLocal  # noqa: E402
+
+
+class _Raspuns:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = b'null'
+
+    def json(self):
+        return None
+
+
+class ClientCuDefecte:
+    """
+    Clientul real, cu PATCH-uri care pot fi respinse (cod_patch), pierdute
+    (fara_retea) sau aplicate pe server cu raspunsul pierdut (raspuns_pierdut)
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.cod_patch = None
+        self.fara_retea = False
+        self.raspuns_pierdut = False
+        self.patch_uri = []
+
+    def __getattr__(self, nume):
+        return getattr(self.client, nume)
+
+    def patch(self, url, **kwargs):
+        if self.fara_retea:
+            raise requests.ConnectionError("fara retea")
+        self.patch_uri.append(kwargs.get('json'))
+        if self.cod_patch:
+            return _Raspuns(self.cod_patch)
+        response = self.client.patch(url, **kwargs)
+        if self.raspuns_pierdut:
+            raise requests.ConnectionError("raspuns pierdut")
+        return response
+
+
+@pytest.fixture
+def rtdb():
+    baza = RtdbLocal().start()
+    yield baza
+    baza.stop()
+
+
+@pytest.fixture
+def client(rtdb):
+    return ClientCuDefecte(FirebaseClient())
@@ -0,0 +1,88 @@
+from actor import (ActorAlerta, PROFIL, SURSA, RASPUNS, OPRIRE_CERUTA, OPRIRE_TERMINATA,
+                   OPRIRE_RESPINSA, ARATA_ALERTA, ARATA_NORMAL, SCRIE_OPRIRE, citeste_log)
+
+
+def _alerta(alerta_id, nr, cine='A'):
+    return {'status': True, 'cine': cine, 'id': alerta_id, 'nr': nr, 'trimis_la': nr}
+
+
+def _comenzi(rezultat):
+    return [comanda for comanda, _ in rezultat]
+
+
+def _actor(sali=('s1',)):
+    actor = ActorAlerta()
+    actor.trimite(PROFIL, abonamente=list(sali))
+    return actor
+
+
+def test_alerta_si_oprire():
+    actor = _actor()
+    assert ARATA_ALERTA in _comenzi(actor.trimite(RASPUNS, sursa='poll', seq=1, data={'s1': _alerta('a', 1)}))
+
+    comenzi = actor.trimite(OPRIRE_CERUTA)
+    assert comenzi[-1] == (SCRIE_OPRIRE, {'sala': 's1', 'alerta_id': 'a', 'nr': 1,
+                                          'expeditor': 'A', 'era_expeditor': False})
+    # Dublu click
+    assert actor.trimite(OPRIRE_CERUTA) == []
+    assert _comenzi(actor.trimite(OPRIRE_TERMINATA, sala='s1', alerta_id='a')) == [ARATA_NORMAL]
+
+
+def test_oprire_respinsa_reafiseaza_alerta():
+    actor = _actor()
+    actor.trimite(RASPUNS, sursa='poll', seq=1, data={'s1': _alerta('a', 1)})
+    actor.trimite(OPRIRE_CERUTA)
+
+    comenzi = actor.trimite(OPRIRE_RESPINSA, sala='s1', alerta_id='a')
+
+    assert _comenzi(comenzi) == [ARATA_NORMAL, ARATA_ALERTA]
+    assert actor.alerte_oprite_local == {}
+    # Si urmatoarele stari o arata in continuare
+    actor.trimite(OPRIRE_CERUTA)
+    assert actor.oprire_in_curs == ('s1', 'a')
+
+
+def test_stare_veche_dupa_oprire_nu_reporneste_alerta():
+    actor = _actor()
+    actor.trimite(RASPUNS, sursa='poll', seq=1, data={'s1': _alerta('a', 1)})
+    actor.trimite(OPRIRE_CERUTA)
+    actor.trimite(OPRIRE_TERMINATA, sala='s1', alerta_id='a')
+
+    # Un raspuns plecat inainte de oprire
+    assert ARATA_ALERTA not in _comenzi(actor.trimite(RASPUNS, sursa='poll', seq=2, data={'s1': _alerta('a', 1)}))
+    # Urmatoarea alerta a aceluiasi expeditor e alta alerta
+    assert ARATA_ALERTA in _comenzi(actor.trimite(RASPUNS, sursa='poll', seq=3, data={'s1': _alerta('b', 2)}))
+
+
+def test_alerta_noua_pe_aceeasi_sala_inlocuieste_alerta_afisata():
+    actor = _actor()
+    actor.trimite(RASPUNS, sursa='poll', seq=1, data={'s1': _alerta('a', 1)})
+    comenzi = _comenzi(actor.trimite(RASPUNS, sursa='poll', seq=2, data={'s1': _alerta('b', 2)}))
+    assert comenzi[-2:] == [ARATA_NORMAL, ARATA_ALERTA]
+    assert actor.alerta_nr == 2
+
+
+def test_raspunsuri_vechi_si_sursa_inlocuita_sunt_ignorate():
+    actor = _actor()
+    actor.trimite(RASPUNS, sursa='poll', seq=2, data={'s1': {'status': False}})
+    assert actor.trimite(RASPUNS, sursa='poll', seq=1, data={'s1': _alerta('a', 1)}) == []
+
+    actor.trimite(SURSA, sursa='serviciu', seq=0)
+    assert actor.trimite(RASPUNS, sursa='poll', seq=3, data={'s1': _alerta('a', 1)}) == []
+    assert ARATA_ALERTA in _comenzi(actor.trimite(RASPUNS, sursa='serviciu', seq=1, data={'s1': _alerta('a', 1)}))
+    assert actor.ignorate == 2
+
+
+def test_reluarea_logului_da_aceleasi_comenzi(tmp_path):
+    actor = _actor(('s1', 's2'))
+    comenzi = []
+    for seq, data in enumerate([{'s1': _alerta('a', 1)}, {'s1': _alerta('a', 1), 's2': _alerta('x', 7)},
+                                {'s2': _alerta('x', 7)}, {}], start=1):
+        comenzi.extend(actor.trimite(RASPUNS, sursa='poll', seq=seq, data=data))
+    cale = tmp_path / 'actor_evenimente.jsonl'
+    actor.salveaza_log(str(cale))
+
+    reluat, comenzi_reluate = ActorAlerta.reia(citeste_log(str(cale)))
+
+    assert comenzi_reluate == comenzi
+    assert reluat.statistici() == actor.statistici()
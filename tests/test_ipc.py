@@ -0,0 +1,37 @@
+import json
+import socket
+
+import ipc
+from ipc import PublicatorStare
+
+
+def _mesaje(conexiune, tip, cate):
+    """Primele `cate` mesaje de tipul dat"""
+    buffer, gasite = b"", []
+    while len(gasite) < cate:
+        buffer += conexiune.recv(4096)
+        while b"\n" in buffer:
+            linie, buffer = buffer.split(b"\n", 1)
+            mesaj = json.loads(linie)
+            if mesaj['tip'] == tip:
+                gasite.append(mesaj)
+    return gasite
+
+
+def test_heartbeat_pastreaza_eroarea(tmp_path, monkeypatch):
+    monkeypatch.setattr(ipc, 'INTERVAL_HEARTBEAT', 0.05)
+    cale = str(tmp_path / 'alerta.sock')
+    publicator = PublicatorStare(cale=cale)
+    publicator.start()
+    try:
+        publicator.publica_conexiune(False, 'Timeout')
+        conexiune = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexiune.settimeout(5)
+        conexiune.connect(cale)
+
+        for mesaj in _mesaje(conexiune, 'heartbeat', 2):
+            assert mesaj['conectat'] is False
+            assert mesaj['eroare'] == 'Timeout'
+        conexiune.close()
+    finally:
+        publicator.stop()
@@ -0,0 +1,62 @@
+import json
+import sqlite3
+
+import requests
+
+from istoric_local import IstoricLocal
+
+
+def _intrare(oprit_la, cine='A'):
+    return {'oprit_la': oprit_la, 'expeditor': cine, 'confirmat_de': 'B', 'tip': 'confirmat'}
+
+
+def test_paginile_merg_dupa_momentul_serverului(tmp_path):
+    istoric = IstoricLocal(str(tmp_path / 'istoric.db'))
+    # Cheile generate pe telefoane cu ceasuri diferite nu sunt in ordinea opririlor
+    istoric.adauga({'k1': _intrare(3000), 'k2': _intrare(1000), 'k3': _intrare(2000),
+                    'k0': {'timestamp': '1970-01-01 00:00:00'}})
+
+    prima = istoric.pagina(limita=2)
+    assert [i['_key'] for i in prima] == ['k1', 'k3']
+
+    ultima = prima[-1]
+    restul = istoric.pagina(inainte_de=(ultima['oprit_la'], ultima['_key']), limita=2)
+    assert [i['_key'] for i in restul] == ['k2', 'k0']
+    istoric.inchide()
+
+
+def test_baza_veche_e_migrata(tmp_path):
+    cale = str(tmp_path / 'istoric.db')
+    db = sqlite3.connect(cale)
+    db.execute('CREATE TABLE istoric (cheie TEXT PRIMARY KEY, timestamp TEXT, date TEXT NOT NULL)')
+    db.execute('CREATE INDEX idx_istoric_timestamp ON istoric(timestamp)')
+    db.execute('INSERT INTO istoric VALUES (?, ?, ?)', ('k1', '', json.dumps(_intrare(5000))))
+    db.commit()
+    db.close()
+
+    istoric = IstoricLocal(cale)
+    istoric.adauga({'k2': _intrare(4000)})
+
+    assert [i['_key'] for i in istoric.pagina()] == ['k1', 'k2']
+    assert istoric.ultimul_oprit_la() == 5000
+    indexuri = {rand[1] for rand in istoric._db.execute('PRAGMA index_list(istoric)')}
+    assert 'idx_istoric_moment' in indexuri and 'idx_istoric_timestamp' not in indexuri
+    istoric.inchide()
+
+
+def test_oprire_cu_cheie_veche_e_adusa_dupa_oprit_la(rtdb, tmp_path):
+    istoric = IstoricLocal(str(tmp_path / 'istoric.db'))
+    rtdb.actualizeaza('', {'istoric/k2': _intrare(2000), 'istoric/k3': _intrare(3000)})
+
+    def sincronizeaza():
+        params = {'orderBy': '"oprit_la"', 'startAt': istoric.ultimul_oprit_la() or 0}
+        return istoric.adauga(requests.get(f"{rtdb.url}/istoric.json", params=params).json())
+
+    assert sincronizeaza() == 2
+    # O oprire reluata tarziu din jurnal: cheie veche, oprit_la pus acum de server
+    rtdb.actualizeaza('', {'istoric/k1': _intrare(4000)})
+
+    # k3 vine din nou (startAt e inclusiv), dar nu se numara
+    assert sincronizeaza() == 1
+    assert [i['_key'] for i in istoric.pagina()] == ['k1', 'k3', 'k2']
+    istoric.inchide()
@@ -0,0 +1,160 @@
+from jurnal import JurnalScrieri, TRIMITERE, OPRIRE, SALA_NOUA
+from stare import valori_trimitere, valori_oprire
+
+
+def _jurnal(rtdb, client, tmp_path, nume='jurnal.jsonl'):
+    return JurnalScrieri(client, f"{rtdb.url}/.json", f"{rtdb.url}/alerte.json",
+                         cale=str(tmp_path / nume))
+
+
+def test_trimitere_si_oprire_din_acelasi_lot_pleaca_separat(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    jurnal.adauga(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1')
+    jurnal.adauga(OPRIRE, valori_oprire('s1', 'A', 'B', False, nr=1)[1], sala='s1', alerta_id='a1')
+
+    confirmate, respinse = jurnal.reia()
+
+    assert len(confirmate) == 2 and not respinse
+    # Alerta a fost publicata inainte de oprire, nu acoperita de ea
+    assert [p.get('alerte/s1/status') for p in client.patch_uri] == [True, False]
+    assert rtdb.citeste('versiuni/s1') == 2
+    assert rtdb.citeste('alerte/s1/versiune') == 2
+    assert rtdb.citeste('alerte/s1/nr') == 1
+    assert len(rtdb.citeste('istoric')) == 1
+    assert jurnal.in_asteptare() == 0
+
+
+def test_cai_disjuncte_pleaca_intr_un_singur_patch(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    for sala in ('s1', 's2', 's3'):
+        jurnal.adauga(SALA_NOUA, {f'sali/{sala}': sala.upper()}, sala=sala)
+        jurnal.adauga(TRIMITERE, valori_trimitere(sala, 'A', f'a_{sala}', 0), sala=sala, alerta_id=f'a_{sala}')
+
+    confirmate, _ = jurnal.reia()
+
+    assert len(confirmate) == 6
+    assert len(client.patch_uri) == 1
+    assert all(rtdb.citeste(f'alerte/{sala}/status') for sala in ('s1', 's2', 's3'))
+
+
+def test_doua_incrementuri_pe_aceeasi_cale_nu_se_comaseaza(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    jurnal.adauga(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1')
+    jurnal.adauga(TRIMITERE, valori_trimitere('s1', 'A', 'a2', 0), sala='s1', alerta_id='a2')
+
+    jurnal.reia()
+
+    assert rtdb.citeste('alerte/s1/nr') == 2
+    assert rtdb.citeste('alerte/s1/id') == 'a2'
+
+
+def test_scriere_respinsa(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    client.cod_patch = 401
+
+    assert jurnal.trimite(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1') is False
+    # Respinsa definitiv: nu mai ramane de reluat
+    assert jurnal.in_asteptare() == 0
+
+
+def test_eroare_de_retea_pastreaza_scrierea(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    client.fara_retea = True
+    try:
+        jurnal.trimite(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1')
+    except Exception:
+        pass
+    assert jurnal.in_asteptare() == 1
+
+    client.fara_retea = False
+    confirmate, _ = jurnal.reia()
+    assert len(confirmate) == 1
+    assert rtdb.citeste('alerte/s1/status') is True
+
+
+def test_trimitere_cu_raspuns_pierdut_nu_se_repeta(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    client.raspuns_pierdut = True
+    try:
+        jurnal.trimite(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1')
+    except Exception:
+        pass
+    assert jurnal.in_asteptare() == 1
+
+    # Reluata imediat, mult sub orice prag de vechime
+    client.raspuns_pierdut = False
+    confirmate, _ = jurnal.reia()
+
+    assert len(confirmate) == 1
+    assert rtdb.citeste('alerte/s1/nr') == 1
+    assert rtdb.citeste('alerte/s1/versiune') == 1
+    assert rtdb.citeste('versiuni/s1') == 1
+
+
+def _trimisa_de_celalalt_proces(jurnal, celalalt):
+    """Reluarea celuilalt proces apuca intrarea intre adaugare si reluare"""
+    adauga = jurnal.adauga
+
+    def adauga_si_reia(*args, **kwargs):
+        intrare_id = adauga(*args, **kwargs)
+        celalalt.reia()
+        return intrare_id
+
+    jurnal.adauga = adauga_si_reia
+
+
+def test_trimisa_de_alta_reluare_e_confirmata(rtdb, client, tmp_path):
+    aplicatie = _jurnal(rtdb, client, tmp_path)
+    serviciu = _jurnal(rtdb, client, tmp_path)
+    _trimisa_de_celalalt_proces(aplicatie, serviciu)
+
+    assert aplicatie.trimite(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1') is True
+    assert rtdb.citeste('alerte/s1/status') is True
+
+
+def test_respinsa_de_alta_reluare_e_raportata(rtdb, client, tmp_path):
+    aplicatie = _jurnal(rtdb, client, tmp_path)
+    serviciu = _jurnal(rtdb, client, tmp_path)
+    _trimisa_de_celalalt_proces(aplicatie, serviciu)
+    client.cod_patch = 400
+
+    assert aplicatie.trimite(TRIMITERE, valori_trimitere('s1', 'A', 'a1', 0), sala='s1', alerta_id='a1') is False
+
+
+def test_oprire_cu_raspuns_pierdut_ramane_o_singura_intrare_in_istoric(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    rtdb.actualizeaza('', valori_trimitere('s1', 'A', 'a1', 0))
+    cheie, valori = valori_oprire('s1', 'A', 'B', False, nr=1)
+    client.raspuns_pierdut = True
+    try:
+        jurnal.trimite(OPRIRE, valori, sala='s1', alerta_id='a1')
+    except Exception:
+        pass
+
+    client.raspuns_pierdut = False
+    jurnal.reia()
+
+    assert list(rtdb.citeste('istoric')) == [cheie]
+    # Deja oprita: reluarea nu o mai anunta inca o data
+    assert rtdb.citeste('alerte/s1/versiune') == 2
+
+
+def test_oprire_reluata_nu_opreste_alerta_mai_noua(rtdb, client, tmp_path):
+    jurnal = _jurnal(rtdb, client, tmp_path)
+    rtdb.actualizeaza('', valori_trimitere('s1', 'A', 'a1', 0))
+    cheie, valori = valori_oprire('s1', 'A', 'B', False, nr=1)
+    client.raspuns_pierdut = True
+    try:
+        jurnal.trimite(OPRIRE, valori, sala='s1', alerta_id='a1')
+    except Exception:
+        pass
+
+    # Pana la reluare (cateva secunde), C trimite o alerta noua in aceeasi sala
+    rtdb.actualizeaza('', valori_trimitere('s1', 'C', 'a2', 1))
+    client.raspuns_pierdut = False
+    confirmate, _ = jurnal.reia()
+
+    assert len(confirmate) == 1
+    assert rtdb.citeste('alerte/s1/status') is True
+    assert rtdb.citeste('alerte/s1/id') == 'a2'
+    assert list(rtdb.citeste('istoric')) == [cheie]
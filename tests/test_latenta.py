@@ -0,0 +1,15 @@
+from latenta import CeasServer, url_ceas
+from setari import Setari
+
+
+def test_fiecare_dispozitiv_isi_sincronizeaza_ceasul_in_nodul_lui(rtdb, client, tmp_path):
+    cale = str(tmp_path / 'settings.json')
+    dispozitiv = Setari(cale).id_dispozitiv()
+    # Aplicatia si serviciul citesc acelasi fisier, deci acelasi id
+    assert Setari(cale).id_dispozitiv() == dispozitiv
+
+    ceas = CeasServer()
+    ceas.sincronizeaza(client, url_ceas(rtdb.url, dispozitiv))
+
+    assert ceas.sincronizat
+    assert list(rtdb.citeste('ceas')) == [dispozitiv]
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from firebase_client import FirebaseClient
+from monitor import MonitorAlerte, NotificatorMemorie, EnergieMemorie
+from setari import Setari
+from stare import valori_trimitere, valori_oprire
+
+
+@pytest.fixture
+def monitor(rtdb, tmp_path):
+    def _monitor(mod='poll', abonamente=('sala_a', 'sala_b')):
+        return MonitorAlerte(
+            NotificatorMemorie(), EnergieMemorie(), client=FirebaseClient(marime_pool=2),
+            url_baza=rtdb.url, mod=mod, abonamente=list(abonamente),
+            setari=Setari(str(tmp_path / 'settings.json')), ipc=False,
+            cale_jurnal=str(tmp_path / 'jurnal.jsonl'), fisier_latente=str(tmp_path / 'latenta.json'),
+            cale_consum=str(tmp_path / 'consum.json'),
+        )
+    return _monitor
+
+
+def _porneste(rtdb, sala, cine, alerta_id):
+    rtdb.actualizeaza('', valori_trimitere(sala, cine, alerta_id, 0))
+
+
+def _opreste(rtdb, sala):
+    rtdb.actualizeaza('', valori_oprire(sala, 'X', 'Z', False)[1])
+
+
+def test_poll_notifica_doar_salile_urmarite(rtdb, monitor):
+    m = monitor()
+    m.verifica_alerta()
+    _porneste(rtdb, 'sala_a', 'X', 'a1')
+    _porneste(rtdb, 'sala_c', 'Y', 'c1')
+    m.verifica_alerta()
+    # Nimic nou: 304 pe versiuni.json, fara notificari repetate
+    m.verifica_alerta()
+    _opreste(rtdb, 'sala_a')
+    m.verifica_alerta()
+
+    assert m.notificator.evenimente == [('alerta', 'sala_a', 'X'), ('sterge', 'sala_a', None)]
+    assert m.energie.treziri == 1
+    assert m.consum.ore()[0][1]['notificari'] == 1
+
+
+def test_alerta_noua_intre_doua_citiri(rtdb, monitor):
+    m = monitor()
+    _porneste(rtdb, 'sala_a', 'X', 'a1')
+    m.verifica_alerta()
+    # Oprirea si alerta urmatoare a aceluiasi expeditor cad intre doua poll-uri
+    _opreste(rtdb, 'sala_a')
+    _porneste(rtdb, 'sala_a', 'X', 'a2')
+    m.verifica_alerta()
+
+    assert m.notificator.evenimente == [('alerta', 'sala_a', 'X'), ('alerta', 'sala_a', 'X')]
+
+
+def test_mod_silentios(rtdb, monitor):
+    m = monitor()
+    m.setari.put('silent_mode', enabled=True)
+    _porneste(rtdb, 'sala_b', 'X', 'b1')
+    m.verifica_alerta()
+
+    assert m.notificator.evenimente == [('silentioasa', 'sala_b', 'X')]
+    assert m.energie.treziri == 0
+
+
+def test_dezabonarea_sterge_alerta(rtdb, monitor):
+    m = monitor()
+    m.abonamente_fixe = None
+    m.setari.put('profil', tip='persoana', nume='P', abonamente=['sala_a', 'sala_b'])
+    m.actualizeaza_abonamente()
+    _porneste(rtdb, 'sala_b', 'X', 'b1')
+    m.verifica_alerta()
+
+    m.setari.put('profil', tip='persoana', nume='P', abonamente=['sala_a'])
+    m.actualizeaza_abonamente()
+
+    assert m.notificator.active == {}
+    assert m.notificator.evenimente[-1] == ('sterge', 'sala_b', None)
+
+
+def test_stream_porneste_si_se_opreste(rtdb, monitor):
+    m = monitor(mod='stream')
+    # Starea completa vine ca prim eveniment al stream-ului
+    _porneste(rtdb, 'sala_a', 'X', 'a1')
+    fir = threading.Thread(target=m.run)
+    fir.start()
+    try:
+        limita = time.monotonic() + 5
+        while not m.notificator.active and time.monotonic() < limita:
+            time.sleep(0.05)
+        assert m.notificator.active == {'sala_a': 'X'}
+        assert m.energie.treaz
+    finally:
+        m.stop()
+        fir.join(5)
+
+    assert not fir.is_alive()
+    assert not m.energie.treaz
+    assert not m.notificator.pornit
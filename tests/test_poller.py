@@ -0,0 +1,74 @@
+import threading
+import time
+
+from poller import Poller
+
+
+def _asteapta(conditie, secunde=5):
+    limita = time.monotonic() + secunde
+    while not conditie():
+        assert time.monotonic() < limita
+        time.sleep(0.01)
+
+
+def test_tickurile_din_timpul_unei_cereri_se_comaseaza():
+    elibereaza = threading.Event()
+    poller = Poller(lambda: elibereaza.wait(5))
+    poller.start()
+    try:
+        poller.tick()
+        _asteapta(lambda: poller.contoare()['in_zbor'])
+        poller.tick()
+        poller.tick()
+        elibereaza.set()
+        _asteapta(lambda: poller.contoare()['executate'] == 2)
+        assert poller.contoare()['comasate'] == 1
+        assert [s for s, _, _ in poller.goleste()] == [1, 2]
+    finally:
+        poller.stop()
+
+
+def test_restart_rapid_nu_lasa_doi_workeri():
+    poller = Poller(lambda: None)
+    poller.start()
+    vechi = poller._thread
+    poller.stop()
+    poller.start()
+    try:
+        vechi.join(2)
+        assert not vechi.is_alive()
+        poller.tick()
+        _asteapta(lambda: poller.contoare()['executate'] == 1)
+    finally:
+        poller.stop()
+
+
+def test_restart_in_timpul_unei_cereri_pastreaza_o_singura_cerere_in_zbor():
+    in_zbor = []
+    maxim = []
+    elibereaza = threading.Event()
+    lock = threading.Lock()
+
+    def cerere():
+        with lock:
+            in_zbor.append(1)
+            maxim.append(len(in_zbor))
+        elibereaza.wait(5)
+        with lock:
+            in_zbor.pop()
+
+    poller = Poller(cerere)
+    poller.start()
+    poller.tick()
+    _asteapta(lambda: poller.contoare()['in_zbor'])
+    poller.stop()
+    poller.start()
+    try:
+        poller.tick()
+        time.sleep(0.1)
+        assert poller.contoare()['executate'] == 0
+        elibereaza.set()
+        _asteapta(lambda: poller.contoare()['executate'] == 2)
+        assert max(maxim) == 1
+    finally:
+        poller.stop()
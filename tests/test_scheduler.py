@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from scheduler import PollScheduler, PoliticaPoll, CeasManual
+
+
+def _planificator(**politica):
+    ceas = CeasManual()
+    return PollScheduler(PoliticaPoll(jitter=0, **politica), ceas=ceas, rng=random.Random(1)), ceas
+
+
+def test_intervalul_de_baza_dupa_stare():
+    planificator, ceas = _planificator()
+    assert planificator.urmatorul_interval() == 3.0
+
+    planificator.seteaza_ecran(False)
+    assert planificator.urmatorul_interval() == 15.0
+
+    planificator.trimitere_locala()
+    assert planificator.urmatorul_interval() == 1.0
+    ceas.avanseaza(31)
+    assert planificator.urmatorul_interval() == 15.0
+
+    planificator.seteaza_alerta(True)
+    assert planificator.urmatorul_interval() == 1.0
+
+
+def test_backoff_limitat_si_faza_noua_dupa_revenire():
+    planificator, _ = _planificator()
+    for _ in range(10):
+        planificator.eroare()
+        assert 3.0 <= planificator.urmatorul_interval() <= 60.0
+
+    planificator.succes()
+    # Primul interval dupa revenire alege o faza noua, sub intervalul de baza
+    assert 0 <= planificator.urmatorul_interval() <= 3.0
+    assert planificator.urmatorul_interval() == 3.0
+
+
+def test_cadere_lunga_ramane_la_backoff_maxim():
+    planificator, ceas = _planificator()
+    # Cateva zile fara retea, cu un poll la fiecare interval
+    for _ in range(5000):
+        planificator.eroare()
+        interval = planificator.urmatorul_interval()
+        assert 3.0 <= interval <= 60.0
+        ceas.avanseaza(interval)
+
+    planificator.succes()
+    assert 0 <= planificator.urmatorul_interval() <= 3.0
+
+
+def test_jitter_in_limite():
+    planificator = PollScheduler(rng=random.Random(2))
+    intervale = [planificator.urmatorul_interval() for _ in range(200)]
+    assert min(intervale) >= 3.0 * 0.8 and max(intervale) <= 3.0 * 1.2
+    assert len(set(intervale)) > 1
+
+
+def test_parametru_necunoscut():
+    with pytest.raises(ValueError):
+        PoliticaPoll(interval_inexistent=1)
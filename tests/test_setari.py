@@ -0,0 +1,18 @@
+from setari import Setari
+
+
+def test_id_dispozitiv_nu_acopera_profilul_salvat_de_celalalt_proces(tmp_path):
+    cale = str(tmp_path / 'settings.json')
+    serviciu = Setari(cale)
+    aplicatie = Setari(cale)
+    # Serviciul a citit setarile inainte ca utilizatorul sa-si aleaga profilul
+    aplicatie.put('profil', tip='profesor', nume='Ana')
+    aplicatie.put('silent_mode', enabled=True)
+
+    id_serviciu = serviciu.id_dispozitiv()
+
+    aplicatie.reincarca_daca_modificat()
+    assert aplicatie.profil() == {'tip': 'profesor', 'nume': 'Ana'}
+    assert aplicatie.silent_mode() is True
+    assert aplicatie.id_dispozitiv() == id_serviciu
+    assert Setari(cale).profil()['nume'] == 'Ana'
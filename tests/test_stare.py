@@ -0,0 +1,56 @@
+from firebase_client import FirebaseClient
+from stare import (UrmarireAlerta, UrmarireSali, CitireAlerte, valori_trimitere, valori_oprire,
+                   moment_istoric, PORNITA, OPRITA)
+
+
+def test_urmarire_alerta_tranzitii():
+    urmarire = UrmarireAlerta()
+    assert urmarire.aplica({'status': True, 'nr': 1}) == PORNITA
+    assert urmarire.aplica({'status': True, 'nr': 1}) is None
+    # Alta alerta, fara oprire vazuta intre ele
+    assert urmarire.aplica({'status': True, 'nr': 2}) == PORNITA
+    assert urmarire.aplica({'status': False, 'nr': 2}) == OPRITA
+    assert urmarire.aplica({'status': False}) is None
+    # Canal scris de o versiune veche, fara nr
+    assert urmarire.aplica({'status': True}) == PORNITA
+
+
+def test_urmarire_sali():
+    sali = UrmarireSali(['s1', 's2'])
+    tranzitii = sali.aplica({'s1': {'status': True, 'cine': 'A'}, 's3': {'status': True}})
+    assert tranzitii == [('s1', PORNITA, {'status': True, 'cine': 'A'})]
+    assert sali.active() == ['s1']
+
+    # Canalul sters inseamna alerta oprita
+    assert [t[:2] for t in sali.aplica({})] == [('s1', OPRITA)]
+
+    sali.aplica({'s2': {'status': True}})
+    sali.seteaza_abonamente(['s1'])
+    assert not sali.activa
+
+
+def test_citire_alerte_aduce_doar_canalele_schimbate(rtdb):
+    rtdb.actualizeaza('', valori_trimitere('s1', 'A', 'a1', 0))
+    citire = CitireAlerte(FirebaseClient(), rtdb.url, ['s1', 's2'])
+
+    modificat, data = citire.citeste()
+    assert modificat and data['s1']['status'] is True
+    cereri = citire.cereri_canal
+
+    # Schimbare pe o sala neurmarita: versiuni.json difera, canalele nu se recitesc
+    rtdb.actualizeaza('', valori_trimitere('s9', 'B', 'b1', 0))
+    assert citire.citeste() == (False, None)
+    # Nimic nou: 304
+    assert citire.citeste() == (False, None)
+    assert citire.cereri_canal == cereri
+
+    rtdb.actualizeaza('', valori_oprire('s1', 'A', 'B', False)[1])
+    modificat, data = citire.citeste()
+    assert modificat and data['s1']['status'] is False
+    assert citire.cereri_canal == cereri + 1
+
+
+def test_moment_istoric():
+    assert moment_istoric({'oprit_la': 1234, 'timestamp': '2024-01-01 10:00:00'}) == 1234
+    assert moment_istoric({'timestamp': 'necunoscut'}) == 0
+    assert moment_istoric({'timestamp': '2024-01-01 10:00:00'}) > 0
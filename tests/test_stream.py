@@ -0,0 +1,69 @@
+import json
+
+from stream import SSEParser, FirebaseStream, aplica_la_cale
+
+
+def test_parser_evenimente_taiate_intre_bucati():
+    parser = SSEParser()
+    assert parser.feed('event: put\r') == []
+    assert parser.feed('\ndata: {"path":"/",') == []
+    assert parser.feed('"data":1}\n\n: comentariu\n\nevent: keep-alive\ndata: null\n\n') == [
+        ('put', '{"path":"/","data":1}'),
+        ('keep-alive', 'null'),
+    ]
+
+
+def test_aplica_put_patch_si_stergere():
+    stare = aplica_la_cale(None, '/', {'s1': {'status': False}})
+    stare = aplica_la_cale(stare, '/s1/status', True)
+    assert stare == {'s1': {'status': True}}
+
+    # Cheile unui patch sunt cai, chiar si pe un nod gol
+    assert aplica_la_cale(None, '/', {'s2/status': True, 's2/cine': 'A'}, merge=True) == {
+        's2': {'status': True, 'cine': 'A'}}
+
+    assert aplica_la_cale(stare, '/s1', None) is None
+
+
+class _Raspuns:
+    status_code = 200
+
+    def __init__(self, bucati):
+        self.bucati = bucati
+
+    def iter_content(self, chunk_size=None, decode_unicode=False):
+        return iter(self.bucati)
+
+    def close(self):
+        pass
+
+
+class _ClientNumarat:
+    def __init__(self, bucati):
+        self.bucati = bucati
+        self.primiti = 0
+
+    def get(self, url, **kwargs):
+        return _Raspuns(self.bucati)
+
+    def numara_primiti(self, octeti):
+        self.primiti += octeti
+
+    def numara_parsare(self, secunde):
+        pass
+
+
+def test_octetii_se_numara_inainte_de_decodare():
+    mesaj = {'path': '/', 'data': {'s1': {'status': True, 'cine': 'Ștefan Ioniță'}}}
+    corp = f"event: put\ndata: {json.dumps(mesaj, ensure_ascii=False)}\n\n".encode('utf-8')
+    # Un caracter de doi octeti taiat intre doua bucati
+    taietura = corp.index('Ș'.encode('utf-8')) + 1
+    client = _ClientNumarat([corp[:taietura], corp[taietura:]])
+    primite = []
+    stream = FirebaseStream('http://test/alerte.json', primite.append, client=client)
+    stream.running = True
+
+    stream._asculta()
+
+    assert client.primiti == len(corp)
+    assert primite == [mesaj['data']]
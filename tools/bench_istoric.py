@@ -0,0 +1,98 @@
+"""
+Masoara deschiderea ecranului Istoric cu un cache local mare:
+deschiderea bazei, prima pagina, sincronizarea incrementala (startAt)
+fata de descarcarea completa a istoric.json.
+
+Rulare: python tools/bench_istoric.py --intrari 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_client import FirebaseClient  # noqa: E402
+from istoric_local import IstoricLocal  # noqa: E402
+from rtdb_local import RtdbLocal  # noqa: E402
+
+MARIME_PAGINA = 20
+
+
+def intrare(i):
+    return {
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(1700000000 + i * 60)),
+        'expeditor': 'SALA MINIMIS',
+        'confirmat_de': f'PERSOANA {i % 7}',
+        'tip': 'confirmat' if i % 3 else 'anulat',
+    }
+
+
+def ms(secunde):
+    return f"{secunde * 1000:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--intrari', type=int, default=10000)
+    parser.add_argument('--noi', type=int, default=5, help="intrari aparute de la ultima deschidere")
+    args = parser.parse_args()
+
+    rtdb = RtdbLocal().start()
+    client = FirebaseClient()
+    url = f"{rtdb.url}/istoric.json"
+
+    istoric = {}
+    for i in range(args.intrari):
+        istoric[rtdb.genereaza_cheie()] = intrare(i)
+    rtdb.scrie("istoric", istoric)
+
+    with tempfile.TemporaryDirectory() as director:
+        cale = os.path.join(director, 'istoric.db')
+        local = IstoricLocal(cale)
+        start = time.perf_counter()
+        local.adauga(istoric)
+        print(f"Populare cache ({args.intrari} intrari): {ms(time.perf_counter() - start)}")
+        local.inchide()
+
+        for i in range(args.noi):
+            rtdb.scrie(f"istoric/{rtdb.genereaza_cheie()}", intrare(args.intrari + i))
+
+        # --- Deschiderea ecranului: baza + prima pagina ---
+        start = time.perf_counter()
+        local = IstoricLocal(cale)
+        t_deschidere = time.perf_counter() - start
+        pagina = local.pagina(limita=MARIME_PAGINA)
+        t_prima_pagina = time.perf_counter() - start
+
+        # --- Sincronizare incrementala ---
+        start = time.perf_counter()
+        ultima = local.ultima_cheie()
+        response = client.get(url, params={'orderBy': '"$key"', 'startAt': f'"{ultima}"'})
+        bytes_incremental = len(response.content)
+        data = response.json() or {}
+        data.pop(ultima, None)
+        local.adauga(data)
+        t_sync = time.perf_counter() - start
+
+        # --- Varianta veche: tot istoric.json, sortat dupa timestamp ---
+        start = time.perf_counter()
+        response = client.get(url)
+        bytes_complet = len(response.content)
+        complet = response.json()
+        intrari = sorted(complet.values(), key=lambda x: x.get('timestamp', ''), reverse=True)[:50]
+        t_complet = time.perf_counter() - start
+
+        print(f"Deschidere baza:              {ms(t_deschidere)}")
+        print(f"Prima pagina afisabila:       {ms(t_prima_pagina)} ({len(pagina)} intrari)")
+        print(f"Sincronizare incrementala:    {ms(t_sync)} ({len(data)} noi, {bytes_incremental} bytes)")
+        print(f"Descarcare completa (vechi):  {ms(t_complet)} ({len(intrari)} afisate, {bytes_complet} bytes)")
+        print(f"Intrari in cache:             {local.numar()}")
+        local.inchide()
+
+    rtdb.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Masoara oprirea unei alerte: varianta veche (PATCH pe canalul salii +
+POST istoric.json, doua drumuri pana la server) fata de un singur PATCH
+multi-cale pe radacina (stare.confirma_alerta).
+
+Rulare: python tools/bench_oprire.py --repetari 50 --rtt 0.08
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_client import FirebaseClient  # noqa: E402
+from stare import confirma_alerta, SALA_IMPLICITA  # noqa: E402
+from rtdb_local import RtdbLocal  # noqa: E402
+
+
+def oprire_veche(client, url_alerta, url_istoric):
+    client.patch(url_alerta, json={'status': False, 'cine': ''})
+    client.post(url_istoric, json={
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'expeditor': 'SALA MINIMIS',
+        'confirmat_de': 'BENCH',
+        'tip': 'confirmat'
+    })
+
+
+def rezumat(nume, durate):
+    durate = sorted(durate)
+    medie = sum(durate) / len(durate)
+    p50 = durate[len(durate) // 2]
+    p95 = durate[min(len(durate) - 1, int(len(durate) * 0.95))]
+    print(f"{nume:28s} medie {medie:7.1f} ms   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms")
+    return medie
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repetari', type=int, default=50)
+    parser.add_argument('--rtt', type=float, default=0.08, help="drum dus-intors simulat (secunde)")
+    args = parser.parse_args()
+
+    rtdb = RtdbLocal(intarziere=args.rtt).start()
+    client = FirebaseClient()
+    url_alerta = f"{rtdb.url}/alerte/{SALA_IMPLICITA}.json"
+    url_istoric = f"{rtdb.url}/istoric.json"
+    url_radacina = f"{rtdb.url}/.json"
+
+    # Conexiunea keep-alive e deja deschisa pentru ambele variante
+    client.incalzeste(url_alerta)
+
+    rezultate = {}
+    for nume, oprire in (
+        ('PATCH + POST (vechi)', lambda: oprire_veche(client, url_alerta, url_istoric)),
+        ('PATCH multi-cale (nou)', lambda: confirma_alerta(client, url_radacina, SALA_IMPLICITA, 'SALA MINIMIS', 'BENCH', False)),
+    ):
+        rtdb.scrie('istoric', None)
+        durate = []
+        for _ in range(args.repetari):
+            rtdb.scrie(f'alerte/{SALA_IMPLICITA}', {'status': True, 'cine': 'SALA MINIMIS'})
+            start = time.perf_counter()
+            oprire()
+            durate.append((time.perf_counter() - start) * 1000)
+        rezultate[nume] = rezumat(nume, durate)
+
+        alerta = rtdb.citeste(f'alerte/{SALA_IMPLICITA}')
+        intrari = len(rtdb.citeste('istoric') or {})
+        print(f"{'':28s} alerta oprita: {alerta['status'] is False}, intrari in istoric: {intrari}")
+
+    vechi, nou = rezultate.values()
+    print(f"Castig: {vechi - nou:.1f} ms per oprire ({(1 - nou / vechi) * 100:.0f}%) la RTT {args.rtt * 1000:.0f} ms")
+    rtdb.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Masoara poll-ul pe calea fierbinte: varianta veche (GET cu ETag pe tot
+alerte.json) fata de cea noua (stare.CitireAlerte: versiuni.json, apoi
+canalul salii doar cand i s-a schimbat versiunea).
+
+Pentru fiecare varianta: octeti per poll (raspunsuri + header-e, numarati
+de rtdb_local) si timpul de decodare JSON per poll. Intre poll-uri se
+schimba, din --schimbari in --schimbari poll-uri, o sala aleasa la
+intamplare; telefonul urmareste --abonamente din cele --sali sali.
+
+Rezultat orientativ (o schimbare la 10 poll-uri, 2 sali urmarite):
+    1 sala:    178 -> 193 B/poll (un GET in plus la fiecare schimbare)
+    20 sali:   370 -> 198 B/poll, decodare 5.9 -> 3.1 us/poll
+    100 sali: 2268 -> 418 B/poll, decodare 32.6 -> 11.6 us/poll (5 urmarite)
+Poll-urile fara schimbari sunt 304 in ambele variante; castigul vine din
+schimbarile salilor neurmarite si din marimea canalului citit.
+
+Rulare: python tools/bench_versiune.py --sali 20 --poll-uri 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_client import FirebaseClient, CitireConditionala  # noqa: E402
+from stare import CitireAlerte, valori_trimitere, valori_oprire  # noqa: E402
+from rtdb_local import RtdbLocal  # noqa: E402
+
+
+class ClientMasurat:
+    """FirebaseClient care cronometreaza decodarea JSON a raspunsurilor"""
+
+    def __init__(self):
+        self.client = FirebaseClient(marime_pool=1)
+        self.decodare_s = 0.0
+
+    def get(self, url, **kwargs):
+        return self.client.get(url, **kwargs)
+
+    def json(self, response):
+        start = time.perf_counter()
+        try:
+            return self.client.json(response)
+        finally:
+            self.decodare_s += time.perf_counter() - start
+
+
+def date_initiale(sali):
+    alerte = {}
+    for sala in sali:
+        # Un canal cu toate campurile, ca dupa prima alerta
+        alerte[sala] = {'status': False, 'cine': '', 'id': 'x' * 12,
+                        'apasat_la': 1700000000000, 'trimis_la': 1700000000000}
+    return {'alerte': alerte, 'versiuni': {sala: 1 for sala in sali}}
+
+
+def ruleaza(nume, fabrica, args):
+    sali = [f"sala_{i:02d}" for i in range(args.sali)]
+    abonamente = sali[:args.abonamente]
+    rtdb = RtdbLocal(date_initiale=date_initiale(sali)).start()
+    client = ClientMasurat()
+    citire = fabrica(client, rtdb.url, abonamente)
+    citire.citeste()  # prima citire completa nu intra in masuratoare
+
+    rng = random.Random(1)
+    active = set()
+    inceput = rtdb.contoare()
+    client.decodare_s = 0.0
+    modificate = 0
+    for i in range(args.poll_uri):
+        if i % args.schimbari == 0:
+            sala = rng.choice(sali)
+            if sala in active:
+                rtdb.actualizeaza('', valori_oprire(sala, 'BENCH', 'BENCH', False)[1])
+                active.discard(sala)
+            else:
+                rtdb.actualizeaza('', valori_trimitere(sala, 'BENCH', f'b{i}', 0))
+                active.add(sala)
+        modificat, _ = citire.citeste()
+        modificate += modificat
+    sfarsit = rtdb.contoare()
+    rtdb.stop()
+
+    cereri = sfarsit['cereri'] - inceput['cereri']
+    octeti = sfarsit['bytes'] - inceput['bytes']
+    print(f"{nume:26s} {cereri / args.poll_uri:6.2f} cereri/poll {octeti / args.poll_uri:8.0f} B/poll "
+          f"{client.decodare_s * 1e6 / args.poll_uri:8.1f} us decodare/poll   "
+          f"({modificate} poll-uri cu date de evaluat)")
+    return octeti
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll alerte.json vs versiuni.json + canal")
+    parser.add_argument('--sali', type=int, default=20, help="cate sali exista in baza")
+    parser.add_argument('--abonamente', type=int, default=2, help="cate sali urmareste telefonul")
+    parser.add_argument('--poll-uri', type=int, default=300)
+    parser.add_argument('--schimbari', type=int, default=10, help="o schimbare la atatea poll-uri")
+    args = parser.parse_args()
+
+    print(f"{args.sali} sali, {args.abonamente} urmarite, o schimbare la {args.schimbari} poll-uri")
+    vechi = ruleaza('alerte.json (vechi)',
+                    lambda client, url, abonamente: CitireConditionala(client, f"{url}/alerte.json"), args)
+    nou = ruleaza('versiuni.json + canal (nou)', CitireAlerte, args)
+    print(f"Octeti per poll: {(1 - nou / vechi) * 100:.0f}% mai putin")
+
+
+if __name__ == '__main__':
+    main()
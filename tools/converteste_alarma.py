@@ -0,0 +1,53 @@
+"""
+Genereaza alarm.wav din alarm.mp3, in formatul pe care telefonul il reda
+cel mai repede: PCM 16 bit, mono, 48 kHz (rata nativa a majoritatii
+telefoanelor, deci fara resampling la redare). Pastram doar primele
+--durata secunde, cu un fade scurt la capete ca bucla sa nu pocneasca;
+SoundPool tine mostra decodata in memorie si are o limita de ~1 MB.
+
+Necesita ffmpeg. Ruleaza in workflow-ul de build, inainte de buildozer:
+    python tools/converteste_alarma.py --durata 4
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DIRECTOR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RATA = 48000
+FADE = 0.01
+LIMITA_SOUNDPOOL = 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="alarm.mp3 -> alarm.wav (PCM pentru SoundPool)")
+    parser.add_argument('--intrare', default=os.path.join(DIRECTOR, 'alarm.mp3'))
+    parser.add_argument('--iesire', default=os.path.join(DIRECTOR, 'alarm.wav'))
+    parser.add_argument('--durata', type=float, default=4.0, help="secunde pastrate pentru bucla")
+    args = parser.parse_args()
+
+    filtre = f"afade=t=in:d={FADE},afade=t=out:st={args.durata - FADE}:d={FADE}"
+    comanda = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-i', args.intrare,
+        '-t', str(args.durata),
+        '-ac', '1', '-ar', str(RATA),
+        '-af', filtre,
+        '-map_metadata', '-1',
+        '-c:a', 'pcm_s16le',
+        args.iesire,
+    ]
+    try:
+        subprocess.run(comanda, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Eroare conversie sunet: {e}")
+        sys.exit(1)
+
+    marime = os.path.getsize(args.iesire)
+    print(f"{args.iesire}: {marime // 1024} KB ({args.durata:g} s, mono, {RATA} Hz)")
+    if marime > LIMITA_SOUNDPOOL:
+        print("Atentie: peste ~1 MB, SoundPool poate refuza mostra - scade --durata")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Simulare de flota: N telefoane fara interfata fata de inlocuitorul local
+RTDB (rtdb_local.py), ca sa vedem cate dispozitive suporta o instanta
+inainte ca poll-ul pe versiuni.json si scrierile in istoric sa devina o
+problema. Toti clientii urmaresc aceeasi sala (cazul cel mai incarcat);
+costul in functie de numarul de sali il masoara tools/canale.py.
+
+Fiecare client simulat ruleaza aceeasi logica ca serviciul:
+- mod "poll": CitireAlerte (versiuni.json cu ETag, apoi canalul salii) +
+  PollScheduler + UrmarireSali, ca MonitorAlerte.verifica_alerta;
+- mod "stream": cate un FirebaseStream pe alerte.json.
+Alertele sunt pornite periodic de un expeditor, iar dupa --confirmare
+secunde unul sau mai multi clienti le opresc cu confirma_alerta, ca
+opreste_alarma_global.
+
+In modul poll, clientii sunt impartiti pe --fire thread-uri (fiecare cu
+conexiunea lui), deci serverul vede mai putine conexiuni decat telefoane;
+numarul si ritmul cererilor sunt insa cele reale. Daca "intarziere
+planificare" creste, masina de test e saturata, nu serverul.
+
+Rulare: python tools/flota.py --clienti 10,100,1000 --durata 30
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from firebase_client import FirebaseClient  # noqa: E402
+from scheduler import PollScheduler  # noqa: E402
+from stare import (UrmarireSali, CitireAlerte, confirma_alerta, valori_trimitere,  # noqa: E402
+                   SALA_IMPLICITA, PORNITA)
+from stream import FirebaseStream  # noqa: E402
+from rtdb_local import RtdbLocal  # noqa: E402
+
+
+def acum_ms():
+    return time.time() * 1000
+
+
+def percentila(valori, procent):
+    if not valori:
+        return float('nan')
+    valori = sorted(valori)
+    return valori[min(len(valori) - 1, int(len(valori) * procent / 100))]
+
+
+class ClientSimulat:
+    """Starea unui telefon: ce alerte a vazut si cand"""
+
+    def __init__(self, index):
+        self.index = index
+        self.urmarire = UrmarireSali([SALA_IMPLICITA])
+        self.notificari = {}   # id alerta -> de cate ori am notificat
+        self.latente = []      # ms de la scrierea pe server pana la notificare
+        self.erori = 0
+
+    def aplica(self, data):
+        for sala, tranzitie, stare in self.urmarire.aplica(data):
+            if tranzitie != PORNITA:
+                continue
+            alerta_id = stare.get('id')
+            self.notificari[alerta_id] = self.notificari.get(alerta_id, 0) + 1
+            trimis_la = stare.get('trimis_la')
+            if isinstance(trimis_la, (int, float)):
+                self.latente.append(acum_ms() - trimis_la)
+
+
+class FlotaPoll:
+    """Clientii in mod poll, planificati pe cateva thread-uri de lucru"""
+
+    def __init__(self, clienti, url, fire):
+        self.url = url
+        self.running = False
+        self.intarzieri = []
+        self._lock = threading.Lock()
+        self._grupuri = [clienti[i::fire] for i in range(min(fire, len(clienti)))]
+        self._fire = []
+
+    def start(self):
+        self.running = True
+        for grup in self._grupuri:
+            thread = threading.Thread(target=self._lucreaza, args=(grup,), daemon=True)
+            thread.start()
+            self._fire.append(thread)
+
+    def stop(self):
+        self.running = False
+        for thread in self._fire:
+            thread.join(timeout=15)
+
+    def _lucreaza(self, grup):
+        client = FirebaseClient(marime_pool=1)
+        coada = []
+        stari = {}
+        start = time.monotonic()
+        for sim in grup:
+            planificator = PollScheduler(rng=random.Random(sim.index))
+            stari[sim.index] = (sim, CitireAlerte(client, self.url, [SALA_IMPLICITA]), planificator)
+            heapq.heappush(coada, (start + planificator.faza_initiala(), sim.index))
+
+        intarzieri = []
+        while self.running and coada:
+            scadent, index = heapq.heappop(coada)
+            asteptare = scadent - time.monotonic()
+            if asteptare > 0:
+                time.sleep(asteptare)
+            else:
+                intarzieri.append(-asteptare * 1000)
+
+            sim, citire, planificator = stari[index]
+            # Acelasi pas ca MonitorAlerte.verifica_alerta
+            try:
+                modificat, data = citire.citeste()
+                planificator.succes()
+                if modificat:
+                    sim.aplica(data)
+            except Exception:
+                sim.erori += 1
+                planificator.eroare()
+            planificator.seteaza_alerta(sim.urmarire.activa)
+            heapq.heappush(coada, (time.monotonic() + planificator.urmatorul_interval(), index))
+
+        with self._lock:
+            self.intarzieri.extend(intarzieri)
+
+
+class FlotaStream:
+    """Clientii in mod stream: o conexiune deschisa per telefon"""
+
+    def __init__(self, clienti, url):
+        self.intarzieri = []
+        self._streamuri = []
+        for sim in clienti:
+            self._streamuri.append(FirebaseStream(
+                url, sim.aplica, on_error=self._la_eroare(sim), client=FirebaseClient(marime_pool=1)))
+
+    @staticmethod
+    def _la_eroare(sim):
+        def la_eroare(e):
+            sim.erori += 1
+        return la_eroare
+
+    def start(self):
+        for s in self._streamuri:
+            threading.Thread(target=s.run, daemon=True).start()
+
+    def stop(self):
+        # response.close() din alt thread se poate bloca in mijlocul unei
+        # citiri; oprim doar buclele, conexiunile le inchide rtdb.stop()
+        for s in self._streamuri:
+            s.running = False
+
+
+def ruleaza(n, args):
+    rtdb = RtdbLocal(date_initiale={'alerte': {SALA_IMPLICITA: {'status': False, 'cine': ''}}}).start()
+    url_alerte = f"{rtdb.url}/alerte.json"
+    url_radacina = f"{rtdb.url}/.json"
+    clienti = [ClientSimulat(i) for i in range(n)]
+
+    if args.mod == 'stream':
+        flota = FlotaStream(clienti, url_alerte)
+    else:
+        flota = FlotaPoll(clienti, rtdb.url, args.fire)
+    flota.start()
+
+    # Lasam clientii sa-si ia faza initiala / sa deschida stream-urile
+    time.sleep(args.incalzire)
+    expeditor = FirebaseClient()
+    alerte = []
+    inceput = rtdb.contoare()
+    t_inceput = time.monotonic()
+
+    pauza = args.durata / max(args.alerte, 1)
+    for i in range(args.alerte):
+        alerta_id = f"sim{n}-{i}"
+        alerte.append(alerta_id)
+        expeditor.patch(url_radacina, json=valori_trimitere(
+            SALA_IMPLICITA, 'SIMULARE', alerta_id, int(acum_ms())))
+        time.sleep(args.confirmare)
+
+        # Mai multi oameni pot apasa STOP aproape simultan
+        confirmari = [
+            threading.Thread(target=confirma_alerta, args=(
+                FirebaseClient(), url_radacina, SALA_IMPLICITA, 'SIMULARE', f'CLIENT {k}', False))
+            for k in range(args.confirmari)
+        ]
+        for t in confirmari:
+            t.start()
+        for t in confirmari:
+            t.join()
+        time.sleep(max(pauza - args.confirmare, 0))
+
+    durata = time.monotonic() - t_inceput
+    sfarsit = rtdb.contoare()
+    flota.stop()
+    rtdb.stop()
+
+    latente = [ms for sim in clienti for ms in sim.latente]
+    ratate = sum(1 for sim in clienti for a in alerte if sim.notificari.get(a, 0) == 0)
+    duplicate = sum(max(sim.notificari.get(a, 0) - 1, 0) for sim in clienti for a in alerte)
+    metode = {m: sfarsit['metode'].get(m, 0) - inceput['metode'].get(m, 0) for m in sfarsit['metode']}
+    istoric = len(rtdb.citeste('istoric') or {})
+
+    return {
+        'clienti': n,
+        'cereri_s': (sfarsit['cereri'] - inceput['cereri']) / durata,
+        'kb_s': (sfarsit['bytes'] - inceput['bytes']) / durata / 1024,
+        'metode': metode,
+        'p50': percentila(latente, 50),
+        'p95': percentila(latente, 95),
+        'p99': percentila(latente, 99),
+        'max': max(latente) if latente else float('nan'),
+        'ratate': ratate,
+        'duplicate': duplicate,
+        'istoric': istoric,
+        'erori': sum(sim.erori for sim in clienti),
+        'intarziere': percentila(flota.intarzieri, 95) if flota.intarzieri else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de incarcare: N telefoane fata de un RTDB local")
+    parser.add_argument('--clienti', default='10,100,1000', help="valori N separate prin virgula")
+    parser.add_argument('--mod', choices=('poll', 'stream'), default='poll')
+    parser.add_argument('--durata', type=float, default=30, help="secunde masurate per N")
+    parser.add_argument('--alerte', type=int, default=3, help="alerte pornite per N")
+    parser.add_argument('--confirmare', type=float, default=8, help="secunde pana la STOP")
+    parser.add_argument('--confirmari', type=int, default=1, help="cati apasa STOP simultan")
+    parser.add_argument('--fire', type=int, default=32, help="thread-uri de lucru in modul poll")
+    parser.add_argument('--incalzire', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'N':>6} {'cereri/s':>9} {'KB/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} "
+          f"{'ratate':>6} {'dupl':>5} {'istoric':>7} {'erori':>5} {'intarz.p95':>10}")
+    for n in (int(x) for x in args.clienti.split(',')):
+        r = ruleaza(n, args)
+        print(f"{r['clienti']:6d} {r['cereri_s']:9.1f} {r['kb_s']:8.1f} {r['p50']:7.0f} {r['p95']:7.0f} "
+              f"{r['p99']:7.0f} {r['max']:7.0f} {r['ratate']:6d} {r['duplicate']:5d} {r['istoric']:7d} "
+              f"{r['erori']:5d} {r['intarziere']:10.0f}")
+        print(f"       cereri pe metoda: {r['metode']}")
+    print("Latentele (ms) sunt de la scrierea alertei pe server pana la notificarea clientului.")
+
+
+if __name__ == '__main__':
+    main()
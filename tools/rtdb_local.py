@@ -0,0 +1,447 @@
+"""
+Inlocuitor local pentru Firebase Realtime Database (subsetul REST folosit
+de aplicatie), pentru teste si masuratori offline.
+
+Suporta GET/PUT/PATCH/POST/DELETE pe /<cale>.json, ETag (X-Firebase-ETag
++ if-none-match -> 304), interogari orderBy="$key" cu startAt/endAt/
+limitToFirst/limitToLast, shallow=true, valori de server {".sv": "timestamp"}
+si {".sv": {"increment": n}} si streaming (Accept: text/event-stream) cu evenimente put/patch/keep-alive.
+Numara cererile (pe metoda) si octetii trimisi, pentru tools/flota.py.
+intarziere=<secunde> simuleaza drumul dus-intors prin retea la fiecare cerere.
+
+Pornire: python tools/rtdb_local.py --port 8765
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+
+def _acum_ms():
+    return int(time.time() * 1000)
+
+
+def _parti(cale):
+    return [p for p in cale.split("/") if p]
+
+
+def _citeste(radacina, parti):
+    nod = radacina
+    for p in parti:
+        if not isinstance(nod, dict) or p not in nod:
+            return None
+        nod = nod[p]
+    return nod
+
+
+def _scrie(radacina, parti, valoare):
+    """Returneaza noua radacina (null = stergere, ca in Firebase)"""
+    if not parti:
+        return valoare
+    rezultat = dict(radacina) if isinstance(radacina, dict) else {}
+    copil = _scrie(rezultat.get(parti[0]), parti[1:], valoare)
+    if copil is None or copil == {}:
+        rezultat.pop(parti[0], None)
+    else:
+        rezultat[parti[0]] = copil
+    return rezultat or None
+
+
+def _rezolva_sv(valoare, acum, curent=None):
+    """
+    Inlocuieste {".sv": "timestamp"} cu timpul serverului (ms) si
+    {".sv": {"increment": n}} cu valoarea curenta de la aceeasi cale + n
+    """
+    if isinstance(valoare, dict):
+        if valoare == {".sv": "timestamp"}:
+            return acum
+        sv = valoare.get(".sv")
+        if len(valoare) == 1 and isinstance(sv, dict) and "increment" in sv:
+            numeric = isinstance(curent, (int, float)) and not isinstance(curent, bool)
+            return (curent if numeric else 0) + sv["increment"]
+        return {cheie: _rezolva_sv(val, acum, curent.get(cheie) if isinstance(curent, dict) else None)
+                for cheie, val in valoare.items()}
+    return valoare
+
+
+def _interogheaza(valoare, query):
+    """Aplica parametrii de interogare REST (orderBy="$key" sau dupa un copil) si shallow"""
+    if not isinstance(valoare, dict):
+        return valoare
+
+    def param(nume):
+        if nume not in query:
+            return None
+        return json.loads(query[nume][0])
+
+    if query.get("shallow", [""])[0] == "true":
+        return {cheie: True for cheie in valoare}
+
+    ordine = param("orderBy")
+    if ordine is not None:
+        if ordine == "$key":
+            def pozitie(cheie):
+                return (cheie,)
+
+            def limita(v):
+                return (v,)
+        else:
+            # Dupa valoarea copilului, apoi dupa cheie
+            def pozitie(cheie):
+                copil = valoare[cheie]
+                return _ordine_firebase(copil.get(ordine) if isinstance(copil, dict) else None) + (cheie,)
+            limita = _ordine_firebase
+
+        chei = sorted(valoare, key=pozitie)
+        start, end = param("startAt"), param("endAt")
+        if start is not None:
+            chei = [c for c in chei if pozitie(c) >= limita(start)]
+        if end is not None:
+            chei = [c for c in chei if pozitie(c)[:len(limita(end))] <= limita(end)]
+        if param("limitToFirst") is not None:
+            chei = chei[:param("limitToFirst")]
+        if param("limitToLast") is not None:
+            chei = chei[-param("limitToLast"):] if param("limitToLast") else []
+        valoare = {c: valoare[c] for c in chei}
+
+    return valoare
+
+
+def _ordine_firebase(v):
+    """Ordinea Firebase dupa un copil: null, false, true, numere, siruri, obiecte"""
+    if v is None:
+        return (0, 0)
+    if isinstance(v, bool):
+        return (1, int(v))
+    if isinstance(v, (int, float)):
+        return (2, v)
+    if isinstance(v, str):
+        return (3, v)
+    return (4, 0)
+
+
+class _Abonat:
+    def __init__(self, parti):
+        self.parti = parti
+        self.evenimente = []
+        self.conditie = threading.Condition()
+        self.inchis = False
+
+    def trimite(self, event, data):
+        with self.conditie:
+            self.evenimente.append((event, data))
+            self.conditie.notify()
+
+    def inchide(self):
+        with self.conditie:
+            self.inchis = True
+            self.conditie.notify()
+
+
+class RtdbLocal:
+    """Baza de date in memorie + server HTTP pe un thread separat"""
+
+    def __init__(self, port=0, keepalive=30, date_initiale=None, intarziere=0):
+        self.date = date_initiale
+        self.keepalive = keepalive
+        self.intarziere = intarziere
+        self.lock = threading.RLock()
+        self.abonati = []
+        self._ultimul_push = 0
+        self.cereri = 0
+        self.cereri_metoda = {}
+        self.bytes_trimisi = 0
+
+        rtdb = self
+
+        class Handler(_HandlerRtdb):
+            server_rtdb = rtdb
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = None
+
+    # ---------- ciclu de viata ----------
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.inchide_streamuri()
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ---------- operatii pe date ----------
+    def contoare(self):
+        """Copie a contoarelor de trafic: cereri, cereri pe metoda, octeti trimisi"""
+        with self.lock:
+            return {'cereri': self.cereri, 'metode': dict(self.cereri_metoda),
+                    'bytes': self.bytes_trimisi}
+
+    def _numara(self, metoda=None, octeti=0):
+        with self.lock:
+            if metoda:
+                self.cereri += 1
+                self.cereri_metoda[metoda] = self.cereri_metoda.get(metoda, 0) + 1
+            self.bytes_trimisi += octeti
+
+    def citeste(self, cale):
+        with self.lock:
+            return _citeste(self.date, _parti(cale))
+
+    def scrie(self, cale, valoare):
+        with self.lock:
+            valoare = _rezolva_sv(valoare, _acum_ms(), _citeste(self.date, _parti(cale)))
+            self.date = _scrie(self.date, _parti(cale), valoare)
+            self._notifica("put", _parti(cale), valoare)
+            return valoare
+
+    def actualizeaza(self, cale, valori):
+        with self.lock:
+            parti = _parti(cale)
+            acum = _acum_ms()
+            valori = {cheie: _rezolva_sv(val, acum, _citeste(self.date, parti + _parti(cheie)))
+                      for cheie, val in valori.items()}
+            for cheie, val in valori.items():
+                self.date = _scrie(self.date, parti + _parti(cheie), val)
+            self._notifica("patch", parti, valori)
+            return valori
+
+    def genereaza_cheie(self):
+        """Chei cronologice, ca push ID-urile Firebase"""
+        with self.lock:
+            acum = max(int(time.time() * 1000), self._ultimul_push + 1)
+            self._ultimul_push = acum
+        cheie = ""
+        for _ in range(8):
+            cheie = PUSH_CHARS[acum % 64] + cheie
+            acum //= 64
+        return cheie + "000000000000"
+
+    # ---------- streaming ----------
+    def aboneaza(self, parti):
+        abonat = _Abonat(parti)
+        with self.lock:
+            self.abonati.append(abonat)
+            abonat.trimite("put", {"path": "/", "data": _citeste(self.date, parti)})
+        return abonat
+
+    def dezaboneaza(self, abonat):
+        with self.lock:
+            if abonat in self.abonati:
+                self.abonati.remove(abonat)
+
+    def inchide_streamuri(self):
+        """Inchide toate conexiunile de streaming (simuleaza o cadere de retea)"""
+        with self.lock:
+            abonati = list(self.abonati)
+            self.abonati = []
+        for abonat in abonati:
+            abonat.inchide()
+
+    def trimite_eveniment(self, event, data=None):
+        """Trimite un eveniment arbitrar (ex. cancel, auth_revoked) tuturor abonatilor"""
+        with self.lock:
+            for abonat in self.abonati:
+                abonat.trimite(event, data)
+
+    def _notifica(self, event, parti, valoare):
+        for abonat in self.abonati:
+            n = len(abonat.parti)
+            if parti[:n] == abonat.parti:
+                # Scrierea e in interiorul nodului urmarit
+                cale = "/" + "/".join(parti[n:])
+                abonat.trimite(event, {"path": cale, "data": valoare})
+            elif abonat.parti[:len(parti)] == parti:
+                relative = self._relative(event, abonat.parti[len(parti):], valoare)
+                if relative is not None:
+                    # Patch multi-cale: doar caile din interiorul nodului urmarit, ca Firebase
+                    if relative:
+                        abonat.trimite("patch", {"path": "/", "data": relative})
+                else:
+                    # Scrierea e deasupra nodului urmarit - retrimitem nodul intreg
+                    abonat.trimite("put", {"path": "/", "data": _citeste(self.date, abonat.parti)})
+
+    @staticmethod
+    def _relative(event, sufix, valori):
+        """Cheile unui patch aflate sub sufix, relativ la el; None daca una il acopera"""
+        if event != "patch" or not isinstance(valori, dict):
+            return None
+        relative = {}
+        for cheie, val in valori.items():
+            parti = _parti(cheie)
+            if sufix[:len(parti)] == parti:
+                return None
+            if parti[:len(sufix)] == sufix:
+                relative["/".join(parti[len(sufix):])] = val
+        return relative
+
+
+class _HandlerRtdb(BaseHTTPRequestHandler):
+    server_rtdb = None
+    protocol_version = "HTTP/1.1"
+    # Header-ele si corpul pleaca in write-uri separate; fara asta, Nagle +
+    # delayed ACK adauga ~40 ms la fiecare raspuns
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _cale(self):
+        cale = urlsplit(self.path).path
+        if not cale.endswith(".json"):
+            return None
+        return cale[:-len(".json")]
+
+    def _corp(self):
+        lungime = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(lungime) or b"null")
+
+    def _raspunde(self, cod, valoare, etag=False):
+        corp = json.dumps(valoare, separators=(",", ":")).encode()
+
+        if etag:
+            valoare_etag = hashlib.sha1(corp).hexdigest()
+            if self.headers.get("if-none-match") == valoare_etag:
+                self.send_response(304)
+                self.send_header("ETag", valoare_etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                self.server_rtdb._numara(octeti=self._octeti_header)
+                return
+
+        self.send_response(cod)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corp)))
+        if etag:
+            self.send_header("ETag", valoare_etag)
+        self.end_headers()
+        self.wfile.write(corp)
+        self.server_rtdb._numara(octeti=self._octeti_header + len(corp))
+
+    def end_headers(self):
+        # Marimea header-elor, inainte ca buffer-ul sa fie golit in socket
+        self._octeti_header = sum(len(b) for b in getattr(self, '_headers_buffer', []))
+        super().end_headers()
+
+    def _inceput(self):
+        self.server_rtdb._numara(metoda=self.command)
+        if self.server_rtdb.intarziere:
+            time.sleep(self.server_rtdb.intarziere)
+        cale = self._cale()
+        if cale is None:
+            self._raspunde(404, {"error": "Calea trebuie sa se termine in .json"})
+        return cale
+
+    def do_GET(self):
+        cale = self._inceput()
+        if cale is None:
+            return
+        if "text/event-stream" in self.headers.get("Accept", ""):
+            self._stream(cale)
+        else:
+            etag = self.headers.get("X-Firebase-ETag", "").lower() == "true"
+            query = parse_qs(urlsplit(self.path).query)
+            valoare = _interogheaza(self.server_rtdb.citeste(cale), query)
+            self._raspunde(200, valoare, etag=etag)
+
+    def do_PUT(self):
+        cale = self._inceput()
+        if cale is None:
+            return
+        valoare = self.server_rtdb.scrie(cale, self._corp())
+        self._raspunde(200, valoare)
+
+    def do_PATCH(self):
+        cale = self._inceput()
+        if cale is None:
+            return
+        valori = self.server_rtdb.actualizeaza(cale, self._corp())
+        self._raspunde(200, valori)
+
+    def do_POST(self):
+        cale = self._inceput()
+        if cale is None:
+            return
+        valoare = self._corp()
+        cheie = self.server_rtdb.genereaza_cheie()
+        self.server_rtdb.scrie(f"{cale}/{cheie}", valoare)
+        self._raspunde(200, {"name": cheie})
+
+    def do_DELETE(self):
+        cale = self._inceput()
+        if cale is None:
+            return
+        self.server_rtdb.scrie(cale, None)
+        self._raspunde(200, None)
+
+    def _stream(self, cale):
+        rtdb = self.server_rtdb
+        abonat = rtdb.aboneaza(_parti(cale))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.close_connection = True
+        rtdb._numara(octeti=self._octeti_header)
+
+        try:
+            while True:
+                with abonat.conditie:
+                    if not abonat.evenimente and not abonat.inchis:
+                        abonat.conditie.wait(rtdb.keepalive)
+                    evenimente = abonat.evenimente
+                    abonat.evenimente = []
+                    inchis = abonat.inchis
+
+                if not evenimente and not inchis:
+                    evenimente = [("keep-alive", None)]
+
+                octeti = 0
+                for event, data in evenimente:
+                    mesaj = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+                    bucata = b"%x\r\n%s\r\n" % (len(mesaj), mesaj)
+                    self.wfile.write(bucata)
+                    octeti += len(bucata)
+                self.wfile.flush()
+                rtdb._numara(octeti=octeti)
+
+                if inchis:
+                    self.wfile.write(b"0\r\n\r\n")
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            rtdb.dezaboneaza(abonat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Firebase RTDB local (subset REST)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keepalive", type=float, default=30)
+    parser.add_argument("--intarziere", type=float, default=0, help="RTT simulat (secunde)")
+    args = parser.parse_args()
+
+    rtdb = RtdbLocal(port=args.port, keepalive=args.keepalive, intarziere=args.intarziere,
+                     date_initiale={"alerte": {"sala_minimis": {"status": False, "cine": ""}},
+                                    "versiuni": {"sala_minimis": 0},
+                                    "sali": {"sala_minimis": "SALA MINIMIS"}})
+    print(f"RTDB local pe {rtdb.url}")
+    try:
+        rtdb.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Verificare offline a ascultarii prin stream (stream.py) folosind
+inlocuitorul local RTDB: parsare, reconectare si resincronizare.
+
+Rulare: python tools/verifica_stream.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stream  # noqa: E402
+from stream import FirebaseStream, SSEParser  # noqa: E402
+from rtdb_local import RtdbLocal  # noqa: E402
+
+
+def asteapta(conditie, timeout=5):
+    limita = time.time() + timeout
+    while time.time() < limita:
+        if conditie():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def verifica(nume, rezultat):
+    print(f"{'OK  ' if rezultat else 'EROARE'} {nume}")
+    return rezultat
+
+
+def verifica_parser():
+    parser = SSEParser()
+    evenimente = []
+    text = 'event: put\r\ndata: {"path":"/","data":1}\r\n\r\n: comentariu\nevent: keep-alive\ndata: null\n\n'
+    # Trimitem caracter cu caracter ca sa acoperim liniile rupte intre chunk-uri
+    for c in text:
+        evenimente.extend(parser.feed(c))
+    return verifica("parser incremental", evenimente == [
+        ("put", '{"path":"/","data":1}'),
+        ("keep-alive", "null"),
+    ])
+
+
+def verifica_stream():
+    # Reconectare rapida pentru test
+    stream.BACKOFF_MINIM = 0.05
+
+    rtdb = RtdbLocal(keepalive=0.2, date_initiale={"alerta": {"status": False, "cine": ""}}).start()
+    stari = []
+    fs = FirebaseStream(f"{rtdb.url}/alerta.json", lambda data: stari.append(data))
+    thread = threading.Thread(target=fs.run, daemon=True)
+    thread.start()
+
+    ok = True
+    ok &= verifica("stare initiala", asteapta(lambda: stari and stari[-1] == {"status": False, "cine": ""}))
+
+    rtdb.actualizeaza("alerta", {"status": True, "cine": "SALA MINIMIS"})
+    ok &= verifica("patch", asteapta(lambda: stari[-1] == {"status": True, "cine": "SALA MINIMIS"}))
+
+    rtdb.scrie("alerta/cine", "ALTCINEVA")
+    ok &= verifica("put pe subcale", asteapta(lambda: stari[-1] == {"status": True, "cine": "ALTCINEVA"}))
+
+    time.sleep(0.5)
+    ok &= verifica("keep-alive nu schimba starea", stari[-1] == {"status": True, "cine": "ALTCINEVA"})
+
+    # Cadere de conexiune + modificare cat timp suntem deconectati
+    with rtdb.lock:
+        rtdb.inchide_streamuri()
+        rtdb.date = {"alerta": {"status": False, "cine": ""}}
+    ok &= verifica("reconectare + resincronizare", asteapta(
+        lambda: fs.reconectari >= 1 and stari[-1] == {"status": False, "cine": ""}))
+
+    # Fiecare reconectare incepe cu un put complet, deci numarul de stari creste
+    n = len(stari)
+    rtdb.trimite_eveniment("auth_revoked")
+    ok &= verifica("auth_revoked redeschide stream-ul", asteapta(
+        lambda: fs.reconectari >= 2 and len(stari) > n))
+
+    n = len(stari)
+    rtdb.trimite_eveniment("cancel")
+    ok &= verifica("cancel -> reconectare cu backoff", asteapta(
+        lambda: fs.reconectari >= 3 and len(stari) > n))
+
+    rtdb.actualizeaza("alerta", {"status": True})
+    ok &= verifica("evenimente dupa reconectari", asteapta(lambda: stari[-1].get("status") is True))
+
+    fs.stop()
+    rtdb.stop()
+    return ok
+
+
+if __name__ == "__main__":
+    ok = verifica_parser()
+    ok &= verifica_stream()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,60 @@
+"""
+Scrieri pe widget-uri doar cand valoarea chiar se schimba.
+
+Poll-ul si heartbeat-ul serviciului confirma starea conexiunii la cateva
+secunde; fara filtrare, fiecare confirmare rescrie textul si culoarea
+etichetei (textura refacuta) si culoarea indicatorului (canvas redesenat).
+ModelVedere compara valoarea dorita cu cea de pe widget si scrie doar
+diferentele, numarand scrierile facute si cele evitate.
+"""
+import time
+from collections import deque
+
+FEREASTRA_SCRIERI = 60  # secunde, pentru scrieri_pe_minut()
+
+
+def _egale(a, b):
+    # Culorile Kivy se citesc ca liste, dar le scriem ca tupluri
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return list(a) == list(b)
+    return a == b
+
+
+class ModelVedere:
+    def __init__(self):
+        self.scrieri = 0
+        self.evitate = 0
+        self._momente = deque()
+
+    def seteaza(self, widget, **proprietati):
+        """Scrie pe widget doar proprietatile cu alta valoare; returneaza cate a scris"""
+        scrise = 0
+        for nume, valoare in proprietati.items():
+            if _egale(getattr(widget, nume), valoare):
+                self.evitate += 1
+                continue
+            setattr(widget, nume, valoare)
+            scrise += 1
+        if scrise:
+            self._numara(scrise)
+        return scrise
+
+    def _numara(self, n):
+        acum = time.monotonic()
+        self.scrieri += n
+        self._momente.extend([acum] * n)
+        while self._momente and acum - self._momente[0] > FEREASTRA_SCRIERI:
+            self._momente.popleft()
+
+    def scrieri_pe_minut(self):
+        acum = time.monotonic()
+        while self._momente and acum - self._momente[0] > FEREASTRA_SCRIERI:
+            self._momente.popleft()
+        return len(self._momente)
+
+    def statistici(self):
+        return {
+            'scrieri': self.scrieri,
+            'evitate': self.evitate,
+            'scrieri_pe_minut': self.scrieri_pe_minut(),
+        }